@@ -0,0 +1,558 @@
+"""Input and screen backends used by ui_automation.
+
+RealInputBackend/RealScreenBackend drive the actual machine through
+pyautogui, keyboard, pygetwindow and ctypes.windll. Those modules are only
+imported when a real backend is created, so everything else also runs on
+Linux without a display.
+
+RecordingInputBackend/RecordingScreenBackend wrap another backend and write
+a timestamped JSON lines log of every call (plus the grabbed screenshots).
+SimulatedInputBackend/SimulatedScreenBackend perform nothing, advance a
+virtual clock instead, and replay recorded logs and screenshots.
+
+"""
+
+import json
+import os
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+Rectangle = Tuple[int, int, int, int]
+
+# Modelled duration of each input action, in seconds, for simulated runs.
+# pyautogui sleeps pyautogui.PAUSE (0.1s by default) after each call.
+SIMULATED_ACTION_SECONDS = {
+    "move_to": 0.1,
+    "click": 0.1,
+    "double_click": 0.1,
+    "press": 0.1,
+    "hotkey": 0.1,
+    "write": 0.1,
+}
+
+# pyautogui.MINIMUM_DURATION: moves of up to this many seconds are instant.
+MINIMUM_MOVE_SECONDS = 0.1
+
+
+def actual_move_seconds(seconds: float) -> float:
+    """How long pyautogui takes for a move given this duration."""
+    return seconds if seconds > MINIMUM_MOVE_SECONDS else 0.0
+
+# Called on every input action of any backend, see add_input_listener().
+_input_listeners: List[Callable[[], None]] = []
+
+
+def add_input_listener(listener: Callable[[], None]):
+    """Call listener on every input action, e.g. to drop stale screen reads."""
+    _input_listeners.append(listener)
+
+
+def _input_performed():
+    for listener in _input_listeners:
+        listener()
+
+
+class InputBackend:
+    """Mouse, keyboard and window operations."""
+
+    # Pause after each input action by kind (e.g. "click"), see speed.py.
+    action_delays: Dict[str, float] = {}
+
+    def set_action_delays(self, delays: Dict[str, float]):
+        self.action_delays = dict(delays)
+
+    def move_to(self, x: int, y: int, seconds: float = 0.0, tween: bool = False):
+        raise NotImplementedError
+
+    def click(self):
+        raise NotImplementedError
+
+    def double_click(self):
+        raise NotImplementedError
+
+    def press(self, key: str):
+        raise NotImplementedError
+
+    def hotkey(self, *keys: str):
+        raise NotImplementedError
+
+    def write(self, text: str):
+        raise NotImplementedError
+
+    def is_key_pressed(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def is_capslock_active(self) -> bool:
+        raise NotImplementedError
+
+    def get_screen_size(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def find_window(self, title: str) -> Optional[int]:
+        """Return the handle of the window with exactly this title, or None.
+
+        Enumerates all windows, so callers should cache the handle.
+
+        """
+        raise NotImplementedError
+
+    def is_window(self, handle: int) -> bool:
+        """Cheaply check that a handle still belongs to an existing window."""
+        raise NotImplementedError
+
+    def get_foreground_window(self) -> Optional[int]:
+        raise NotImplementedError
+
+    def activate_window(self, handle: int) -> bool:
+        """Restore the window if minimized and bring it to the foreground."""
+        raise NotImplementedError
+
+    def minimize_window(self, handle: int) -> bool:
+        raise NotImplementedError
+
+    def get_window_rect(self, handle: int) -> Optional[Rectangle]:
+        """Return (x, y, width, height) of the window's client area."""
+        raise NotImplementedError
+
+
+class ScreenBackend:
+    """Source of screen pixels."""
+
+    def grab(self, x: int, y: int, width: int, height: int) -> Image.Image:
+        raise NotImplementedError
+
+    def screenshot(self) -> Image.Image:
+        raise NotImplementedError
+
+    def checksum(self, x: int, y: int, width: int, height: int) -> int:
+        return zlib.crc32(self.grab(x, y, width, height).tobytes())
+
+
+class RealInputBackend(InputBackend):
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        import keyboard
+        import pyautogui
+        import pygetwindow
+
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.windll.user32
+        self._keyboard = keyboard
+        self._pyautogui = pyautogui
+        self._pygetwindow = pygetwindow
+        self._default_pause = pyautogui.PAUSE
+
+    def _start_input(self, action: str):
+        # pyautogui sleeps PAUSE seconds at the end of each call.
+        self._pyautogui.PAUSE = self.action_delays.get(action, self._default_pause)
+        _input_performed()
+
+    def move_to(self, x: int, y: int, seconds: float = 0.0, tween: bool = False):
+        extra = [self._pyautogui.easeOutQuad] if tween else []
+        self._start_input("move_to")
+        self._pyautogui.moveTo(x, y, seconds, *extra)
+
+    def click(self):
+        self._start_input("click")
+        self._pyautogui.click()
+
+    def double_click(self):
+        self._start_input("double_click")
+        self._pyautogui.doubleClick()
+
+    def press(self, key: str):
+        self._start_input("press")
+        self._pyautogui.press(key)
+
+    def hotkey(self, *keys: str):
+        self._start_input("hotkey")
+        self._pyautogui.hotkey(*keys)
+
+    def write(self, text: str):
+        self._start_input("write")
+        self._pyautogui.write(text)
+
+    def is_key_pressed(self, key: str) -> bool:
+        return self._keyboard.is_pressed(key)
+
+    def is_capslock_active(self) -> bool:
+        # https://stackoverflow.com/a/21160382
+        VK_CAPITAL = 0x14
+        return self._user32.GetKeyState(VK_CAPITAL) > 0
+
+    def get_screen_size(self) -> Tuple[int, int]:
+        return self._user32.GetSystemMetrics(0), self._user32.GetSystemMetrics(1)
+
+    def find_window(self, title: str) -> Optional[int]:
+        for window in self._pygetwindow.getWindowsWithTitle(title):
+            if window.title == title:
+                return window._hWnd
+        return None
+
+    def is_window(self, handle: int) -> bool:
+        return bool(self._user32.IsWindow(handle))
+
+    def get_foreground_window(self) -> Optional[int]:
+        return self._user32.GetForegroundWindow() or None
+
+    def activate_window(self, handle: int) -> bool:
+        SW_MINIMIZE = 6
+        SW_RESTORE = 9
+        if self._user32.IsIconic(handle):
+            self._user32.ShowWindow(handle, SW_RESTORE)
+        if self._user32.SetForegroundWindow(handle):
+            return True
+        # Windows refuses to hand over the foreground to some processes, a
+        # minimize/restore cycle still brings the window to the front.
+        self._user32.ShowWindow(handle, SW_MINIMIZE)
+        return bool(self._user32.ShowWindow(handle, SW_RESTORE))
+
+    def minimize_window(self, handle: int) -> bool:
+        SW_MINIMIZE = 6
+        self._user32.ShowWindow(handle, SW_MINIMIZE)
+        return True
+
+    def get_window_rect(self, handle: int) -> Optional[Rectangle]:
+        rect = self._wintypes.RECT()
+        if not self._user32.GetClientRect(handle, self._ctypes.byref(rect)):
+            return None
+        origin = self._wintypes.POINT(0, 0)
+        self._user32.ClientToScreen(handle, self._ctypes.byref(origin))
+        return origin.x, origin.y, rect.right, rect.bottom
+
+
+class RealScreenBackend(ScreenBackend):
+    def __init__(self):
+        import pyautogui
+
+        self._pyautogui = pyautogui
+
+    def grab(self, x: int, y: int, width: int, height: int) -> Image.Image:
+        return self._pyautogui.screenshot(region=(x, y, width, height))
+
+    def screenshot(self) -> Image.Image:
+        return self._pyautogui.screenshot()
+
+
+class ActionLog:
+    """Timestamped JSON lines log of backend calls."""
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.start = time.perf_counter()
+        self._file = open(filepath, "w")
+
+    def write(self, kind: str, name: str, args: list, result=None):
+        entry = {
+            "t": round(time.perf_counter() - self.start, 6),
+            "kind": kind,
+            "action": name,
+            "args": args,
+        }
+        if result is not None:
+            entry["result"] = result
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_action_log(filepath: str) -> List[dict]:
+    with open(filepath, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class RecordingInputBackend(InputBackend):
+    """Forward every call to another backend and log it."""
+
+    def __init__(self, backend: InputBackend, log: ActionLog):
+        self.backend = backend
+        self.log = log
+
+    def _call(self, name: str, *args):
+        result = getattr(self.backend, name)(*args)
+        self.log.write("input", name, list(args), result)
+        return result
+
+    def set_action_delays(self, delays: Dict[str, float]):
+        self.backend.set_action_delays(delays)
+
+    def move_to(self, x: int, y: int, seconds: float = 0.0, tween: bool = False):
+        return self._call("move_to", x, y, seconds, tween)
+
+    def click(self):
+        return self._call("click")
+
+    def double_click(self):
+        return self._call("double_click")
+
+    def press(self, key: str):
+        return self._call("press", key)
+
+    def hotkey(self, *keys: str):
+        return self._call("hotkey", *keys)
+
+    def write(self, text: str):
+        return self._call("write", text)
+
+    def is_key_pressed(self, key: str) -> bool:
+        return self._call("is_key_pressed", key)
+
+    def is_capslock_active(self) -> bool:
+        return self._call("is_capslock_active")
+
+    def get_screen_size(self) -> Tuple[int, int]:
+        return tuple(self._call("get_screen_size"))
+
+    def find_window(self, title: str) -> Optional[int]:
+        return self._call("find_window", title)
+
+    def is_window(self, handle: int) -> bool:
+        return self._call("is_window", handle)
+
+    def get_foreground_window(self) -> Optional[int]:
+        return self._call("get_foreground_window")
+
+    def activate_window(self, handle: int) -> bool:
+        return self._call("activate_window", handle)
+
+    def minimize_window(self, handle: int) -> bool:
+        return self._call("minimize_window", handle)
+
+    def get_window_rect(self, handle: int) -> Optional[Rectangle]:
+        rectangle = self._call("get_window_rect", handle)
+        return tuple(rectangle) if rectangle else None
+
+
+class RecordingScreenBackend(ScreenBackend):
+    """Forward grabs to another backend, log them and store the images."""
+
+    def __init__(self, backend: ScreenBackend, log: ActionLog, directory: str):
+        self.backend = backend
+        self.log = log
+        self.directory = directory
+        self._count = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _save(self, image: Image.Image) -> str:
+        self._count += 1
+        filename = f"{self._count:06d}.png"
+        image.save(os.path.join(self.directory, filename))
+        return filename
+
+    def grab(self, x: int, y: int, width: int, height: int) -> Image.Image:
+        image = self.backend.grab(x, y, width, height)
+        self.log.write("screen", "grab", [x, y, width, height], self._save(image))
+        return image
+
+    def screenshot(self) -> Image.Image:
+        image = self.backend.screenshot()
+        self.log.write("screen", "screenshot", [], self._save(image))
+        return image
+
+
+class SimulatedInputBackend(InputBackend):
+    """Perform no input, but keep a list of actions and a virtual clock.
+
+    When given the entries of a recorded log, mismatches() reports where the
+    performed actions diverge from the recording.
+
+    """
+
+    def __init__(
+        self,
+        expected: Optional[List[dict]] = None,
+        screen_size: Tuple[int, int] = (2560, 1080),
+        windows: Tuple[str, ...] = ("Hunt: Showdown",),
+        capslock_active: bool = False,
+    ):
+        self.expected = [
+            entry
+            for entry in expected or []
+            if entry["kind"] == "input"
+            and entry["action"] in SIMULATED_ACTION_SECONDS
+        ]
+        self.screen_size = screen_size
+        self.windows = {title: 1000 + i for i, title in enumerate(windows)}
+        self.foreground_window: Optional[int] = None
+        self.window_lookups = 0
+        self.window_activations = 0
+        self.capslock_active = capslock_active
+        self.pressed_keys = set()
+        self.position = (0, 0)
+        self.clock = 0.0
+        self.actions: List[Tuple[float, str, list]] = []
+
+    def _perform(self, name: str, *args):
+        self.clock += self.action_delays.get(name, SIMULATED_ACTION_SECONDS[name])
+        self.actions.append((self.clock, name, list(args)))
+        _input_performed()
+
+    def action_counts(self) -> Dict[str, int]:
+        counts = {}
+        for _, name, _ in self.actions:
+            counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def mismatches(self) -> List[Tuple[int, Optional[list], Optional[list]]]:
+        """Return (index, expected, actual) for every diverging action."""
+        expected = [[entry["action"], entry["args"]] for entry in self.expected]
+        actual = [[name, args] for _, name, args in self.actions]
+        mismatches = []
+        for i in range(max(len(expected), len(actual))):
+            expected_action = expected[i] if i < len(expected) else None
+            actual_action = actual[i] if i < len(actual) else None
+            if expected_action != actual_action:
+                mismatches.append((i, expected_action, actual_action))
+        return mismatches
+
+    def move_to(self, x: int, y: int, seconds: float = 0.0, tween: bool = False):
+        self.clock += actual_move_seconds(seconds)
+        self.position = (x, y)
+        self._perform("move_to", x, y, seconds, tween)
+
+    def click(self):
+        self._perform("click")
+
+    def double_click(self):
+        self._perform("double_click")
+
+    def press(self, key: str):
+        if key == "capslock":
+            self.capslock_active = not self.capslock_active
+        self._perform("press", key)
+
+    def hotkey(self, *keys: str):
+        self._perform("hotkey", *keys)
+
+    def write(self, text: str):
+        self._perform("write", text)
+
+    def is_key_pressed(self, key: str) -> bool:
+        return key in self.pressed_keys
+
+    def is_capslock_active(self) -> bool:
+        return self.capslock_active
+
+    def get_screen_size(self) -> Tuple[int, int]:
+        return self.screen_size
+
+    def find_window(self, title: str) -> Optional[int]:
+        self.window_lookups += 1
+        return self.windows.get(title)
+
+    def is_window(self, handle: int) -> bool:
+        return handle in self.windows.values()
+
+    def get_foreground_window(self) -> Optional[int]:
+        return self.foreground_window
+
+    def activate_window(self, handle: int) -> bool:
+        if not self.is_window(handle):
+            return False
+        self.foreground_window = handle
+        self.window_activations += 1
+        return True
+
+    def minimize_window(self, handle: int) -> bool:
+        if not self.is_window(handle):
+            return False
+        if self.foreground_window == handle:
+            self.foreground_window = None
+        return True
+
+    def get_window_rect(self, handle: int) -> Optional[Rectangle]:
+        return (0, 0, *self.screen_size) if self.is_window(handle) else None
+
+
+class SimulatedScreenBackend(ScreenBackend):
+    """Serve fake screenshots per rectangle.
+
+    Each rectangle maps to a list of images, one per grab. The last image is
+    repeated once the list is exhausted, unknown rectangles are black.
+
+    """
+
+    def __init__(self, size: Tuple[int, int] = (2560, 1080)):
+        self.size = size
+        self.frames: Dict[Rectangle, List[Image.Image]] = {}
+        self.grabs = 0
+
+    @classmethod
+    def from_recording(cls, log_filepath: str, directory: str):
+        backend = cls()
+        for entry in read_action_log(log_filepath):
+            if entry["kind"] != "screen" or entry["action"] != "grab":
+                continue
+            image = Image.open(os.path.join(directory, entry["result"]))
+            backend.frames.setdefault(tuple(entry["args"]), []).append(image)
+        return backend
+
+    def set_frames(self, rectangle: Rectangle, images: List[Image.Image]):
+        self.frames[tuple(rectangle)] = list(images)
+
+    def grab(self, x: int, y: int, width: int, height: int) -> Image.Image:
+        self.grabs += 1
+        images = self.frames.get((x, y, width, height))
+        if not images:
+            return Image.new("RGB", (width, height))
+        if len(images) > 1:
+            return images.pop(0)
+        return images[0]
+
+    def screenshot(self) -> Image.Image:
+        self.grabs += 1
+        return Image.new("RGB", self.size)
+
+
+_input_backend: Optional[InputBackend] = None
+_screen_backend: Optional[ScreenBackend] = None
+
+
+def get_input_backend() -> InputBackend:
+    global _input_backend
+    if _input_backend is None:
+        _input_backend = RealInputBackend()
+    return _input_backend
+
+
+def set_input_backend(backend: InputBackend):
+    global _input_backend
+    _input_backend = backend
+
+
+def get_screen_backend() -> ScreenBackend:
+    global _screen_backend
+    if _screen_backend is None:
+        _screen_backend = RealScreenBackend()
+    return _screen_backend
+
+
+def set_screen_backend(backend: ScreenBackend):
+    global _screen_backend
+    _screen_backend = backend
+
+
+def start_recording(log_filepath: str, screenshots_directory: str) -> ActionLog:
+    """Wrap the current backends so all calls are logged until stopped."""
+    log = ActionLog(log_filepath)
+    set_input_backend(RecordingInputBackend(get_input_backend(), log))
+    set_screen_backend(
+        RecordingScreenBackend(get_screen_backend(), log, screenshots_directory)
+    )
+    return log
+
+
+def stop_recording(log: ActionLog):
+    if isinstance(_input_backend, RecordingInputBackend):
+        set_input_backend(_input_backend.backend)
+    if isinstance(_screen_backend, RecordingScreenBackend):
+        set_screen_backend(_screen_backend.backend)
+    log.close()
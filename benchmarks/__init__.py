@@ -0,0 +1,5 @@
+"""Benchmarks, run from the repository root, e.g.:
+
+    python -m benchmarks.ocr_latency
+
+"""
@@ -0,0 +1,78 @@
+"""Measure frame times of the available traits grid while the window is resized.
+
+Shows a MainWindow with the real and a synthetic catalog, then resizes it
+step by step between two widths and back, processing events after every
+step like a drag does. Each step is one frame. Also reports how often the
+grid laid out its items, compared to once per frame with QListView.Adjust:
+
+    python -m benchmarks.available_traits_resize [steps] [synthetic_size]
+
+"""
+
+import statistics
+import sys
+import time
+
+from PySide2.QtWidgets import QApplication
+
+from benchmarks.synthetic import (
+    make_synthetic_traits,
+    path_for_synthetic_name,
+    temporary_preset_store,
+)
+from gui import MainWindow, TraitIconCache
+from traits import CATALOG
+
+MIN_WIDTH = 700
+MAX_WIDTH = 2000
+HEIGHT = 900
+
+
+def measure_resizes(app: QApplication, traits: list, steps: int) -> dict:
+    iconCache = TraitIconCache(pathForName=path_for_synthetic_name)
+    with temporary_preset_store() as presetStore:
+        window = MainWindow(
+            equipTraitsCallback=lambda traits: None,
+            traits=traits,
+            iconCache=iconCache,
+            presetStore=presetStore,
+        )
+        window.resize(MIN_WIDTH, HEIGHT)
+        window.show()
+        app.processEvents()
+
+        view = window.availableTraitsView
+        layoutsBefore = view.itemLayouts
+        widths = [
+            MIN_WIDTH + (MAX_WIDTH - MIN_WIDTH) * i // steps for i in range(steps)
+        ]
+        frameTimes = []
+        for width in widths + widths[::-1]:
+            start = time.perf_counter()
+            window.resize(width, HEIGHT)
+            app.processEvents()
+            frameTimes.append((time.perf_counter() - start) * 1000)
+        window.close()
+    return {"frameTimes": frameTimes, "layouts": view.itemLayouts - layoutsBefore}
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    synthetic_size = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    app = QApplication(sys.argv)
+    for label, traits in (
+        ("catalog", list(CATALOG)),
+        ("synthetic", make_synthetic_traits(synthetic_size)),
+    ):
+        result = measure_resizes(app, traits, steps)
+        frameTimes = result["frameTimes"]
+        print(
+            f"{label:>9} ({len(traits)} traits), {len(frameTimes)} frames: "
+            f"median {statistics.median(frameTimes):6.2f} ms, "
+            f"max {max(frameTimes):6.2f} ms, "
+            f"{result['layouts']} item layouts"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""End-to-end equip benchmark against the simulated trait selection screen.
+
+Runs equipping.equip_selected_traits for presets of 1-20 traits and prints JSON
+with per-step latency, wait latencies, total wall time, action counts,
+screen capture counts (captures, cache hits, bytes captured and copied) and
+game window focus counts and time, to be appended to a file for trend
+tracking. Progress output of the equip run goes to stderr so stdout only
+holds the JSON line:
+
+    python -m benchmarks.equip [points] [greedy|knapsack] [drop-clears] >> bench.jsonl
+
+The JSON also holds what calibration finds out about the simulated search
+input, whether the double click selects its text. With drop-clears the plans
+skip clearing it regardless, as if calibration had found that it does, and
+the searches whose text then is not replaced fail.
+
+"""
+
+import contextlib
+import json
+import random
+import sys
+import time
+from dataclasses import replace
+
+import capture
+import optimizer
+import simulation
+import ui_automation
+import waiting
+import window_manager
+from equipping import equip_selected_traits
+from traits import TRAITS, get_trait_by_name
+
+PRESET_SIZES = range(1, 21)
+SEED = 1
+
+
+def make_preset(size: int) -> list:
+    names = sorted(trait["name"] for trait in TRAITS)
+    sample = random.Random(SEED).sample(names, size)
+    return [get_trait_by_name(name) for name in sample]
+
+
+def run_preset(
+    preset: list, upgrade_points: int, mode: str, drop_clears: bool = False
+) -> dict:
+    game = simulation.SimulatedHuntGame(upgrade_points=upgrade_points)
+    game.install()
+    waiting.WAIT_LOG.clear()
+    current = ui_automation.current_layout()
+    current.calibration = replace(
+        current.calibration, double_click_selects_search_text=drop_clears
+    )
+
+    steps = []
+
+    def _on_step(step, succeeded, seconds):
+        steps.append(
+            {
+                "trait": step.trait_name,
+                "search_text": step.search_text,
+                "actions": len(step.actions),
+                "succeeded": succeeded,
+                "seconds": round(seconds, 4),
+            }
+        )
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        equip_selected_traits(preset, step_callback=_on_step, mode=mode)
+    wall_time = time.perf_counter() - start
+
+    input_backend = game.input_backend
+    return {
+        "traits": len(preset),
+        "equipped": len(game.equipped),
+        "failed_attempts": game.failed_attempts,
+        "wall_time": round(wall_time, 4),
+        "simulated_input_time": round(input_backend.clock, 4),
+        "action_count": len(input_backend.actions),
+        "actions": input_backend.action_counts(),
+        "screen_grabs": game.screen_backend.grabs,
+        "captures": capture.get_stats(),
+        "focus": window_manager.get_stats(),
+        "steps": steps,
+        "waits": {
+            label: {
+                "count": entry["count"],
+                "total": round(entry["total"], 4),
+                "max": round(entry["max"], 4),
+                "timeouts": entry["timeouts"],
+            }
+            for label, entry in waiting.summarize_waits().items()
+        },
+    }
+
+
+def double_click_selects_search_text() -> bool:
+    simulation.SimulatedHuntGame().install()
+    with contextlib.redirect_stdout(sys.stderr):
+        return ui_automation._double_click_selects_search_text()
+
+
+def main():
+    upgrade_points = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    mode = sys.argv[2] if len(sys.argv) > 2 else optimizer.GREEDY
+    drop_clears = len(sys.argv) > 3 and sys.argv[3] == "drop-clears"
+    runs = [
+        run_preset(make_preset(size), upgrade_points, mode, drop_clears)
+        for size in PRESET_SIZES
+    ]
+    print(
+        json.dumps(
+            {
+                "timestamp": time.time(),
+                "upgrade_points": upgrade_points,
+                "mode": mode,
+                "drop_clears": drop_clears,
+                "double_click_selects_search_text": (
+                    double_click_selects_search_text()
+                ),
+                "runs": runs,
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
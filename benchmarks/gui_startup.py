@@ -0,0 +1,74 @@
+"""Measure MainWindow startup time for the real and a synthetic catalog.
+
+Reports the time until the window is shown and painted, plus how many icons
+had to be decoded for that, compared to decoding every icon up front. The
+windows use an empty temporary preset store. Loading the atlas is timed on
+its own, only the "atlas" window uses it.
+
+    python -m benchmarks.gui_startup [synthetic_size]
+
+"""
+
+import sys
+import time
+
+from PySide2 import QtGui
+from PySide2.QtWidgets import QApplication
+
+from benchmarks.synthetic import (
+    make_synthetic_traits,
+    path_for_synthetic_name,
+    temporary_preset_store,
+)
+from gui import MainWindow, TraitAtlas, TraitIconCache
+from traits import CATALOG
+
+
+def measure_startup(app: QApplication, traits: list, atlas=None) -> dict:
+    iconCache = TraitIconCache(pathForName=path_for_synthetic_name, atlas=atlas)
+    with temporary_preset_store() as presetStore:
+        start = time.perf_counter()
+        window = MainWindow(
+            equipTraitsCallback=lambda traits: None,
+            traits=traits,
+            iconCache=iconCache,
+            presetStore=presetStore,
+        )
+        window.show()
+        app.processEvents()
+        elapsed = time.perf_counter() - start
+        window.close()
+    return {"seconds": elapsed, "decodes": iconCache.decodes}
+
+
+def measure_eager_decoding(traits: list) -> float:
+    start = time.perf_counter()
+    for trait in traits:
+        QtGui.QPixmap(path_for_synthetic_name(trait["name"])).scaledToWidth(342)
+    return time.perf_counter() - start
+
+
+def main():
+    synthetic_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    app = QApplication(sys.argv)
+
+    start = time.perf_counter()
+    trait_atlas = TraitAtlas.load()
+    print(f"atlas loaded in {(time.perf_counter() - start) * 1000:8.1f} ms")
+    for label, traits, atlas in (
+        ("atlas", list(CATALOG), trait_atlas),
+        ("files", list(CATALOG), None),
+        ("synthetic", make_synthetic_traits(synthetic_size), None),
+    ):
+        result = measure_startup(app, traits, atlas)
+        eager = measure_eager_decoding(traits)
+        print(
+            f"{label:>9} ({len(traits)} traits): "
+            f"startup {result['seconds'] * 1000:8.1f} ms, "
+            f"{result['decodes']} icons decoded "
+            f"(decoding all up front: {eager * 1000:8.1f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
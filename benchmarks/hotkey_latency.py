@@ -0,0 +1,47 @@
+"""Measure hotkey to first action latency of the daemon.
+
+Triggers every preset of a HotkeyDaemon like its hotkeys would, equipping
+into the simulated game, and prints the key press to first action latency.
+
+    python -m benchmarks.hotkey_latency [presets] [repeats]
+
+"""
+
+import contextlib
+import random
+import sys
+
+import simulation
+from daemon import HotkeyDaemon, MAX_PRESETS
+from equipping import equip_selected_traits
+from traits import CATALOG
+
+
+def main():
+    preset_count = int(sys.argv[1]) if len(sys.argv) > 1 else MAX_PRESETS
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    rng = random.Random(1)
+    traits = list(CATALOG)
+    presets = [
+        (f"Preset {i + 1}", rng.sample(traits, rng.randint(1, 10)))
+        for i in range(preset_count)
+    ]
+    daemon = HotkeyDaemon(presets, equip_selected_traits)
+
+    for _ in range(repeats):
+        for i in range(len(daemon.presets)):
+            simulation.SimulatedHuntGame(upgrade_points=100).install()
+            with contextlib.redirect_stdout(sys.stderr):
+                daemon.trigger(i).join()
+
+    for latency in daemon.latencies:
+        print(
+            f"{latency.preset_name}: {latency.key_to_first_action * 1000:6.1f} ms "
+            f"to first action, {latency.total * 1000:6.1f} ms total"
+        )
+    daemon.print_latency_summary()
+
+
+if __name__ == "__main__":
+    main()
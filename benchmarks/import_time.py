@@ -0,0 +1,73 @@
+"""Report import time of every main.py command via python -X importtime.
+
+Each command runs in a fresh interpreter against a temporary presets file
+holding one preset. equip runs with --dry-run, which imports everything
+equipping needs but does not touch the game.
+
+    python -m benchmarks.import_time [repeats]
+
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from presets import PresetStore
+
+PRESET_NAME = "Bench"
+COMMANDS = {
+    "list": ["list"],
+    "show-preset": ["show-preset", PRESET_NAME],
+    "plan": ["plan", PRESET_NAME],
+    "equip": ["equip", "--dry-run", PRESET_NAME],
+}
+
+
+def parse_importtime(stderr: str):
+    """Return (module count, summed self time in us) of -X importtime output."""
+    modules = 0
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us = line.split(":", 1)[1].split("|")[0]
+        modules += 1
+        total_us += int(self_us)
+    return modules, total_us
+
+
+def measure(command: list, presets_filepath: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", "--presets", presets_filepath]
+        + command,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    presets_filepath = os.path.join(tempfile.mkdtemp(), "presets.sqlite3")
+    store = PresetStore(presets_filepath)
+    store.save(PRESET_NAME, ["Doctor", "Vigor", "Bulwark", "Iron Eye"])
+    store.close()
+
+    for name, command in COMMANDS.items():
+        try:
+            runs = [measure(command, presets_filepath) for _ in range(repeats)]
+        except RuntimeError as err:
+            print(f"{name:>12}: failed ({err})")
+            continue
+        modules = runs[0][0]
+        total_ms = statistics.median(total_us for _, total_us in runs) / 1000
+        print(f"{name:>12}: {modules:4d} modules, {total_ms:7.1f} ms importing")
+
+
+if __name__ == "__main__":
+    main()
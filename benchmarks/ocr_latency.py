@@ -0,0 +1,86 @@
+"""Measure per-read latency of every OCR backend on stored screen crops.
+
+Crops are 60x50 images of the layout.UPGRADE_POINTS rectangle, named after the
+value they show, e.g. 'img/ocr_crops/38.png'. The shipped ones are synthetic,
+written by `python main.py glyphs --synthetic`.
+
+Usage:
+    python -m benchmarks.ocr_latency [crops_dir] [repeats]
+
+"""
+
+import os
+import statistics
+import sys
+import time
+
+from PIL import Image
+
+import ocr
+
+DEFAULT_CROPS_DIR = ocr.OCR_CROPS_DIR
+
+
+def load_crops(directory: str):
+    crops = []
+    if not os.path.isdir(directory):
+        return crops
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".png"):
+            continue
+        expected = os.path.splitext(filename)[0].split("_")[0]
+        image = Image.open(os.path.join(directory, filename))
+        image.load()
+        crops.append((expected, image))
+    return crops
+
+
+def benchmark_backend(backend: ocr.OcrBackend, crops, repeats: int) -> dict:
+    latencies = []
+    correct = 0
+    for _ in range(repeats):
+        for expected, image in crops:
+            start = time.perf_counter()
+            text = backend.read_image(image)
+            latencies.append(time.perf_counter() - start)
+            correct += text.strip() == expected
+    return {
+        "backend": backend.name,
+        "reads": len(latencies),
+        "accuracy": correct / len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "median_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CROPS_DIR
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    crops = load_crops(directory)
+    if not crops:
+        print(
+            f"No crops found in {directory}, "
+            "write synthetic ones with: python main.py glyphs --synthetic"
+        )
+        return
+
+    print(f"{len(crops)} crops x {repeats} repeats")
+    for backend in ocr.get_backends():
+        try:
+            result = benchmark_backend(backend, crops, repeats)
+        except OSError as err:
+            print(f"{backend.name}: unavailable ({err})")
+            continue
+        print(
+            f"{result['backend']:>12}: "
+            f"mean {result['mean_ms']:8.2f} ms, "
+            f"median {result['median_ms']:8.2f} ms, "
+            f"max {result['max_ms']:8.2f} ms, "
+            f"accuracy {result['accuracy']:.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Stress the debounced preset persistence with rapid selection toggles.
+
+Fires 10,000 random toggle events at a Selection that saves through a
+DebouncedWriter (like MainWindow does), then checks that the file holds the
+final selection and that only a bounded number of writes happened.
+
+    python -m benchmarks.persistence_stress [events] [delay_seconds]
+
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import persistence
+from traits import CATALOG, Selection
+
+
+def run(events: int, delay: float) -> bool:
+    filepath = os.path.join(tempfile.mkdtemp(), "presets.json")
+    writer = persistence.DebouncedWriter(filepath, delay=delay)
+    selection = Selection()
+    selection.subscribe(lambda changes: writer.submit(selection.names()))
+
+    traits = list(CATALOG)
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(events):
+        trait = rng.choice(traits)
+        if trait in selection:
+            selection.remove(trait.name)
+        else:
+            selection.add(trait)
+    submit_time = time.perf_counter() - start
+    writer.close()
+    elapsed = time.perf_counter() - start
+
+    with open(filepath, "r") as f:
+        saved = json.loads(f.read())
+
+    # One write per elapsed debounce interval, plus the final flush.
+    max_writes = int(elapsed / delay) + 2
+    correct = saved == selection.names()
+    bounded = writer.writes <= max_writes
+    print(
+        f"{events} toggles in {submit_time * 1000:.1f} ms "
+        f"({submit_time / events * 1e6:.2f} us each), "
+        f"{writer.writes} writes (max {max_writes}), "
+        f"file {'matches' if correct else 'DOES NOT match'} the selection"
+    )
+    return correct and bounded
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else persistence.DEFAULT_DELAY
+    if not run(events, delay):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Measure preset listing and switching with many stored presets.
+
+A switch is loading one preset from the store and replacing the selection
+with it in a single batch, which is what MainWindow.switchPreset does
+besides updating widgets.
+
+    python -m benchmarks.preset_switching [presets] [switches]
+
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from presets import PresetStore
+from traits import CATALOG, Selection, get_trait_by_name
+
+TARGET_MS = 10
+
+
+def main():
+    preset_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    switches = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    store = PresetStore(os.path.join(tempfile.mkdtemp(), "presets.sqlite3"))
+    rng = random.Random(1)
+    names = [trait.name for trait in CATALOG]
+    for i in range(preset_count):
+        store.save(f"Preset {i:04d}", rng.sample(names, rng.randint(1, 20)))
+
+    start = time.perf_counter()
+    preset_names = store.list_names()
+    list_ms = (time.perf_counter() - start) * 1000
+
+    selection = Selection()
+    selection.subscribe(lambda changes: None)
+    latencies = []
+    for _ in range(switches):
+        name = rng.choice(preset_names)
+        start = time.perf_counter()
+        traits = [get_trait_by_name(trait_name) for trait_name in store.load(name)]
+        with selection.batch():
+            selection.clear()
+            for trait in traits:
+                selection.add(trait)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(f"{preset_count} presets, listing took {list_ms:.2f} ms")
+    print(
+        f"{switches} switches: mean {statistics.mean(latencies):.3f} ms, "
+        f"max {max(latencies):.3f} ms (target < {TARGET_MS} ms)"
+    )
+    store.close()
+    if max(latencies) >= TARGET_MS:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Replay a recorded equip run against the simulated backends.
+
+Record a run on a machine with the game, e.g. from a Python shell:
+
+    import backends, planner, ui_automation
+    log = backends.start_recording("run.jsonl", "run_screens")
+    ui_automation.execute_equip_plan(planner.make_equip_plan(["Doctor", ...]))
+    backends.stop_recording(log)
+
+Then replay it anywhere (no display needed) to compare action counts and
+simulated wall time after changing ui_automation:
+
+    python -m benchmarks.replay run.jsonl run_screens Doctor Vigor ...
+
+"""
+
+import sys
+import time
+
+import backends
+import planner
+import ui_automation
+
+
+def main():
+    if len(sys.argv) < 4:
+        print(__doc__)
+        return
+    log_filepath, screens_directory, *trait_names = sys.argv[1:]
+
+    input_backend = backends.SimulatedInputBackend(
+        expected=backends.read_action_log(log_filepath)
+    )
+    backends.set_input_backend(input_backend)
+    backends.set_screen_backend(
+        backends.SimulatedScreenBackend.from_recording(log_filepath, screens_directory)
+    )
+
+    start = time.perf_counter()
+    plan = planner.make_equip_plan(trait_names)
+    equipped = ui_automation.execute_equip_plan(plan)
+    wall_time = time.perf_counter() - start
+
+    print(plan.describe())
+    print(f"Equipped: {', '.join(equipped) or '-'}")
+    print(f"Actions: {input_backend.action_counts()}")
+    print(f"Simulated input time: {input_backend.clock:.2f}s")
+    print(f"Wall time (waits and matching): {wall_time:.2f}s")
+
+    mismatches = input_backend.mismatches()
+    print(f"{len(mismatches)} actions differ from the recording")
+    for index, expected, actual in mismatches[:20]:
+        print(f"  #{index}: recorded {expected}, replayed {actual}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Tune a speed profile against the simulated game and equip with it.
+
+The simulated game drops inputs that follow too quickly (see
+simulation.SIMULATED_REACTION_SECONDS). After tuning, presets are equipped
+with the default and the tuned profile, comparing the simulated input time
+and checking that both equip the same traits:
+
+    python -m benchmarks.speed_tuning [trials]
+
+"""
+
+import contextlib
+import sys
+import time
+
+import simulation
+import speed
+import ui_automation
+from benchmarks.equip import make_preset
+from equipping import equip_selected_traits
+
+PRESET_SIZES = (4, 8, 12)
+
+
+def _new_game() -> simulation.SimulatedHuntGame:
+    game = simulation.SimulatedHuntGame(
+        upgrade_points=100, reaction_seconds=simulation.SIMULATED_REACTION_SECONDS
+    )
+    game.install()
+    return game
+
+
+def equip_with(profile: speed.SpeedProfile, size: int) -> dict:
+    game = _new_game()
+    ui_automation.set_speed_profile(profile)
+    with contextlib.redirect_stdout(sys.stderr):
+        equip_selected_traits(make_preset(size))
+    return {
+        "equipped": len(game.equipped),
+        "input_time": game.input_backend.clock,
+        "dropped": game.dropped_inputs,
+    }
+
+
+def main():
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    game = _new_game()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        tuned = ui_automation.tune_speed_profile(
+            trials, machine=speed.SIMULATED_MACHINE, save=False
+        )
+    if tuned is None:
+        sys.exit("Tuning failed")
+    print(
+        f"Tuned in {time.perf_counter() - start:.1f}s "
+        f"({game.input_backend.clock:.1f}s simulated input): {speed.describe(tuned)}"
+    )
+
+    failed = False
+    for size in PRESET_SIZES:
+        default = equip_with(speed.SpeedProfile(), size)
+        fast = equip_with(tuned, size)
+        print(
+            f"{size:2d} traits: default {default['input_time']:.2f}s, "
+            f"tuned {fast['input_time']:.2f}s, equipped "
+            f"{default['equipped']}/{fast['equipped']}, "
+            f"dropped inputs {default['dropped']}/{fast['dropped']}"
+        )
+        failed |= fast["equipped"] != default["equipped"]
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Synthetic data for the GUI and search benchmarks.
+
+Large trait catalogs, and empty preset stores so that benchmarked windows
+never read or write the user's presets.
+
+"""
+
+import contextlib
+import os
+import random
+import tempfile
+
+from presets import PresetStore
+from traits import CATALOG, ICONS_DIR, Trait
+
+
+def make_synthetic_traits(size: int, seed: int = 1) -> list:
+    """Copies of the real traits with unique names, for large catalogs.
+
+    Copies are named "<name> #<i>" and keep the icon of their trait, with
+    its description words shuffled and a random rank and cost.
+
+    """
+    rng = random.Random(seed)
+    traits = list(CATALOG)
+    description_words = [trait.description.split() for trait in traits]
+    synthetic = []
+    for i in range(size):
+        trait = traits[i % len(traits)]
+        words = list(rng.choice(description_words))
+        rng.shuffle(words)
+        synthetic.append(
+            Trait(
+                rng.randint(1, 100),
+                f"{trait.name} #{i}",
+                trait.icon,
+                rng.randint(1, 5),
+                " ".join(words),
+            )
+        )
+    return synthetic
+
+
+def path_for_synthetic_name(name: str) -> str:
+    """Icon path of a trait, synthetic or real, for TraitIconCache."""
+    return os.path.join(ICONS_DIR, f"{name.rsplit(' #', 1)[0]}.png")
+
+
+@contextlib.contextmanager
+def temporary_preset_store():
+    """Yield an empty PresetStore in a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        store = PresetStore(os.path.join(directory, "presets.sqlite3"))
+        try:
+            yield store
+        finally:
+            store.close()
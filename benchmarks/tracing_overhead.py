@@ -0,0 +1,61 @@
+"""Measure the cost of tracing, and show the trace of a simulated equip.
+
+Compares calls of a traced function with tracing off and on to plain calls,
+then equips a preset on the simulated trait screen with tracing on and
+prints the span summary:
+
+    python -m benchmarks.tracing_overhead [trace.json]
+
+"""
+
+import contextlib
+import sys
+import time
+
+import simulation
+import tracing
+from benchmarks.equip import make_preset
+from equipping import equip_selected_traits
+
+CALLS = 100000
+
+
+def _plain():
+    pass
+
+
+_traced = tracing.traced("noop")(_plain)
+
+
+def _ns_per_call(func) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        func()
+    return (time.perf_counter() - start) / CALLS * 1e9
+
+
+def main():
+    plain = _ns_per_call(_plain)
+    disabled = _ns_per_call(_traced)
+    tracing.start()
+    enabled = _ns_per_call(_traced)
+    tracing.stop()
+    print(
+        f"Per call: plain {plain:.0f} ns, tracing off {disabled:.0f} ns "
+        f"(+{disabled - plain:.0f} ns), tracing on {enabled:.0f} ns"
+    )
+
+    game = simulation.SimulatedHuntGame(upgrade_points=40)
+    game.install()
+    tracing.start()
+    with contextlib.redirect_stdout(sys.stderr):
+        equip_selected_traits(make_preset(12))
+    tracer = tracing.stop()
+    tracer.print_summary()
+    if len(sys.argv) > 1:
+        tracer.write_chrome_trace(sys.argv[1])
+        print(f"Trace written to {sys.argv[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measure per-keystroke search latency on a large synthetic catalog.
+
+Every query is typed one character at a time and each prefix is searched,
+like the search box of the GUI does.
+
+    python -m benchmarks.trait_search [catalog_size] [--gui]
+
+With --gui every prefix is also typed into the search box of a MainWindow
+with the synthetic catalog, on Qt's offscreen platform, timing
+MainWindow.filterAvailableTraits and the repaint after it. That part needs
+PySide2.
+
+"""
+
+import os
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import make_synthetic_traits, temporary_preset_store
+from search import TraitSearchIndex
+
+TARGET_MS = 5
+QUERIES = (
+    "doctor",
+    "fast reload",
+    "health regeneration",
+    "e",
+    "rank:10-40 heal",
+    "cost:2 stamina",
+    "poison resistance",
+    "zzz",
+)
+
+
+def _prefixes():
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            yield query[:end]
+
+
+def measure_gui_filter(traits: list) -> dict:
+    """Latencies (ms) of filtering a MainWindow's traits, and of repainting."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide2.QtWidgets import QApplication
+
+    from gui import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    with temporary_preset_store() as presetStore:
+        window = MainWindow(
+            equipTraitsCallback=lambda traits: None,
+            traits=traits,
+            presetStore=presetStore,
+        )
+        window.show()
+        app.processEvents()
+
+        # The search box calls filterAvailableTraits, time it on its own.
+        window.searchInput.textChanged.disconnect(window.filterAvailableTraits)
+        filter_ms, paint_ms = [], []
+        for prefix in _prefixes():
+            window.searchInput.setText(prefix)
+            start = time.perf_counter()
+            window.filterAvailableTraits(prefix)
+            filtered = time.perf_counter()
+            app.processEvents()
+            filter_ms.append((filtered - start) * 1000)
+            paint_ms.append((time.perf_counter() - filtered) * 1000)
+        window.close()
+    return {"filter": filter_ms, "paint": paint_ms}
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    size = int(args[0]) if args else 10000
+    traits = make_synthetic_traits(size)
+
+    start = time.perf_counter()
+    index = TraitSearchIndex(traits)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for prefix in _prefixes():
+        start = time.perf_counter()
+        index.search_ids(prefix)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(
+        f"{size} traits, {len(index.postings)} index keys, built in {build_ms:.0f} ms"
+    )
+    print(
+        f"{len(latencies)} keystrokes: mean {statistics.mean(latencies):.3f} ms, "
+        f"max {max(latencies):.3f} ms (target < {TARGET_MS} ms)"
+    )
+    failed = max(latencies) >= TARGET_MS
+
+    if "--gui" in sys.argv:
+        gui_latencies = measure_gui_filter(traits)
+        for label, values in gui_latencies.items():
+            print(
+                f"GUI {label}: mean {statistics.mean(values):.3f} ms, "
+                f"max {max(values):.3f} ms"
+            )
+        failed = failed or max(gui_latencies["filter"]) >= TARGET_MS
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Check and time sync_traits.py against the saved wiki fixture.
+
+fixtures/wiki/Traits.html holds one unchanged trait, one changed trait with
+a changed icon, one new trait and one whose icon was not saved. A dry run
+is diffed in this tree. Then sync_traits.py runs for real in temporary
+copies of the tree, once with the fixture (traits.json, the icons and the
+atlas must be replaced) and once with an invalid rank in it (nothing may
+change). The run exits with status 1 if anything is not as expected.
+
+    python -m benchmarks.trait_sync
+
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import sync_traits
+import traits
+
+FIXTURE = os.path.join(traits.ROOT_DIR, "fixtures", "wiki", "Traits.html")
+EXPECTED = {
+    "added": ["Salt Walker"],
+    "changed": ["Doctor"],
+    "unchanged": 2,
+    "icons_changed": ["Doctor", "Salt Walker"],
+    "problems": 1,
+}
+# Turns the fixture into a page that fails validation.
+INVALID_EDIT = ("<td>Rank 73</td>", "<td>Rank 0</td>")
+
+
+def _copy_tree(root: str):
+    """Copy what sync_traits.py reads and writes into root."""
+    for filepath in glob.glob(os.path.join(traits.ROOT_DIR, "*.py")):
+        shutil.copy(filepath, root)
+    shutil.copy(traits.TRAITS_SOURCE, root)
+    for directory in (traits.ICONS_DIR, "fixtures"):
+        shutil.copytree(
+            os.path.join(traits.ROOT_DIR, directory), os.path.join(root, directory)
+        )
+
+
+def _snapshot(root: str) -> dict:
+    """Content of traits.json and of every file in img/, by path."""
+    paths = [os.path.join(root, "traits.json")] + glob.glob(
+        os.path.join(root, traits.ICONS_DIR, "**", "*"), recursive=True
+    )
+    snapshot = {}
+    for path in paths:
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                snapshot[os.path.relpath(path, root)] = f.read()
+    return snapshot
+
+
+def _sync(root: str, invalid: bool) -> subprocess.CompletedProcess:
+    page = os.path.join(root, os.path.relpath(FIXTURE, traits.ROOT_DIR))
+    if invalid:
+        with open(page, "r", encoding="utf-8") as f:
+            html = f.read()
+        with open(page, "w", encoding="utf-8") as f:
+            f.write(html.replace(*INVALID_EDIT))
+    return subprocess.run(
+        [sys.executable, "sync_traits.py", page],
+        cwd=root,
+        capture_output=True,
+        text=True,
+    )
+
+
+def check_sync(invalid: bool) -> list:
+    """Run a sync in a temporary copy of the tree, return what went wrong."""
+    icons = traits.ICONS_DIR
+    with tempfile.TemporaryDirectory() as root:
+        _copy_tree(root)
+        before = _snapshot(root)
+        start = time.perf_counter()
+        process = _sync(root, invalid)
+        seconds = time.perf_counter() - start
+        after = _snapshot(root)
+        leftovers = glob.glob(os.path.join(root, ".icons.*"))
+
+    changed = sorted(path for path in after if before.get(path) != after[path])
+    label = "invalid" if invalid else "valid"
+    print(
+        f"Synced the {label} page in {seconds:.1f} s, exit status "
+        f"{process.returncode}, {len(changed)} files changed"
+    )
+    errors = []
+    if leftovers:
+        errors.append(f"staged icons left behind: {leftovers}")
+    if invalid:
+        if process.returncode != 1:
+            errors.append(f"exit status {process.returncode}, expected 1")
+        if changed or before.keys() != after.keys():
+            errors.append(f"changed after a failed validation: {changed}")
+        return errors
+
+    if process.returncode != 0:
+        errors.append(f"exit status {process.returncode}: {process.stdout}")
+    expected = [
+        "traits.json",
+        os.path.join(icons, "Doctor.png"),
+        os.path.join(icons, "Salt Walker.png"),
+        os.path.join(icons, "atlas.json"),
+        os.path.join(icons, "atlas.png"),
+    ]
+    for path in expected:
+        if path not in changed:
+            errors.append(f"{path} was not written")
+    if "Salt Walker" not in after.get("traits.json", b"").decode("utf-8"):
+        errors.append("Salt Walker is missing from traits.json")
+    return errors
+
+
+def main():
+    start = time.perf_counter()
+    wiki_traits, problems = sync_traits.parse_wiki_html(FIXTURE)
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    with open(traits.TRAITS_SOURCE, "r", encoding="utf-8") as f:
+        current = json.loads(f.read())
+    start = time.perf_counter()
+    diff = sync_traits.diff_records(current, [trait.record for trait in wiki_traits])
+    diff_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    icons_changed = sync_traits.sync_icons(wiki_traits)
+    icons_ms = (time.perf_counter() - start) * 1000
+
+    result = {
+        "added": diff.added,
+        "changed": diff.changed,
+        "unchanged": diff.unchanged,
+        "icons_changed": sorted(icons_changed),
+        "problems": len(problems),
+    }
+    print(
+        f"Parsed {len(wiki_traits)} traits in {parse_ms:.1f} ms, "
+        f"diffed in {diff_ms:.2f} ms, compared icons in {icons_ms:.0f} ms"
+    )
+    print(json.dumps(result))
+    failed = False
+    if result != EXPECTED:
+        print(f"Expected {json.dumps(EXPECTED)}")
+        failed = True
+
+    for invalid in (False, True):
+        for error in check_sync(invalid):
+            print(error)
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
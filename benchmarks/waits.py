@@ -0,0 +1,154 @@
+"""Check and time the waits against simulated screens.
+
+Runs wait_until() and wait_for_reaction() on a backends.SimulatedScreenBackend
+whose frames change on given polls: waits that succeed, time out, react to
+expected() and never settle. Then moves onto an element of a
+simulation.SimulatedHuntGame without hover highlight, once waiting for the
+highlight and once as calibrated. Prints the latency of each check and exits
+with status 1 if any wait did not end as expected:
+
+    python -m benchmarks.waits
+
+"""
+
+import contextlib
+import io
+import sys
+import time
+from dataclasses import replace
+
+from PIL import Image
+
+import backends
+import layout
+import simulation
+import ui_automation
+import waiting
+
+REGION = (0, 0, 8, 8)
+TIMEOUT = 0.2
+POLL_INTERVAL = 0.01
+
+
+def _frames(*colors) -> list:
+    return [Image.new("RGB", REGION[2:], color) for color in colors]
+
+
+def _use_frames(*colors) -> int:
+    """Serve one frame per poll of REGION, return the checksum of the first."""
+    screen = backends.SimulatedScreenBackend()
+    screen.set_frames(REGION, _frames(*colors))
+    backends.set_screen_backend(screen)
+    return waiting.region_checksum(REGION)
+
+
+def _wait(wait, **kwargs):
+    """Run a wait quietly, return its result, latency and wait records."""
+    waiting.WAIT_LOG.clear()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = wait(timeout=TIMEOUT, poll_interval=POLL_INTERVAL, **kwargs)
+    return result, time.perf_counter() - start, list(waiting.WAIT_LOG)
+
+
+def check_wait_until() -> list:
+    polls = [0]
+
+    def _third_poll():
+        polls[0] += 1
+        return polls[0] == 3
+
+    result, latency, records = _wait(waiting.wait_until, predicate=_third_poll)
+    errors = []
+    if not result or records[0].polls != 3:
+        errors.append(f"wait_until: {records} instead of success on poll 3")
+    if latency > 2 * POLL_INTERVAL + TIMEOUT / 2:
+        errors.append(f"wait_until: took {latency:.3f}s for 3 polls")
+
+    result, latency, records = _wait(waiting.wait_until, predicate=lambda: False)
+    if result or records[0].succeeded:
+        errors.append("wait_until: a false predicate did not time out")
+    if not TIMEOUT <= latency < TIMEOUT + 5 * POLL_INTERVAL:
+        errors.append(f"wait_until: timed out after {latency:.3f}s, not {TIMEOUT}s")
+    return errors
+
+
+def check_wait_for_reaction() -> list:
+    errors = []
+
+    # Changes on the third poll and settles, the second poll after that
+    # sees the same frame as the first.
+    before = _use_frames("black", "black", "black", "gray", "white", "white")
+    result, latency, records = _wait(
+        waiting.wait_for_reaction, checksums_before={REGION: before}
+    )
+    outcomes = [(record.label, record.succeeded, record.polls) for record in records]
+    if not result or outcomes != [
+        ("reaction", True, 3),
+        ("reaction settled", True, 2),
+    ]:
+        errors.append(f"wait_for_reaction: {outcomes} instead of settling")
+    print(f"Settled reaction returned after {latency:.3f}s")
+
+    before = _use_frames("black")
+    result, latency, records = _wait(
+        waiting.wait_for_reaction, checksums_before={REGION: before}
+    )
+    if result or len(records) != 1 or latency < TIMEOUT:
+        errors.append("wait_for_reaction: an unchanged region did not time out")
+
+    before = _use_frames("black")
+    result, latency, records = _wait(
+        waiting.wait_for_reaction,
+        checksums_before={REGION: before},
+        expected=lambda: True,
+    )
+    if not result or records[0].polls != 1:
+        errors.append("wait_for_reaction: did not end on expected()")
+
+    # Never stops changing, so the reaction is seen but never settles.
+    before = _use_frames(*(["black"] + ["gray", "white"] * 50))
+    result, latency, records = _wait(
+        waiting.wait_for_reaction, checksums_before={REGION: before}
+    )
+    if not result or records[-1].succeeded:
+        errors.append("wait_for_reaction: settled while the region kept changing")
+    print(f"Unsettled reaction returned after {latency:.3f}s")
+    return errors
+
+
+def check_hover_wait() -> list:
+    """Without hover highlight, moves only wait as long as it is assumed."""
+    errors = []
+    simulation.SimulatedHuntGame(hover_highlight=False).install()
+    current = ui_automation.current_layout()
+    calibration = current.calibration
+    element = current[layout.TRAITS_FIRST_MATCH]
+    for hover_highlight in (True, False):
+        current.calibration = replace(
+            current.calibration, hover_highlight=hover_highlight
+        )
+        ui_automation.smooth_move(0, 0)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ui_automation._move_and_wait_for_hover(element, "hover")
+        latency = time.perf_counter() - start
+        print(f"Move with hover_highlight={hover_highlight}: {latency:.3f}s")
+        waited = latency >= ui_automation.HOVER_TIMEOUT
+        if waited != hover_highlight:
+            errors.append(f"hover_highlight={hover_highlight}: took {latency:.3f}s")
+    current.calibration = calibration
+    return errors
+
+
+def main():
+    errors = check_wait_until() + check_wait_for_reaction() + check_hover_wait()
+    for error in errors:
+        print(error)
+    if errors:
+        sys.exit(1)
+    print("All waits ended as expected")
+
+
+if __name__ == "__main__":
+    main()
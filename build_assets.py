@@ -0,0 +1,165 @@
+"""Build the trait icon atlas used by the GUI.
+
+Packs every icon in img/ into a single image, img/atlas.png, both scaled to
+the width shown in the GUI ("full") and cropped to the icon part ("small").
+img/atlas.json maps each trait name to the rects of both variants plus the
+hash of its source image. The cropped icons are also written to img/small/,
+which is where the screen recognition (vision.py) loads them from.
+
+Only icons whose source hash changed are processed again, in parallel across
+a process pool, all others are copied over from the previous atlas.
+
+Usage:
+    python build_assets.py [--force]
+
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+import persistence
+import traits
+
+ICONS_DIR = os.path.join(traits.ROOT_DIR, traits.ICONS_DIR)
+SMALL_ICONS_DIR = os.path.join(ICONS_DIR, "small")
+ATLAS_IMAGE = os.path.join(ICONS_DIR, "atlas.png")
+ATLAS_INDEX = os.path.join(ICONS_DIR, "atlas.json")
+ATLAS_VERSION = 1
+
+FULL_WIDTH = 342
+# Area of the small icon within the 476x247 source images.
+SMALL_CROP_AREA = (476 - 102, 0, 476 - 4, 94)
+ATLAS_COLUMNS = 8
+
+
+def hash_file(filepath: str) -> str:
+    with open(filepath, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def process_icon(filepath: str) -> Tuple[Image.Image, Image.Image]:
+    """Return the (full, small) variants of a source icon."""
+    image = Image.open(filepath).convert("RGBA")
+    height = round(image.height * FULL_WIDTH / image.width)
+    full = image.resize((FULL_WIDTH, height), Image.LANCZOS)
+    small = image.crop(SMALL_CROP_AREA)
+    return full, small
+
+
+def _crop_rect(image: Image.Image, rect) -> Image.Image:
+    x, y, width, height = rect
+    return image.crop((x, y, x + width, y + height))
+
+
+def _load_previous() -> Tuple[dict, Optional[Image.Image]]:
+    if not (os.path.isfile(ATLAS_INDEX) and os.path.isfile(ATLAS_IMAGE)):
+        return {}, None
+    with open(ATLAS_INDEX, "r") as f:
+        index = json.loads(f.read())
+    if index.get("version") != ATLAS_VERSION:
+        return {}, None
+    return index["icons"], Image.open(ATLAS_IMAGE)
+
+
+def _pack(tiles: Dict[str, Tuple[Image.Image, Image.Image]]):
+    """Lay out full variants in a grid, small variants in a grid below."""
+    names = sorted(tiles)
+    full_width = max(full.width for full, _ in tiles.values())
+    full_height = max(full.height for full, _ in tiles.values())
+    small_width = max(small.width for _, small in tiles.values())
+    small_height = max(small.height for _, small in tiles.values())
+
+    full_rows = -(-len(names) // ATLAS_COLUMNS)
+    small_columns = (full_width * ATLAS_COLUMNS) // small_width
+    small_rows = -(-len(names) // small_columns)
+
+    atlas = Image.new(
+        "RGBA",
+        (
+            max(full_width * ATLAS_COLUMNS, small_width * small_columns),
+            full_height * full_rows + small_height * small_rows,
+        ),
+    )
+    rects = {}
+    for i, name in enumerate(names):
+        full, small = tiles[name]
+        full_x = (i % ATLAS_COLUMNS) * full_width
+        full_y = (i // ATLAS_COLUMNS) * full_height
+        small_x = (i % small_columns) * small_width
+        small_y = full_height * full_rows + (i // small_columns) * small_height
+        atlas.paste(full, (full_x, full_y))
+        atlas.paste(small, (small_x, small_y))
+        rects[name] = {
+            "full": [full_x, full_y, full.width, full.height],
+            "small": [small_x, small_y, small.width, small.height],
+        }
+    return atlas, rects
+
+
+def build_atlas(force: bool = False) -> bool:
+    """Build the atlas, return whether anything had to be rebuilt."""
+    sources = {
+        os.path.splitext(filename)[0]: os.path.join(ICONS_DIR, filename)
+        for filename in sorted(os.listdir(ICONS_DIR))
+        if filename.endswith(".png")
+        and os.path.isfile(os.path.join(ICONS_DIR, filename))
+        and os.path.join(ICONS_DIR, filename) != ATLAS_IMAGE
+    }
+    hashes = {name: hash_file(filepath) for name, filepath in sources.items()}
+
+    previous, previous_atlas = ({}, None) if force else _load_previous()
+    changed = [
+        name
+        for name in sources
+        if previous_atlas is None
+        or name not in previous
+        or previous[name]["hash"] != hashes[name]
+    ]
+    if not changed and set(previous) == set(sources):
+        print("Atlas is up to date")
+        return False
+
+    tiles = {}
+    for name in sources:
+        if name not in changed:
+            tiles[name] = (
+                _crop_rect(previous_atlas, previous[name]["full"]),
+                _crop_rect(previous_atlas, previous[name]["small"]),
+            )
+
+    with ProcessPoolExecutor() as executor:
+        processed = executor.map(process_icon, [sources[name] for name in changed])
+        for name, (full, small) in zip(changed, processed):
+            tiles[name] = (full, small)
+            os.makedirs(SMALL_ICONS_DIR, exist_ok=True)
+            small.save(os.path.join(SMALL_ICONS_DIR, f"{name}.png"))
+            print(f"Processed {name}")
+
+    atlas, rects = _pack(tiles)
+    # Written atomically, the GUI must never load a half written atlas.
+    data = io.BytesIO()
+    atlas.save(data, format="PNG")
+    persistence.atomic_write(ATLAS_IMAGE, data.getvalue())
+    for name, entry in rects.items():
+        entry["hash"] = hashes[name]
+    persistence.atomic_write_json(
+        ATLAS_INDEX,
+        {
+            "version": ATLAS_VERSION,
+            "image": os.path.basename(ATLAS_IMAGE),
+            "icons": rects,
+        },
+    )
+    print(f"Wrote {ATLAS_IMAGE} with {len(rects)} icons ({len(changed)} rebuilt)")
+    return True
+
+
+if __name__ == "__main__":
+    build_atlas(force="--force" in sys.argv)
@@ -0,0 +1,25 @@
+"""Validate traits.json and rebuild the trait catalog cache, traits.cache.
+
+Exits with status 1 and lists every invalid entry if validation fails.
+
+Usage:
+    python build_catalog.py
+
+"""
+
+import sys
+
+import traits
+
+
+def main():
+    try:
+        catalog = traits.build_catalog()
+    except traits.CatalogError as err:
+        print(err)
+        sys.exit(1)
+    print(f"Wrote {len(catalog)} traits to {traits.TRAITS_CACHE}")
+
+
+if __name__ == "__main__":
+    main()
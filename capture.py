@@ -0,0 +1,161 @@
+"""Shared, region-only screen captures.
+
+All screen reads (wait checksums, icon matching, OCR) go through one
+CaptureService. It grabs only the requested rectangle and keeps the grabbed
+pixels for the current frame, so several checks of the same UI state share
+one capture: a rectangle inside an already captured one is served as a NumPy
+view into it, without copying.
+
+A frame ends when next_frame() is called (waiting.wait_until does so before
+every poll, and every input action does), or when it is older than the
+TTL, whichever comes first.
+
+"""
+
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+
+import numpy as np
+from PIL import Image
+
+import backends
+from backends import Rectangle
+
+# Inputs end the frame themselves, however short their pause (see speed.py).
+# The TTL only bounds how long changes the game makes on its own go unseen.
+DEFAULT_TTL = 0.05
+
+
+@dataclass
+class CaptureStats:
+    captures: int = 0
+    cache_hits: int = 0
+    bytes_captured: int = 0
+    bytes_copied: int = 0
+
+
+class CaptureService:
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self.frame = 0
+        self.stats = CaptureStats()
+        self._frame_start = 0.0
+        self._backend: Optional[backends.ScreenBackend] = None
+        self._arrays: Dict[Rectangle, np.ndarray] = {}
+
+    def next_frame(self):
+        """Drop all captures, the next reads see the screen as it is now."""
+        self.frame += 1
+        self._arrays.clear()
+
+    def reset_stats(self):
+        self.stats = CaptureStats()
+
+    def _cached(self, rectangle: Rectangle) -> Optional[np.ndarray]:
+        backend = backends.get_screen_backend()
+        expired = time.perf_counter() - self._frame_start > self.ttl
+        if backend is not self._backend or (self._arrays and expired):
+            self._backend = backend
+            self.next_frame()
+            return None
+
+        x, y, width, height = rectangle
+        for (cx, cy, cwidth, cheight), array in self._arrays.items():
+            if (
+                cx <= x
+                and cy <= y
+                and x + width <= cx + cwidth
+                and y + height <= cy + cheight
+            ):
+                return array[y - cy : y - cy + height, x - cx : x - cx + width]
+        return None
+
+    def grab_array(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """Return the rectangle as a read-only (height, width, 3) uint8 array."""
+        rectangle = (x, y, width, height)
+        array = self._cached(rectangle)
+        if array is not None:
+            self.stats.cache_hits += 1
+            return array
+
+        if not self._arrays:
+            self._frame_start = time.perf_counter()
+        image = self._backend.grab(x, y, width, height)
+        array = np.asarray(image.convert("RGB"))
+        array.flags.writeable = False
+        self._arrays[rectangle] = array
+        self.stats.captures += 1
+        self.stats.bytes_captured += array.nbytes
+        return array
+
+    def grab(self, x: int, y: int, width: int, height: int) -> Image.Image:
+        """Return the rectangle as a PIL image, for consumers that need one.
+
+        Unlike grab_array() this copies the pixels.
+
+        """
+        array = self.grab_array(x, y, width, height)
+        self.stats.bytes_copied += array.nbytes
+        return Image.fromarray(array)
+
+    def checksum(self, x: int, y: int, width: int, height: int) -> int:
+        # Rows of a view are contiguous even when the view itself is not.
+        checksum = 0
+        for row in self.grab_array(x, y, width, height):
+            checksum = zlib.crc32(row, checksum)
+        return checksum
+
+
+_service: Optional[CaptureService] = None
+
+
+def get_service() -> CaptureService:
+    global _service
+    if _service is None:
+        _service = CaptureService()
+    return _service
+
+
+def set_service(service: CaptureService):
+    global _service
+    _service = service
+
+
+def next_frame():
+    get_service().next_frame()
+
+
+# Captures taken before an input show the screen before the game reacted.
+backends.add_input_listener(next_frame)
+
+
+def grab_array(x: int, y: int, width: int, height: int) -> np.ndarray:
+    return get_service().grab_array(x, y, width, height)
+
+
+def grab(x: int, y: int, width: int, height: int) -> Image.Image:
+    return get_service().grab(x, y, width, height)
+
+
+def checksum(x: int, y: int, width: int, height: int) -> int:
+    return get_service().checksum(x, y, width, height)
+
+
+def reset_stats():
+    get_service().reset_stats()
+
+
+def get_stats() -> dict:
+    return asdict(get_service().stats)
+
+
+def print_stats():
+    stats = get_service().stats
+    print(
+        f"Screen captures: {stats.captures} "
+        f"({stats.cache_hits} served from cache), "
+        f"{stats.bytes_captured / 1024:.1f} KiB captured, "
+        f"{stats.bytes_copied / 1024:.1f} KiB copied"
+    )
@@ -0,0 +1,126 @@
+"""Equip presets with global hotkeys, without starting the GUI.
+
+    python main.py daemon
+
+Ctrl+Alt+1 to Ctrl+Alt+9 equip the first nine presets (in the order of the
+GUI's preset switcher), Ctrl+Alt+Q quits and Esc cancels a running equip.
+Presets are loaded once at startup, so restart the daemon after changing
+them. Qt is never imported, which keeps startup fast and memory use low.
+
+For every equip the time from the key press to the first action of the
+equip plan is printed.
+
+"""
+
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from presets import PRESETS_DB, PresetStore, open_preset_store
+from traits import get_trait_by_name
+
+HOTKEY_TEMPLATE = "ctrl+alt+{}"
+EXIT_HOTKEY = "ctrl+alt+q"
+MAX_PRESETS = 9
+
+
+@dataclass
+class HotkeyLatency:
+    preset_name: str
+    key_to_first_action: float
+    total: float
+
+
+class HotkeyDaemon:
+    def __init__(self, presets: List[Tuple[str, list]], equip: Callable):
+        self.presets = presets[:MAX_PRESETS]
+        self.latencies: List[HotkeyLatency] = []
+        self._equip = equip
+        self._busy = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store: PresetStore, equip: Callable) -> "HotkeyDaemon":
+        presets = []
+        for name in store.list_names():
+            traits = [get_trait_by_name(trait_name) for trait_name in store.load(name)]
+            presets.append((name, [trait for trait in traits if trait is not None]))
+        return cls(presets, equip)
+
+    def trigger(self, index: int) -> Optional[threading.Thread]:
+        """Equip preset number index on a worker thread.
+
+        The keyboard hook thread calls this, so it must return right away:
+        blocking it would also stop esc from being detected.
+
+        """
+        pressed_at = time.perf_counter()
+        if not self._busy.acquire(blocking=False):
+            print("Still equipping, ignoring hotkey")
+            return None
+        thread = threading.Thread(
+            target=self._equip_preset, args=(index, pressed_at), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _equip_preset(self, index: int, pressed_at: float):
+        try:
+            name, traits = self.presets[index]
+            first_action_at = []
+
+            def _on_progress(progress):
+                if not first_action_at:
+                    first_action_at.append(time.perf_counter())
+
+            print(f"Equipping preset '{name}'")
+            self._equip(traits, progress_callback=_on_progress)
+            if first_action_at:
+                latency = HotkeyLatency(
+                    name,
+                    first_action_at[0] - pressed_at,
+                    time.perf_counter() - pressed_at,
+                )
+                self.latencies.append(latency)
+                print(
+                    f"Key press to first action: "
+                    f"{latency.key_to_first_action * 1000:.1f} ms, "
+                    f"done after {latency.total:.1f}s"
+                )
+        finally:
+            self._busy.release()
+
+    def print_latency_summary(self):
+        if not self.latencies:
+            return
+        latencies = [latency.key_to_first_action * 1000 for latency in self.latencies]
+        print(
+            f"{len(latencies)} equips, key press to first action: "
+            f"median {statistics.median(latencies):.1f} ms, "
+            f"max {max(latencies):.1f} ms"
+        )
+
+    def run(self):
+        import keyboard
+
+        for i, (name, traits) in enumerate(self.presets):
+            hotkey = HOTKEY_TEMPLATE.format(i + 1)
+            keyboard.add_hotkey(hotkey, self.trigger, args=(i,))
+            print(f"{hotkey}: {name} ({len(traits)} traits)")
+        print(f"{EXIT_HOTKEY}: quit")
+
+        keyboard.wait(EXIT_HOTKEY)
+        keyboard.unhook_all_hotkeys()
+        self.print_latency_summary()
+
+
+def run_daemon(equip: Callable, presets_filepath: str = PRESETS_DB):
+    """Equip presets with equip(traits, progress_callback) on hotkeys."""
+    store = open_preset_store(presets_filepath)
+    daemon = HotkeyDaemon.from_store(store, equip)
+    store.close()
+    if not daemon.presets:
+        print("No presets saved yet, create some in the GUI first")
+        return
+    daemon.run()
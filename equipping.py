@@ -0,0 +1,59 @@
+"""Equip a list of traits in the running game.
+
+Imports everything needed to read and drive the game screen, so entry
+points only import this module once they actually equip.
+
+"""
+
+import capture
+import optimizer
+import tracing
+import ui_automation
+import window_manager
+
+
+@tracing.traced()
+def choose_affordable_traits(selected_traits: list, mode: str) -> list:
+    """Drop traits that do not fit the upgrade points shown in game."""
+    points = ui_automation.get_upgrade_points_from_screenshot()
+    if points is None:
+        print("Upgrade points unknown, trying to equip all selected traits")
+        return list(selected_traits)
+    chosen = optimizer.choose_traits(selected_traits, points, mode)
+    skipped = [trait["name"] for trait in selected_traits if trait not in chosen]
+    if skipped:
+        print(
+            f"{points} upgrade points fit {len(chosen)} of {len(selected_traits)} "
+            f"traits ({mode}), skipping: {', '.join(skipped)}"
+        )
+    return chosen
+
+
+@ui_automation.skipped_by_escape_key
+@tracing.traced("equip")
+def equip_selected_traits(
+    selected_traits: list,
+    step_callback=None,
+    mode: str = optimizer.GREEDY,
+    progress_callback=None,
+    cancel_event=None,
+):
+    window_manager.get_game_window().reset_stats()
+    if not ui_automation.set_hunt_showdown_as_foreground_window():
+        # Hunt does not seem to run.
+        return
+    capture.reset_stats()
+    selected_traits = choose_affordable_traits(selected_traits, mode)
+    plan = ui_automation.make_equip_plan(
+        [trait["name"] for trait in selected_traits]
+    )
+    print(plan.describe())
+    equipped = ui_automation.execute_equip_plan(
+        plan,
+        step_callback=step_callback,
+        progress_callback=progress_callback,
+        cancel_event=cancel_event,
+    )
+    capture.print_stats()
+    window_manager.print_stats()
+    return equipped
@@ -1,130 +1,261 @@
 import json
 import os
 import sys
+import threading
+import time
+from collections import OrderedDict
 
+import numpy as np
 from PySide2 import QtCore, QtGui, QtWidgets
-from PySide2.QtCore import Qt, QMargins, QPoint, QRect, QSize
+from PySide2.QtCore import Qt, QRect, QSize
 from PySide2.QtWidgets import (
     QApplication,
+    QComboBox,
+    QInputDialog,
     QLabel,
-    QLayout,
+    QLineEdit,
+    QListView,
     QMainWindow,
+    QMessageBox,
     QPushButton,
     QFrame,
-    QSizePolicy,
     QHBoxLayout,
+    QStyle,
+    QStyledItemDelegate,
     QVBoxLayout,
     QWidget,
 )
 
-from traits import TRAITS, get_trait_by_name
+import persistence
+from presets import DEFAULT_PRESET_NAME, PresetStore, open_preset_store
+from search import TraitSearchIndex
+from traits import CATALOG, Selection, SelectionChange, get_trait_by_name
 
-SAVE_FILE = "hunt_showdown_trait_presets.json"
+ATLAS_IMAGE = "img/atlas.png"
+ATLAS_INDEX = "img/atlas.json"
 
+TRAIT_ICON_WIDTH = 342
+TRAIT_ICON_SIZE = QSize(TRAIT_ICON_WIDTH, TRAIT_ICON_WIDTH * 247 // 476)
 
-def save_selected_traits(selected_trait_names):
-    with open(SAVE_FILE, "w") as f:
-        f.write(json.dumps(selected_trait_names, indent=2))
 
+class TraitAtlas:
+    """All trait icons packed into one pre-scaled image, see build_assets.py."""
 
-def load_selected_traits():
-    with open(SAVE_FILE, "r") as f:
-        return json.loads(f.read())
+    def __init__(self, imagePath: str = ATLAS_IMAGE, indexPath: str = ATLAS_INDEX):
+        with open(indexPath, "r") as f:
+            self.rects = json.loads(f.read())["icons"]
+        self.pixmap = QtGui.QPixmap(imagePath)
 
+    @classmethod
+    def load(cls):
+        """Return the atlas, or None if it has not been built yet."""
+        try:
+            return cls()
+        except (OSError, ValueError, KeyError) as err:
+            print(f"No icon atlas, run build_assets.py to speed up startup: {err}")
+            return None
 
-class FlowLayout(QLayout):
-    """https://doc.qt.io/qtforpython/examples/example_widgets_layouts_flowlayout.html"""
+    def has(self, name: str) -> bool:
+        return name in self.rects
 
-    def __init__(self, parent=None):
-        super().__init__(parent)
+    def get(self, name: str, small: bool = False) -> QtGui.QPixmap:
+        x, y, width, height = self.rects[name]["small" if small else "full"]
+        return self.pixmap.copy(x, y, width, height)
 
-        if parent is not None:
-            self.setContentsMargins(QMargins(0, 0, 0, 0))
 
-        self._item_list = []
+class TraitIconCache:
+    """Get trait icons on first use, keep the most recent ones.
 
-    def __del__(self):
-        item = self.takeAt(0)
-        while item:
-            item = self.takeAt(0)
+    Icons are sliced out of the atlas if possible, otherwise decoded from
+    their own file and scaled.
 
-    def addItem(self, item):
-        self._item_list.append(item)
+    """
 
-    def count(self):
-        return len(self._item_list)
+    def __init__(
+        self,
+        maxSize: int = 128,
+        width: int = TRAIT_ICON_WIDTH,
+        pathForName: callable = lambda name: f"img/{name}.png",
+        atlas: TraitAtlas = None,
+    ):
+        self.maxSize = maxSize
+        self.width = width
+        self.pathForName = pathForName
+        self.atlas = atlas
+        self._pixmaps = OrderedDict()
+        self.decodes = 0
 
-    def itemAt(self, index):
-        if 0 <= index < len(self._item_list):
-            return self._item_list[index]
+    def get(self, name: str) -> QtGui.QPixmap:
+        pixmap = self._pixmaps.get(name)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(name)
+            return pixmap
 
-        return None
+        if self.atlas is not None and self.atlas.has(name):
+            pixmap = self.atlas.get(name)
+        else:
+            pixmap = QtGui.QPixmap(self.pathForName(name)).scaledToWidth(self.width)
+            self.decodes += 1
+        self._pixmaps[name] = pixmap
+        if len(self._pixmaps) > self.maxSize:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+
+class AvailableTraitsModel(QtCore.QAbstractListModel):
+    """List of available traits, traits that are selected are disabled.
+
+    order maps rows to positions in traits, see rankFirst().
+
+    """
 
-    def takeAt(self, index):
-        if 0 <= index < len(self._item_list):
-            return self._item_list.pop(index)
+    TraitRole = Qt.UserRole + 1
 
+    def __init__(self, traits: list, parent=None):
+        super().__init__(parent)
+        self.traits = traits
+        self.selectedNames = set()
+        self.order = np.arange(len(traits))
+        self._rowOf = np.arange(len(traits))
+        self._nameToPosition = {trait.name: i for i, trait in enumerate(traits)}
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.traits)
+
+    def traitAt(self, row: int):
+        return self.traits[self.order[row]]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        trait = self.traitAt(index.row())
+        if role == self.TraitRole:
+            return trait
+        if role == Qt.ToolTipRole:
+            return "Select: " + trait.name
+        if role == Qt.AccessibleTextRole:
+            return trait.name
         return None
 
-    def expandingDirections(self):
-        return Qt.Orientation(0)
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if self.traitAt(index.row()).name in self.selectedNames:
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled
+
+    def indexForName(self, name: str):
+        return self.index(int(self._rowOf[self._nameToPosition[name]]))
+
+    def rankFirst(self, positions: np.ndarray):
+        """Move the traits at positions to the top, in that order.
+
+        The other traits follow in their original order. Persistent indexes
+        are deliberately left alone, so they (and the rows a view hides) keep
+        pointing at the same rows.
+
+        """
+        rest = np.ones(len(self.traits), dtype=bool)
+        rest[positions] = False
+        self.layoutAboutToBeChanged.emit()
+        self.order = np.concatenate([positions, np.flatnonzero(rest)])
+        self._rowOf[self.order] = np.arange(len(self.traits))
+        self.layoutChanged.emit()
+
+    def setTraitSelected(self, name: str, selected: bool):
+        if (name in self.selectedNames) == selected:
+            return
+        if selected:
+            self.selectedNames.add(name)
+        else:
+            self.selectedNames.discard(name)
+        if name in self._nameToPosition:
+            index = self.indexForName(name)
+            self.dataChanged.emit(index, index)
 
-    def hasHeightForWidth(self):
-        return True
 
-    def heightForWidth(self, width):
-        height = self._do_layout(QRect(0, 0, width, 0), True)
-        return height
+class TraitIconDelegate(QStyledItemDelegate):
+    """Paint trait icons straight from the cache, only for visible items."""
 
-    def setGeometry(self, rect):
-        super(FlowLayout, self).setGeometry(rect)
-        self._do_layout(rect, False)
+    def __init__(self, iconCache: TraitIconCache, parent=None):
+        super().__init__(parent)
+        self.iconCache = iconCache
 
-    def sizeHint(self):
-        return self.minimumSize()
+    def sizeHint(self, option, index):
+        return TRAIT_ICON_SIZE
 
-    def minimumSize(self):
-        size = QSize()
+    def paint(self, painter, option, index):
+        trait = index.data(AvailableTraitsModel.TraitRole)
+        pixmap = self.iconCache.get(trait.name)
+        painter.save()
+        if not option.state & QStyle.State_Enabled:
+            painter.setOpacity(0.3)
+        painter.drawPixmap(option.rect.topLeft(), pixmap)
+        painter.restore()
 
-        for item in self._item_list:
-            size = size.expandedTo(item.minimumSize())
 
-        size += QSize(
-            2 * self.contentsMargins().top(), 2 * self.contentsMargins().top()
-        )
-        return size
-
-    def _do_layout(self, rect, test_only):
-        x = rect.x()
-        y = rect.y()
-        line_height = 0
-        spacing = self.spacing()
-
-        for item in self._item_list:
-            style = item.widget().style()
-            # layout_spacing_x = style.layoutSpacing(
-            #     QSizePolicy.PushButton, QSizePolicy.PushButton, Qt.Horizontal
-            # )
-            layout_spacing_y = style.layoutSpacing(
-                QSizePolicy.PushButton, QSizePolicy.PushButton, Qt.Vertical
-            )
-            # space_x = spacing + layout_spacing_x
-            space_x = 0
-            space_y = spacing + layout_spacing_y
-            next_x = x + item.sizeHint().width() + space_x
-            if next_x - space_x > rect.right() and line_height > 0:
-                x = rect.x()
-                y = y + line_height + space_y
-                next_x = x + item.sizeHint().width() + space_x
-                line_height = 0
+class TraitGridView(QListView):
+    """Grid of uniformly sized trait icons, laid out again only when needed.
+
+    QListView.Adjust lays out all items on every resize event. With uniform
+    items their positions only depend on how many columns fit, so items are
+    only laid out again when the column count changes.
+
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Fixed)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setGridSize(TRAIT_ICON_SIZE)
+        self.columnCount = 0
+        self.itemLayouts = 0
 
-            if not test_only:
-                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        columnCount = max(1, self.viewport().width() // self.gridSize().width())
+        if columnCount != self.columnCount:
+            self.columnCount = columnCount
+            self.itemLayouts += 1
+            self.scheduleDelayedItemsLayout()
 
-            x = next_x
-            line_height = max(line_height, item.sizeHint().height())
 
-        return y + line_height - rect.y()
+class EquipWorker(QtCore.QThread):
+    """Run the equip callback off the GUI thread, reporting its progress.
+
+    The callback gets a progress_callback and a cancel_event, cancel() sets
+    the latter so the run stops before its next action.
+
+    """
+
+    progressed = QtCore.Signal(object)
+    equipped = QtCore.Signal(list, float, bool)
+
+    def __init__(self, equipTraitsCallback: callable, traits: list, parent=None):
+        super().__init__(parent)
+        self.equipTraitsCallback = equipTraitsCallback
+        self.traits = traits
+        self.cancelEvent = threading.Event()
+
+    def cancel(self):
+        self.cancelEvent.set()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            equipped = self.equipTraitsCallback(
+                self.traits,
+                progress_callback=self.progressed.emit,
+                cancel_event=self.cancelEvent,
+            )
+        except Exception as err:
+            print(f"Equipping failed: {err}")
+            equipped = None
+        self.equipped.emit(
+            equipped or [], time.perf_counter() - start, self.cancelEvent.is_set()
+        )
 
 
 class MainWindow(QMainWindow):
@@ -134,55 +265,74 @@ class MainWindow(QMainWindow):
         width=(342 * 4) + 72,
         height=900,
         maximize=False,
+        traits: list = CATALOG,
+        iconCache: TraitIconCache = None,
+        presetStore: PresetStore = None,
     ):
         super().__init__()
 
         self.equipTraitsCallback = equipTraitsCallback
 
         self.orderBy = "name"
-        self.availableTraits = list(TRAITS)
-        self.selectedTraits = []
+        self.availableTraits = list(traits)
+        self.selectedTraits = Selection()
+        self.selectedTraits.subscribe(self.onSelectionChanged)
+        # Whether selection changes are written to the preset store.
+        self._commitSelectionChanges = True
+        self.presetStore = presetStore or open_preset_store()
+        self.activePresetName = self.presetStore.get_active_name()
+        self.presetWriter = persistence.DebouncedWriter(
+            self.presetStore.filepath, write=self._writePreset
+        )
 
         self.setWindowTitle("Hunt: Showdown - Trait Presets")
 
-        self.availableTraitsScrollAreaWidget = QWidget()
-        self.availableTraitsLayout = FlowLayout(self.availableTraitsScrollAreaWidget)
-
         self.selectedTraitsScrollAreaWidget = QWidget()
         self.selectedTraitsLayout = QHBoxLayout(self.selectedTraitsScrollAreaWidget)
         self.selectedTraitsLayout.setAlignment(QtCore.Qt.AlignLeft)
 
         # Lookups to map buttons to traits and vice versa.
-        self.buttonToAvailableTrait = {}
-        self.availableTraitNameToButton = {}
-
         self.buttonToSelectedTrait = {}
         self.selectedTraitNameToButton = {}
 
-        for trait in sorted(self.availableTraits, key=lambda t: t[self.orderBy]):
-            name = trait["name"]
-            pixmap = QtGui.QPixmap(f"img/{name}.png").scaledToWidth(342)
-
-            button = QPushButton("")
-            button.setStyleSheet("padding: 0; border: none;")
-            button.setToolTip("Select: " + name)
-            button.setIcon(pixmap)
-            button.setIconSize(pixmap.rect().size())
-            button.setCursor(QtGui.QCursor(Qt.PointingHandCursor))
-            button.clicked.connect(self.onAvailableTraitClicked)
+        # Icons are only decoded once their item is painted (scrolled into view).
+        # A given icon cache brings its atlas, if any.
+        if iconCache is None:
+            iconCache = TraitIconCache(atlas=TraitAtlas.load())
+        self.iconCache = iconCache
+        self.atlas = iconCache.atlas
+        self.availableTraitsModel = AvailableTraitsModel(
+            sorted(self.availableTraits, key=lambda t: getattr(t, self.orderBy)),
+            self,
+        )
 
-            self.availableTraitNameToButton[name] = button
-            self.buttonToAvailableTrait[button] = trait
+        self.availableTraitsView = TraitGridView(self)
+        self.availableTraitsView.setModel(self.availableTraitsModel)
+        self.availableTraitsView.setItemDelegate(
+            TraitIconDelegate(self.iconCache, self.availableTraitsView)
+        )
+        self.availableTraitsView.setSelectionMode(QListView.NoSelection)
+        self.availableTraitsView.setFrameShape(QFrame.NoFrame)
+        self.availableTraitsView.setStyleSheet("background: transparent;")
+        self.availableTraitsView.viewport().setCursor(
+            QtGui.QCursor(Qt.PointingHandCursor)
+        )
+        self.availableTraitsView.clicked.connect(self.onAvailableTraitIndexClicked)
 
-            self.availableTraitsLayout.addWidget(button)
+        # Built once, the model keeps its traits and only reorders rows.
+        self.searchIndex = TraitSearchIndex(self.availableTraitsModel.traits)
+        self.visibleTraitCount = len(self.availableTraitsModel.traits)
 
-        self.availableTraitsScrollArea = QtWidgets.QScrollArea(self)
-        self.availableTraitsScrollArea.setFrameShape(QFrame.NoFrame)
-        self.availableTraitsScrollArea.setWidgetResizable(True)
-        self.availableTraitsScrollArea.setWidget(self.availableTraitsScrollAreaWidget)
+        self.searchInput = QLineEdit()
+        self.searchInput.setPlaceholderText(
+            "Search names and descriptions, filter with rank:10-40 or cost:2"
+        )
+        self.searchInput.setClearButtonEnabled(True)
+        self.searchInput.setMaximumWidth(420)
+        self.searchInput.textChanged.connect(self.filterAvailableTraits)
 
         self.availableTraitsScrollableLayout = QVBoxLayout()
-        self.availableTraitsScrollableLayout.addWidget(self.availableTraitsScrollArea)
+        self.availableTraitsScrollableLayout.addWidget(self.availableTraitsView)
 
         self.selectedTraitsScrollArea = QtWidgets.QScrollArea(self)
         self.selectedTraitsScrollArea.setFrameShape(QFrame.NoFrame)
@@ -203,9 +353,29 @@ class MainWindow(QMainWindow):
         self.equipSelectedTraitsButton.setMaximumWidth(200)
         self.equipSelectedTraitsButton.setCursor(QtGui.QCursor(Qt.PointingHandCursor))
         self.equipSelectedTraitsButton.clicked.connect(self.equipSelectedTraitsInGame)
+        self.equipWorker = None
+
+        self.equipStatusLabel = QLabel("")
+
+        self.presetComboBox = QComboBox()
+        self.presetComboBox.setToolTip("Switch preset")
+        self.presetComboBox.setMinimumWidth(200)
+        self.presetComboBox.currentTextChanged.connect(self.switchPreset)
+
+        self.savePresetAsButton = QPushButton("Save As...")
+        self.savePresetAsButton.setToolTip("Save the selected traits as a new preset")
+        self.savePresetAsButton.clicked.connect(self.savePresetAs)
+
+        self.deletePresetButton = QPushButton("Delete")
+        self.deletePresetButton.setToolTip("Delete the current preset")
+        self.deletePresetButton.clicked.connect(self.deletePreset)
 
         self.selectedTraitsHeaderLayout = QHBoxLayout()
         self.selectedTraitsHeaderLayout.addWidget(self.selectedTraitsLabel)
+        self.selectedTraitsHeaderLayout.addWidget(self.presetComboBox)
+        self.selectedTraitsHeaderLayout.addWidget(self.savePresetAsButton)
+        self.selectedTraitsHeaderLayout.addWidget(self.deletePresetButton)
+        self.selectedTraitsHeaderLayout.addWidget(self.equipStatusLabel)
         self.selectedTraitsHeaderLayout.addWidget(self.equipSelectedTraitsButton)
 
         self.availableTraitsLabel = QLabel("Available Traits")
@@ -213,11 +383,15 @@ class MainWindow(QMainWindow):
             "font-size: 18px; font-weight: bold; margin-bottom: 16px;"
         )
 
+        self.availableTraitsHeaderLayout = QHBoxLayout()
+        self.availableTraitsHeaderLayout.addWidget(self.availableTraitsLabel)
+        self.availableTraitsHeaderLayout.addWidget(self.searchInput)
+
         self.mainLayout = QVBoxLayout()
         self.mainLayout.addLayout(self.selectedTraitsHeaderLayout)
         self.mainLayout.addLayout(self.selectedTraitsScrollableLayout, 1)
         self.mainLayout.addWidget(self.makeVerticalDivider())
-        self.mainLayout.addWidget(self.availableTraitsLabel)
+        self.mainLayout.addLayout(self.availableTraitsHeaderLayout)
         self.mainLayout.addLayout(self.availableTraitsScrollableLayout, 5)
 
         self.updateUi()
@@ -231,35 +405,156 @@ class MainWindow(QMainWindow):
         elif width and height:
             self.resize(width, height)
 
-        self.loadSelectedTraitsFromSaveFile()
-
-    def loadSelectedTraitsFromSaveFile(self):
+        self._updatePresetComboBox()
+        self.loadActivePreset()
+
+    def loadActivePreset(self):
+        selectedTraitNames = self.presetStore.load(self.activePresetName) or []
+        selectedTraits = []
+        for name in selectedTraitNames:
+            trait = get_trait_by_name(name)
+            if trait is None:
+                print(f"Ignoring unknown trait '{name}' in '{self.activePresetName}'")
+                continue
+            selectedTraits.append(trait)
+        self.setSelectedTraits(selectedTraits, commit=False)
+
+    def switchPreset(self, name: str):
+        if not name or name == self.activePresetName:
+            return
+        # Pending changes belong to the preset we are switching away from.
+        self.presetWriter.flush()
+        self.activePresetName = name
+        self.presetStore.set_active_name(name)
+        self.loadActivePreset()
+
+    def savePresetAs(self):
+        name, ok = QInputDialog.getText(self, "Save Preset As", "Preset name:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        if name != self.activePresetName and self.presetStore.load(name) is not None:
+            answer = QMessageBox.question(
+                self,
+                "Save Preset As",
+                f"A preset named '{name}' already exists. Replace it?",
+            )
+            if answer != QMessageBox.Yes:
+                return
+        self.presetWriter.flush()
+        self.presetStore.save(name, self.selectedTraits.names())
+        self.activePresetName = name
+        self.presetStore.set_active_name(name)
+        self._updatePresetComboBox()
+
+    def deletePreset(self):
+        self.presetWriter.flush()
+        self.presetStore.delete(self.activePresetName)
+        names = self.presetStore.list_names()
+        # Without presets left, start over with an empty default one, which
+        # is only saved once it is edited.
+        self.activePresetName = names[0] if names else DEFAULT_PRESET_NAME
+        self.presetStore.set_active_name(self.activePresetName)
+        self._updatePresetComboBox()
+        self.loadActivePreset()
+
+    def _updatePresetComboBox(self):
+        names = self.presetStore.list_names()
+        if self.activePresetName not in names:
+            names.append(self.activePresetName)
+        self.presetComboBox.blockSignals(True)
+        self.presetComboBox.clear()
+        self.presetComboBox.addItems(names)
+        self.presetComboBox.setCurrentText(self.activePresetName)
+        self.presetComboBox.blockSignals(False)
+
+    def setSelectedTraits(self, traits: list, commit: bool = True):
+        """Replace the selection, applying all changes in a single update."""
+        self._commitSelectionChanges = commit
         try:
-            selectedTraitNames = load_selected_traits()
-            selectedTraits = [get_trait_by_name(name) for name in selectedTraitNames]
-            for trait in selectedTraits:
-                self.onAvailableTraitClicked(trait, commit=False)
-        except Exception as err:
-            print(err)
+            with self.selectedTraits.batch():
+                self.selectedTraits.clear()
+                for trait in traits:
+                    self.selectedTraits.add(trait)
+        finally:
+            self._commitSelectionChanges = True
 
     def saveSelectedTraitsToFile(self):
-        try:
-            save_selected_traits([trait["name"] for trait in self.selectedTraits])
-        except Exception as err:
-            print(err)
+        # Rapid clicks are coalesced into one write on a background thread.
+        self.presetWriter.submit((self.activePresetName, self.selectedTraits.names()))
+
+    def _writePreset(self, filepath: str, value: tuple):
+        name, traitNames = value
+        self.presetStore.save(name, traitNames)
+
+    def closeEvent(self, event):
+        if self.equipWorker is not None:
+            self.equipWorker.cancel()
+            self.equipWorker.wait()
+        self.presetWriter.close()
+        super().closeEvent(event)
+
+    def onAvailableTraitIndexClicked(self, index):
+        if not index.flags() & Qt.ItemIsEnabled:
+            return
+        self.onAvailableTraitClicked(index.data(AvailableTraitsModel.TraitRole))
 
-    def onAvailableTraitClicked(self, trait=None, commit: bool = True):
-        if trait is None:
-            button = self.sender()
-            trait = self.buttonToAvailableTrait[button]
+    def onAvailableTraitClicked(self, trait):
+        self.selectedTraits.add(trait)
 
-        if trait in self.selectedTraits:
-            return
+    def filterAvailableTraits(self, query: str):
+        """Show the matches first, best first, and hide the other traits.
+
+        Matches are moved to the top rows, so only the rows between the old
+        and the new number of matches change their visibility.
+
+        """
+        positions = self.searchIndex.search_ids(query)
+        visibleCount = len(positions)
+        self.availableTraitsView.setUpdatesEnabled(False)
+        try:
+            self.availableTraitsModel.rankFirst(positions)
+            low = min(visibleCount, self.visibleTraitCount)
+            high = max(visibleCount, self.visibleTraitCount)
+            for row in range(low, high):
+                self.availableTraitsView.setRowHidden(row, row >= visibleCount)
+            self.visibleTraitCount = visibleCount
+        finally:
+            self.availableTraitsView.setUpdatesEnabled(True)
+
+    def onSelectedTraitClicked(self):
+        button = self.sender()
+        self.selectedTraits.remove(self.buttonToSelectedTrait[button].name)
+
+    def onSelectionChanged(self, changes: list):
+        """Apply selection deltas to the widgets, with one layout pass."""
+        self.selectedTraitsScrollAreaWidget.setUpdatesEnabled(False)
+        self.selectedTraitsLayout.setEnabled(False)
+        try:
+            for change in changes:
+                name = change.trait.name
+                if change.kind == SelectionChange.ADDED:
+                    self._addSelectedTraitButton(change.trait)
+                    self.availableTraitsModel.setTraitSelected(name, True)
+                else:
+                    self._removeSelectedTraitButton(name)
+                    self.availableTraitsModel.setTraitSelected(name, False)
+        finally:
+            self.selectedTraitsLayout.setEnabled(True)
+            self.selectedTraitsLayout.activate()
+            self.selectedTraitsScrollAreaWidget.setUpdatesEnabled(True)
 
-        self.selectedTraits.append(trait)
+        self._updateMainButton()
+        self._updateLabels()
+        if self._commitSelectionChanges:
+            self.updateFile()
 
-        name = trait["name"]
-        pixmap = QtGui.QPixmap(f"img/small/{name}.png")
+    def _addSelectedTraitButton(self, trait):
+        name = trait.name
+        if self.atlas is not None and self.atlas.has(name):
+            pixmap = self.atlas.get(name, small=True)
+        else:
+            pixmap = QtGui.QPixmap(f"img/small/{name}.png")
 
         button = QPushButton("")
         button.setStyleSheet("padding: 0; border: none;")
@@ -274,31 +569,50 @@ class MainWindow(QMainWindow):
 
         self.selectedTraitsLayout.addWidget(button)
 
-        self.updateUi()
-        if commit:
-            self.updateFile()
-
-    def onSelectedTraitClicked(self, commit: bool = True):
-        button = self.sender()
-        trait = self.buttonToSelectedTrait[button]
-        name = trait["name"]
-
-        # Deselect the trait
-        for i, selectedTrait in enumerate(self.selectedTraits):
-            if name == selectedTrait["name"]:
-                self.selectedTraits.pop(i)
-
-        button = self.selectedTraitNameToButton[name]
+    def _removeSelectedTraitButton(self, name: str):
+        button = self.selectedTraitNameToButton.pop(name)
+        del self.buttonToSelectedTrait[button]
         self.selectedTraitsLayout.removeWidget(button)
         button.setParent(None)
-        del button
-
-        self.updateUi()
-        if commit:
-            self.updateFile()
+        button.deleteLater()
 
     def equipSelectedTraitsInGame(self):
-        self.equipTraitsCallback(self.selectedTraits)
+        if self.equipWorker is not None:
+            self.equipWorker.cancel()
+            self.equipSelectedTraitsButton.setEnabled(False)
+            self.equipStatusLabel.setText("Cancelling...")
+            return
+
+        self.equipWorker = EquipWorker(
+            self.equipTraitsCallback, list(self.selectedTraits), self
+        )
+        self.equipWorker.progressed.connect(self.onEquipProgressed)
+        self.equipWorker.equipped.connect(self.onEquipFinished)
+        self.equipSelectedTraitsButton.setText("Cancel")
+        self.equipStatusLabel.setText("Equipping...")
+        self.equipWorker.start()
+
+    def onEquipProgressed(self, progress):
+        if progress.trait_name:
+            outcome = "equipped" if progress.succeeded else "failed"
+            current = f"{progress.trait_name} {outcome}"
+        else:
+            current = "Starting"
+        self.equipStatusLabel.setText(
+            f"{current} ({progress.done}/{progress.total}), "
+            f"{progress.elapsed:.1f}s elapsed, ~{progress.eta:.1f}s left"
+        )
+
+    def onEquipFinished(self, equipped: list, seconds: float, cancelled: bool):
+        self.equipWorker.wait()
+        self.equipWorker.deleteLater()
+        self.equipWorker = None
+        verb = "Cancelled after equipping" if cancelled else "Equipped"
+        self.equipStatusLabel.setText(
+            f"{verb} {len(equipped)} traits in {seconds:.1f}s"
+        )
+        self.equipSelectedTraitsButton.setText("Equip in Hunt: Showdown")
+        self._updateMainButton()
 
     def makeVerticalDivider(self):
         # https://stackoverflow.com/questions/5671354/
@@ -310,7 +624,7 @@ class MainWindow(QMainWindow):
 
     def _getSelectedTraitsLabelText(self):
         numTraits = len(self.selectedTraits)
-        overallCost = sum([trait["cost"] for trait in self.selectedTraits])
+        overallCost = self.selectedTraits.cost
         suffix = (
             ""
             if not self.selectedTraits
@@ -322,25 +636,30 @@ class MainWindow(QMainWindow):
         self.saveSelectedTraitsToFile()
 
     def updateUi(self):
+        """Bring every widget in line with the selection (initial state)."""
         self._updateMainButton()
         self._updateLabels()
         self._updateAvailableTraitButtons()
 
     def _updateMainButton(self):
-        self.equipSelectedTraitsButton.setEnabled(len(self.selectedTraits) > 0)
+        self.equipSelectedTraitsButton.setEnabled(
+            self.equipWorker is not None or len(self.selectedTraits) > 0
+        )
 
     def _updateLabels(self):
         self.selectedTraitsLabel.setText(self._getSelectedTraitsLabelText())
 
     def _updateAvailableTraitButtons(self):
         for trait in self.availableTraits:
-            button = self.availableTraitNameToButton[trait["name"]]
-            button.setEnabled(trait not in self.selectedTraits)
+            selected = trait in self.selectedTraits
+            self.availableTraitsModel.setTraitSelected(trait.name, selected)
 
 
-def launch_gui(equipTraitsCallback: callable):
+def launch_gui(equipTraitsCallback: callable, presetStore: PresetStore = None):
     app = QApplication(sys.argv)
-    window = MainWindow(equipTraitsCallback=equipTraitsCallback)
+    window = MainWindow(
+        equipTraitsCallback=equipTraitsCallback, presetStore=presetStore
+    )
     window.show()
 
     app.exec_()
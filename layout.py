@@ -0,0 +1,305 @@
+"""Screen positions of the Hunt UI elements for any resolution.
+
+Hunt draws its menus into a 16:9 viewport, letterboxed (or pillarboxed on
+ultrawide screens) inside the game window and scaled with it. Elements are
+therefore stored in coordinates normalized to that viewport, measured once
+on a 2560x1080 screen. Elements anchored to the left or right edge follow
+that window edge instead of the viewport.
+
+Absolute layouts are cached per (screen size, window rectangle). When the
+computed viewport does not match the game (e.g. a windowed game whose
+rectangle includes its title bar), ui_automation.calibrate_layout() locates a
+trait icon on the screen by template matching once. The icon's rectangle and
+the viewport derived from it are saved to LAYOUTS_FILE, to be used for that
+screen size and window rectangle from then on. Calibrating also checks how
+the game reacts to the pointer and to the search input, see Calibration.
+
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+import persistence
+import vision
+from backends import Rectangle
+
+LAYOUTS_FILE = "hunt_showdown_trait_presets_layouts.json"
+
+VIEWPORT_ASPECT = 16 / 9
+
+CENTER = "center"
+LEFT = "left"
+RIGHT = "right"
+
+# Element names
+UPGRADE_POINTS = "upgrade_points"
+TRAITS_SEARCH_INPUT = "traits_search_input"
+TRAITS_FIRST_MATCH = "traits_first_match"
+TRAITS_FIRST_MATCH_ICON = "traits_first_match_icon"
+TRANSACTION_FAILED_DIALOG_OK_BTN = "transaction_failed_dialog_ok_btn"
+
+# Relative icon sizes tried when calibrating.
+CALIBRATION_SCALES = np.linspace(0.7, 1.3, 13)
+MIN_CALIBRATION_SCORE = 0.8
+
+
+@dataclass
+class UIElement:
+    """A coordinate or rectangle designating a specific Hunt UI element."""
+
+    x: int
+    y: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    def region(self, half_size: int = 8) -> Tuple[int, int, int, int]:
+        """Return (x, y, width, height), a small square around points."""
+        if self.width and self.height:
+            return self.x, self.y, self.width, self.height
+        return (
+            self.x - half_size,
+            self.y - half_size,
+            2 * half_size,
+            2 * half_size,
+        )
+
+
+@dataclass(frozen=True)
+class NormalizedElement:
+    """Position and size in viewport widths/heights, see anchor for origin."""
+
+    x: float
+    y: float
+    width: Optional[float] = None
+    height: Optional[float] = None
+    anchor: str = CENTER
+
+
+def letterboxed_viewport(window: Rectangle) -> Rectangle:
+    """Return the largest centered 16:9 rectangle within the window."""
+    x, y, width, height = window
+    if width / height > VIEWPORT_ASPECT:
+        viewport_width, viewport_height = round(height * VIEWPORT_ASPECT), height
+    else:
+        viewport_width, viewport_height = width, round(width / VIEWPORT_ASPECT)
+    return (
+        x + (width - viewport_width) // 2,
+        y + (height - viewport_height) // 2,
+        viewport_width,
+        viewport_height,
+    )
+
+
+def _origin_x(anchor: str, window: Rectangle, viewport: Rectangle) -> int:
+    window_x, _, window_width, _ = window
+    return {
+        CENTER: viewport[0],
+        LEFT: window_x,
+        RIGHT: window_x + window_width,
+    }[anchor]
+
+
+REFERENCE_WINDOW = (0, 0, 2560, 1080)
+
+
+def _measured(
+    x: int,
+    y: int,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    anchor: str = CENTER,
+) -> NormalizedElement:
+    """Normalize pixel coordinates measured in REFERENCE_WINDOW."""
+    viewport = letterboxed_viewport(REFERENCE_WINDOW)
+    _, top, viewport_width, viewport_height = viewport
+    origin = _origin_x(anchor, REFERENCE_WINDOW, viewport)
+    return NormalizedElement(
+        (x - origin) / viewport_width,
+        (y - top) / viewport_height,
+        width / viewport_width if width else None,
+        height / viewport_height if height else None,
+        anchor,
+    )
+
+
+ELEMENTS: Dict[str, NormalizedElement] = {
+    UPGRADE_POINTS: _measured(422, 898, 60, 50),
+    TRAITS_SEARCH_INPUT: _measured(980, 225),
+    TRAITS_FIRST_MATCH: _measured(775, 395),
+    # Not measured: the size of the cropped icons in img/small, centered on
+    # TRAITS_FIRST_MATCH. Calibrating measures where the game shows it.
+    TRAITS_FIRST_MATCH_ICON: _measured(726, 348, 98, 94),
+    TRANSACTION_FAILED_DIALOG_OK_BTN: _measured(1235, 735),
+}
+
+
+@dataclass(frozen=True)
+class Calibration:
+    """What calibrate_layout() found out about one screen setup."""
+
+    viewport: Optional[Rectangle] = None
+    # Where the first match icon was found, in screen coordinates.
+    first_match_icon: Optional[Rectangle] = None
+    # Whether the game highlights elements under the pointer, so moves can
+    # wait for that. Assumed until calibration finds out otherwise.
+    hover_highlight: bool = True
+    # Whether typing right after double clicking the search input replaces a
+    # single-word search text. Where the pointer lands on a short text
+    # decides that, so it is not assumed before it has been tried.
+    double_click_selects_search_text: bool = False
+
+
+class Layout:
+    """Absolute UIElements for one window and viewport."""
+
+    def __init__(
+        self,
+        window: Rectangle,
+        viewport: Rectangle,
+        elements: Dict[str, NormalizedElement] = ELEMENTS,
+        calibration: Calibration = Calibration(),
+    ):
+        self.window = window
+        self.viewport = viewport
+        self.calibration = calibration
+        self.elements = {
+            name: self._place(element) for name, element in elements.items()
+        }
+        if calibration.first_match_icon:
+            self.elements[TRAITS_FIRST_MATCH_ICON] = UIElement(
+                *calibration.first_match_icon
+            )
+
+    def _place(self, element: NormalizedElement) -> UIElement:
+        _, top, viewport_width, viewport_height = self.viewport
+        origin = _origin_x(element.anchor, self.window, self.viewport)
+        return UIElement(
+            round(origin + element.x * viewport_width),
+            round(top + element.y * viewport_height),
+            round(element.width * viewport_width) if element.width else None,
+            round(element.height * viewport_height) if element.height else None,
+        )
+
+    def __getitem__(self, name: str) -> UIElement:
+        return self.elements[name]
+
+
+def _calibration_key(screen_size: Tuple[int, int], window: Rectangle) -> str:
+    return f"{screen_size[0]}x{screen_size[1]} " + ",".join(map(str, window))
+
+
+_calibrations: Optional[Dict[str, dict]] = None
+_layouts: Dict[Tuple[Tuple[int, int], Rectangle], Layout] = {}
+
+
+def _load_calibrations() -> Dict[str, dict]:
+    global _calibrations
+    if _calibrations is None:
+        _calibrations = {}
+        if os.path.isfile(LAYOUTS_FILE):
+            try:
+                with open(LAYOUTS_FILE, "r") as f:
+                    _calibrations = json.loads(f.read())
+            except ValueError as err:
+                print(f"Ignoring invalid {LAYOUTS_FILE}: {err}")
+    return _calibrations
+
+
+def get_layout(
+    screen_size: Tuple[int, int], window: Optional[Rectangle] = None
+) -> Layout:
+    """Return the (cached) layout for the game window on this screen.
+
+    Without a window rectangle the game is assumed to cover the screen.
+
+    """
+    window = tuple(window) if window else (0, 0, *screen_size)
+    key = (tuple(screen_size), window)
+    if key not in _layouts:
+        calibration = get_calibration(*key)
+        viewport = calibration.viewport or letterboxed_viewport(window)
+        _layouts[key] = Layout(window, viewport, calibration=calibration)
+    return _layouts[key]
+
+
+def get_calibration(screen_size: Tuple[int, int], window: Rectangle) -> Calibration:
+    saved = _load_calibrations().get(_calibration_key(screen_size, window))
+    if saved is None:
+        return Calibration()
+    if isinstance(saved, list):
+        # Saved when only the viewport was calibrated.
+        saved = {"viewport": saved}
+    viewport = saved.get("viewport")
+    icon = saved.get("first_match_icon")
+    return Calibration(
+        viewport=tuple(viewport) if viewport else None,
+        first_match_icon=tuple(icon) if icon else None,
+        hover_highlight=saved.get("hover_highlight", True),
+        double_click_selects_search_text=saved.get(
+            "double_click_selects_search_text", False
+        ),
+    )
+
+
+def save_calibration(
+    screen_size: Tuple[int, int], window: Rectangle, calibration: Calibration
+):
+    calibrations = _load_calibrations()
+    calibrations[_calibration_key(screen_size, window)] = asdict(calibration)
+    persistence.atomic_write_json(LAYOUTS_FILE, calibrations)
+    _layouts.pop((tuple(screen_size), tuple(window)), None)
+
+
+def find_first_match_icon(
+    screenshot: Image.Image, window: Rectangle, trait_name: str
+) -> Optional[Rectangle]:
+    """Locate where trait_name is shown as first match, in screen coordinates.
+
+    The screenshot shows the game window. Its small icon is searched for at
+    several sizes around the size the letterboxed layout predicts, in the
+    part of the window up to twice as far from its corner as predicted.
+
+    """
+    predicted = Layout(window, letterboxed_viewport(window))[TRAITS_FIRST_MATCH_ICON]
+    gray = np.asarray(screenshot.convert("L"), dtype=np.float64)
+    gray = gray[
+        : 2 * (predicted.y - window[1] + predicted.height),
+        : 2 * (predicted.x - window[0] + predicted.width),
+    ]
+    icon = Image.open(os.path.join(vision.SMALL_ICONS_DIR, f"{trait_name}.png"))
+    icon = icon.convert("L")
+
+    best = (-1.0, 0, 0, 0, 0)
+    for scale in CALIBRATION_SCALES:
+        size = (round(predicted.width * scale), round(predicted.height * scale))
+        if size[0] > gray.shape[1] or size[1] > gray.shape[0]:
+            continue
+        template = np.asarray(icon.resize(size, Image.BILINEAR), dtype=np.float64)
+        score, x, y = vision.match_template(gray, template)
+        if score > best[0]:
+            best = (score, x, y, *size)
+
+    score, x, y, width, height = best
+    if score < MIN_CALIBRATION_SCORE:
+        print(f"Could not find the icon of '{trait_name}' (best score {score:.2f})")
+        return None
+    return window[0] + x, window[1] + y, width, height
+
+
+def viewport_from_icon(icon: Rectangle) -> Rectangle:
+    """Return the viewport in which the first match icon has this rectangle."""
+    x, y, width, height = icon
+    element = ELEMENTS[TRAITS_FIRST_MATCH_ICON]
+    viewport_width = width / element.width
+    viewport_height = height / element.height
+    return (
+        round(x - element.x * viewport_width),
+        round(y - element.y * viewport_height),
+        round(viewport_width),
+        round(viewport_height),
+    )
@@ -1,24 +1,261 @@
 """Automatic trait selection in Hunt: Showdown from presets.
 
 Requirements:
-    pip install keyboard pyautogui pygetwindow pillow
+    pip install keyboard pyautogui pygetwindow pillow numpy
+
+Usage:
+    python main.py                        open the GUI
+    python main.py list                   list the saved presets
+    python main.py show-preset NAME       show the traits of a preset
+    python main.py plan NAME              show the equip actions for a preset
+    python main.py equip NAME             equip a preset in the running game
+    python main.py equip NAME --trace F   ... and write a Chrome trace to F
+    python main.py daemon                 equip presets with global hotkeys
+    python main.py calibrate [TRAIT]      calibrate UI positions (see README)
+    python main.py tune-speed             find the fastest safe input pauses
+    python main.py glyphs VALUE           cut OCR digit templates (see README)
+
+Modules are imported by the commands that need them, so e.g. listing
+presets does not load Qt, NumPy or the automation libraries.
 
 """
 
-import ui_automation
-from gui import launch_gui
+import argparse
+import sys
+
+from presets import PRESETS_DB
+
+# Mirrors optimizer.MODES, which is not imported just for the choices.
+OPTIMIZER_MODES = ("greedy", "knapsack")
+MODE_HELP = (
+    "which traits to take when not all fit: greedy takes them in preset order, "
+    "knapsack the set scoring highest, weighted by preset order"
+)
+
+
+def _open_store(args):
+    from presets import open_preset_store
+
+    return open_preset_store(args.presets)
+
+
+def _resolve_traits(trait_names: list, preset_name: str) -> list:
+    """Return the known traits of a preset, reporting the unknown ones."""
+    from traits import get_trait_by_name
+
+    traits = []
+    for name in trait_names:
+        trait = get_trait_by_name(name)
+        if trait is None:
+            print(f"Ignoring unknown trait '{name}' in '{preset_name}'")
+            continue
+        traits.append(trait)
+    return traits
+
+
+def _load_preset(args) -> list:
+    store = _open_store(args)
+    trait_names = store.load(args.name)
+    store.close()
+    if trait_names is None:
+        sys.exit(f"No preset named '{args.name}'")
+    return _resolve_traits(trait_names, args.name)
+
+
+def list_presets(args):
+    store = _open_store(args)
+    presets = store.load_all()
+    store.close()
+    for name, trait_names in presets:
+        traits = _resolve_traits(trait_names, name)
+        cost = sum(trait.cost for trait in traits)
+        print(f"{name}: {len(traits)} traits, {cost} upgrade points")
+
+
+def show_preset(args):
+    for i, trait in enumerate(_load_preset(args), 1):
+        print(f"{i:2d}. {trait.name} ({trait.cost})")
+
+
+def show_plan(args):
+    import planner
+
+    traits = _load_preset(args)
+    if args.points is not None:
+        import optimizer
+
+        traits = optimizer.choose_traits(traits, args.points, args.mode)
+    print(planner.make_equip_plan(trait.name for trait in traits).describe())
+
+
+def equip(args):
+    traits = _load_preset(args)
+    from equipping import equip_selected_traits
+
+    # A dry run stops here, after the imports, to measure startup.
+    if args.dry_run:
+        return
+    if args.trace:
+        import tracing
+
+        tracing.start()
+    try:
+        equip_selected_traits(traits, mode=args.mode)
+    finally:
+        if args.trace:
+            tracer = tracing.stop()
+            tracer.write_chrome_trace(args.trace)
+            tracer.print_summary()
+            print(f"Trace written to {args.trace}, open it in chrome://tracing")
+
+
+def run_daemon(args):
+    from daemon import run_daemon
+    from equipping import equip_selected_traits
+
+    run_daemon(equip=equip_selected_traits, presets_filepath=args.presets)
+
+
+def calibrate(args):
+    import ui_automation
+
+    if not ui_automation.calibrate_layout(args.trait):
+        sys.exit(1)
+
+
+def tune_speed(args):
+    import speed
+    import ui_automation
+
+    machine = None
+    if args.simulated:
+        import simulation
+
+        simulation.SimulatedHuntGame(
+            reaction_seconds=simulation.SIMULATED_REACTION_SECONDS
+        ).install()
+        machine = speed.SIMULATED_MACHINE
+    if ui_automation.tune_speed_profile(args.trials, machine) is None:
+        sys.exit(1)
+
+
+def save_glyphs(args):
+    import ocr
+
+    if args.synthetic:
+        filepaths = ocr.save_synthetic_samples()
+    elif args.value is None:
+        sys.exit("Give the upgrade points VALUE shown, or --synthetic")
+    else:
+        if args.image:
+            from PIL import Image
+
+            image = Image.open(args.image)
+        else:
+            import capture
+            import layout
+            import ui_automation
+
+            if not ui_automation.set_hunt_showdown_as_foreground_window():
+                sys.exit(1)
+            image = capture.grab(*ui_automation.ui(layout.UPGRADE_POINTS).region())
+        try:
+            filepaths = ocr.save_glyph_templates(image, args.value)
+        except ValueError as err:
+            sys.exit(str(err))
+    print(f"Wrote {len(filepaths)} files: {', '.join(filepaths)}")
+
+
+def launch_gui(args):
+    from equipping import equip_selected_traits
+    from gui import launch_gui
+
+    launch_gui(
+        equipTraitsCallback=equip_selected_traits, presetStore=_open_store(args)
+    )
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Equip Hunt: Showdown trait presets")
+    parser.add_argument("--presets", default=PRESETS_DB, help="presets file")
+    parser.set_defaults(command=launch_gui)
+    commands = parser.add_subparsers()
+
+    command = commands.add_parser("list", help="list the saved presets")
+    command.set_defaults(command=list_presets)
+
+    command = commands.add_parser("show-preset", help="show the traits of a preset")
+    command.add_argument("name")
+    command.set_defaults(command=show_preset)
+
+    command = commands.add_parser("plan", help="show the equip plan of a preset")
+    command.add_argument("name")
+    command.add_argument(
+        "--points", type=int, help="only plan traits that fit these upgrade points"
+    )
+    command.add_argument(
+        "--mode", choices=OPTIMIZER_MODES, default="greedy", help=MODE_HELP
+    )
+    command.set_defaults(command=show_plan)
+
+    command = commands.add_parser("equip", help="equip a preset in the game")
+    command.add_argument("name")
+    command.add_argument(
+        "--mode", choices=OPTIMIZER_MODES, default="greedy", help=MODE_HELP
+    )
+    command.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="load everything needed, but do not touch the game",
+    )
+    command.add_argument(
+        "--trace", metavar="FILE", help="write a Chrome trace of the run to FILE"
+    )
+    command.set_defaults(command=equip)
+
+    command = commands.add_parser("daemon", help="equip presets with hotkeys")
+    command.set_defaults(command=run_daemon)
+
+    command = commands.add_parser("calibrate", help="calibrate UI positions")
+    command.add_argument("trait", nargs="?", default="Doctor")
+    command.set_defaults(command=calibrate)
+
+    command = commands.add_parser(
+        "tune-speed", help="find the shortest input pauses that still work"
+    )
+    command.add_argument(
+        "--trials", type=int, default=3, help="successful trials per candidate"
+    )
+    command.add_argument(
+        "--simulated",
+        action="store_true",
+        help="tune against the simulated game instead of the running one",
+    )
+    command.set_defaults(command=tune_speed)
+
+    command = commands.add_parser(
+        "glyphs", help="cut OCR digit templates from the upgrade points shown"
+    )
+    command.add_argument("value", nargs="?", help="the upgrade points shown")
+    command.add_argument(
+        "--image", metavar="FILE", help="cut them from FILE instead of the screen"
+    )
+    command.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="write synthetic templates and benchmark crops instead",
+    )
+    command.set_defaults(command=save_glyphs)
 
+    command = commands.add_parser("gui", help="open the GUI (the default)")
+    command.set_defaults(command=launch_gui)
+    return parser
 
-def main():
-    @ui_automation.skipped_by_escape_key
-    def equip_selected_traits(selected_traits: list):
-        if not ui_automation.set_hunt_showdown_as_foreground_window():
-            # Hunt does not seem to run.
-            return
-        for trait in selected_traits:
-            ui_automation.add_trait(trait["name"])
 
-    launch_gui(equipTraitsCallback=equip_selected_traits)
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    args.command(args)
 
 
-main()
+if __name__ == "__main__":
+    main()
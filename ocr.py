@@ -0,0 +1,301 @@
+"""OCR backends used to read numbers (e.g. upgrade points) off the screen.
+
+The default backend recognizes digits in-process by matching glyphs against
+precomputed templates, the Capture2Text CLI is kept around as a fallback.
+
+Glyph templates are stored as one image per character in GLYPHS_DIR, e.g.
+'img/glyphs/0.png'. The shipped ones are synthetic (rendered with Pillow's
+font, see save_synthetic_samples()), templates cut from the game's own
+digits with save_glyph_templates() replace them:
+
+    python main.py glyphs 38
+
+Reads with unrecognized glyphs fall back to Capture2Text.
+
+"""
+
+import os
+import subprocess
+import tempfile
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+import capture
+
+CAPTURE2TEXT_CLI_BINARY = "Capture2Text/Capture2Text_CLI.exe"
+GLYPHS_DIR = "img/glyphs"
+GLYPH_CHARACTERS = "0123456789"
+# Crops of the upgrade points named after their value, for benchmarks.
+OCR_CROPS_DIR = "img/ocr_crops"
+
+# Glyphs are resampled to this size (width, height) before matching.
+GLYPH_SIZE = (10, 14)
+
+# Glyphs correlating worse than this with every template are rejected.
+MIN_GLYPH_SCORE = 0.6
+
+# Synthetic samples: the size of layout.UPGRADE_POINTS at 2560x1080, light
+# text on the dark background of the trait screen.
+SYNTHETIC_CROP_SIZE = (60, 50)
+SYNTHETIC_FONT_SIZE = 30
+SYNTHETIC_VALUES = (0, 1, 7, 12, 20, 38, 45, 69, 81, 100)
+COLOR_BACKGROUND = (24, 20, 18)
+COLOR_TEXT = (230, 220, 200)
+
+
+class OcrBackend:
+    """Interface for reading text from the screen or from an image."""
+
+    name = "base"
+
+    def read_image(self, image: Image.Image) -> str:
+        raise NotImplementedError
+
+    def read_screen_rectangle(self, x: int, y: int, width: int, height: int) -> str:
+        return self.read_image(capture.grab(x, y, width, height))
+
+
+class Capture2TextOcrBackend(OcrBackend):
+    """Run the Capture2Text CLI as a subprocess for every read.
+
+    Slow (process startup plus its own screen grab), but needs no templates.
+
+    """
+
+    name = "capture2text"
+
+    def __init__(self, binary: str = CAPTURE2TEXT_CLI_BINARY):
+        self.binary = binary
+
+    def _run(self, *args: str) -> str:
+        output = subprocess.check_output([self.binary, "-l", "English", *args])
+        return output.decode("utf-8")
+
+    def read_image(self, image: Image.Image) -> str:
+        tempdir = tempfile.gettempdir()
+        image_filepath = os.path.join(
+            tempdir, f"hunt_showdown_trait_presets_ocr_{uuid.uuid4()}.png"
+        )
+        image.save(image_filepath)
+        try:
+            return self._run("--image", image_filepath)
+        finally:
+            os.remove(image_filepath)
+
+    def read_screen_rectangle(self, x: int, y: int, width: int, height: int) -> str:
+        return self._run("--screen-rect", f"{x} {y} {x + width} {y + height}")
+
+
+def _to_grayscale_array(image: Image.Image) -> np.ndarray:
+    return np.asarray(image.convert("L"), dtype=np.float32)
+
+
+def _rgb_to_grayscale_array(rgb: np.ndarray) -> np.ndarray:
+    """Same luma weights as PIL's convert("L"), straight from an RGB array."""
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _binarize(gray: np.ndarray) -> np.ndarray:
+    """Return a boolean ink mask, assuming bright text on a dark background."""
+    low, high = gray.min(), gray.max()
+    if high - low < 1:
+        return np.zeros(gray.shape, dtype=bool)
+    return gray > (low + high) / 2
+
+
+def _split_glyphs(ink: np.ndarray) -> List[np.ndarray]:
+    """Split an ink mask into per-character masks using column projection."""
+    columns = ink.any(axis=0)
+    if not columns.any():
+        return []
+
+    # Indices where runs of inked columns start and stop.
+    padded = np.concatenate(([False], columns, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, stops = edges[::2], edges[1::2]
+
+    glyphs = []
+    for start, stop in zip(starts, stops):
+        glyph = ink[:, start:stop]
+        rows = np.flatnonzero(glyph.any(axis=1))
+        glyphs.append(glyph[rows[0] : rows[-1] + 1])
+    return glyphs
+
+
+def _glyph_vectors(glyphs: List[np.ndarray]) -> np.ndarray:
+    """Resample glyph masks to GLYPH_SIZE and return them as unit row vectors."""
+    width, height = GLYPH_SIZE
+    vectors = np.empty((len(glyphs), width * height), dtype=np.float32)
+    for i, glyph in enumerate(glyphs):
+        rows = np.arange(height) * glyph.shape[0] // height
+        cols = np.arange(width) * glyph.shape[1] // width
+        vectors[i] = glyph[np.ix_(rows, cols)].ravel()
+
+    vectors -= vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+class TemplateOcrBackend(OcrBackend):
+    """Recognize digits in-process by correlating glyphs with templates.
+
+    All glyphs of a crop are scored against all templates with a single
+    matrix product.
+
+    """
+
+    name = "template"
+
+    def __init__(self, templates: Dict[str, np.ndarray]):
+        if not templates:
+            raise ValueError("At least one glyph template is required")
+        self.characters = list(templates.keys())
+        self.template_matrix = _glyph_vectors(list(templates.values()))
+
+    @classmethod
+    def from_directory(cls, directory: str = GLYPHS_DIR) -> "TemplateOcrBackend":
+        templates = {}
+        for character in GLYPH_CHARACTERS:
+            filepath = os.path.join(directory, f"{character}.png")
+            if not os.path.isfile(filepath):
+                continue
+            gray = _to_grayscale_array(Image.open(filepath))
+            glyphs = _split_glyphs(_binarize(gray))
+            if len(glyphs) != 1:
+                raise ValueError(f"Expected a single glyph in {filepath}")
+            templates[character] = glyphs[0]
+        return cls(templates)
+
+    def read_image(self, image: Image.Image) -> str:
+        return self._read_grayscale(_to_grayscale_array(image))
+
+    def read_screen_rectangle(self, x: int, y: int, width: int, height: int) -> str:
+        # Works on the captured pixels directly, without an image copy.
+        rgb = capture.grab_array(x, y, width, height)
+        return self._read_grayscale(_rgb_to_grayscale_array(rgb))
+
+    def _read_grayscale(self, gray: np.ndarray) -> str:
+        glyphs = _split_glyphs(_binarize(gray))
+        if not glyphs:
+            return ""
+
+        scores = _glyph_vectors(glyphs) @ self.template_matrix.T
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(glyphs)), best]
+        return "".join(
+            self.characters[index] if score >= MIN_GLYPH_SCORE else "?"
+            for index, score in zip(best, best_scores)
+        )
+
+
+def save_glyph_templates(
+    image: Image.Image, text: str, directory: str = GLYPHS_DIR
+) -> List[str]:
+    """Cut a crop showing a known value (e.g. '38') into glyph templates."""
+    gray = _to_grayscale_array(image)
+    glyphs = _split_glyphs(_binarize(gray))
+    if len(glyphs) != len(text):
+        raise ValueError(f"Found {len(glyphs)} glyphs, but expected '{text}'")
+
+    os.makedirs(directory, exist_ok=True)
+    filepaths = []
+    for character, glyph in zip(text, glyphs):
+        filepath = os.path.join(directory, f"{character}.png")
+        Image.fromarray((glyph * 255).astype(np.uint8)).save(filepath)
+        filepaths.append(filepath)
+    return filepaths
+
+
+def render_synthetic_crop(text: str, offset: Tuple[int, int] = (6, 8)) -> Image.Image:
+    """Draw text like the game shows the upgrade points, in Pillow's font."""
+    from PIL import ImageDraw, ImageFont
+
+    image = Image.new("RGB", SYNTHETIC_CROP_SIZE, COLOR_BACKGROUND)
+    font = ImageFont.load_default(size=SYNTHETIC_FONT_SIZE)
+    ImageDraw.Draw(image).text(offset, text, fill=COLOR_TEXT, font=font)
+    return image
+
+
+def save_synthetic_samples(
+    glyphs_directory: str = GLYPHS_DIR, crops_directory: str = OCR_CROPS_DIR
+) -> List[str]:
+    """Write synthetic glyph templates and crops of SYNTHETIC_VALUES."""
+    filepaths = []
+    for character in GLYPH_CHARACTERS:
+        filepaths += save_glyph_templates(
+            render_synthetic_crop(character), character, glyphs_directory
+        )
+
+    os.makedirs(crops_directory, exist_ok=True)
+    for i, value in enumerate(SYNTHETIC_VALUES):
+        # Shifted a little, the upgrade points are not always in one place.
+        image = render_synthetic_crop(str(value), (3 + i % 5, 6 + i % 4))
+        filepath = os.path.join(crops_directory, f"{value}.png")
+        image.save(filepath)
+        filepaths.append(filepath)
+    return filepaths
+
+
+class FallbackOcrBackend(OcrBackend):
+    """Read with one backend, use another when it did not recognize all."""
+
+    def __init__(self, backend: OcrBackend, fallback: OcrBackend):
+        self.backend = backend
+        self.fallback = fallback
+        self.name = f"{backend.name}+{fallback.name}"
+
+    def _recognized(self, text: str) -> bool:
+        return bool(text) and "?" not in text
+
+    def read_image(self, image: Image.Image) -> str:
+        text = self.backend.read_image(image)
+        if self._recognized(text):
+            return text
+        return self.fallback.read_image(image)
+
+    def read_screen_rectangle(self, x: int, y: int, width: int, height: int) -> str:
+        text = self.backend.read_screen_rectangle(x, y, width, height)
+        if self._recognized(text):
+            return text
+        return self.fallback.read_screen_rectangle(x, y, width, height)
+
+
+_backend: Optional[OcrBackend] = None
+
+
+def get_backend() -> OcrBackend:
+    """Return the in-process backend (with Capture2Text as its fallback).
+
+    Capture2Text alone is used if there are no glyph templates.
+
+    """
+    global _backend
+    if _backend is None:
+        try:
+            _backend = FallbackOcrBackend(
+                TemplateOcrBackend.from_directory(), Capture2TextOcrBackend()
+            )
+        except ValueError as err:
+            print(f"Falling back to Capture2Text OCR: {err}")
+            _backend = Capture2TextOcrBackend()
+    return _backend
+
+
+def set_backend(backend: OcrBackend):
+    global _backend
+    _backend = backend
+
+
+def get_backends() -> Tuple[OcrBackend, ...]:
+    """Return every backend that can be constructed in this environment."""
+    available = []
+    try:
+        available.append(TemplateOcrBackend.from_directory())
+    except ValueError as err:
+        print(f"Template OCR unavailable: {err}")
+    available.append(Capture2TextOcrBackend())
+    return tuple(available)
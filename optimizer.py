@@ -0,0 +1,77 @@
+"""Pick the traits to equip within the available upgrade points.
+
+Deciding this up front means no equip attempt ever runs into the
+"transaction failed" dialog.
+
+- greedy: walk the traits in priority order, take each one that still fits.
+- knapsack: take the affordable set with the highest overall score. The
+  priority order is the only weighting: of n traits the first scores n, the
+  last 1. So two traits further down can win over one near the top that
+  costs as much as both.
+
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+GREEDY = "greedy"
+KNAPSACK = "knapsack"
+MODES = (GREEDY, KNAPSACK)
+
+
+def choose_greedy(traits: Sequence, budget: int) -> List:
+    chosen = []
+    remaining = budget
+    for trait in traits:
+        if trait["cost"] <= remaining:
+            chosen.append(trait)
+            remaining -= trait["cost"]
+    return chosen
+
+
+def priority_weights(traits: Sequence) -> Dict[str, float]:
+    """Weight traits by position, the first one weighing the most."""
+    return {trait["name"]: float(len(traits) - i) for i, trait in enumerate(traits)}
+
+
+def choose_knapsack(traits: Sequence, budget: int) -> List:
+    """Return the affordable subset with maximum total weight, in input order.
+
+    Traits are weighted by priority_weights(). 0/1 knapsack by dynamic
+    programming over the budget, one vectorized update per trait:
+    O(len(traits) * budget) work in NumPy.
+
+    """
+    if budget <= 0 or not traits:
+        return []
+    weights = priority_weights(traits)
+
+    costs = np.array([trait["cost"] for trait in traits], dtype=np.int64)
+    values = np.array([weights.get(trait["name"], 0.0) for trait in traits])
+
+    best = np.zeros(budget + 1)
+    taken = np.zeros((len(traits), budget + 1), dtype=bool)
+    for i, (cost, value) in enumerate(zip(costs, values)):
+        if cost > budget or value <= 0:
+            continue
+        with_trait = np.full(budget + 1, -np.inf)
+        with_trait[cost:] = best[: budget + 1 - cost] + value
+        taken[i] = with_trait > best
+        best = np.maximum(best, with_trait)
+
+    chosen = np.zeros(len(traits), dtype=bool)
+    remaining = int(best.argmax())
+    for i in range(len(traits) - 1, -1, -1):
+        if taken[i, remaining]:
+            chosen[i] = True
+            remaining -= int(costs[i])
+    return [trait for trait, take in zip(traits, chosen) if take]
+
+
+def choose_traits(traits: Sequence, budget: int, mode: str = GREEDY) -> List:
+    if mode == GREEDY:
+        return choose_greedy(traits, budget)
+    if mode == KNAPSACK:
+        return choose_knapsack(traits, budget)
+    raise ValueError(f"Unknown optimizer mode '{mode}', expected one of {MODES}")
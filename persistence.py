@@ -0,0 +1,159 @@
+"""Crash-safe, debounced saving of state to disk.
+
+atomic_write() writes to a temporary file next to the target and renames it
+over the target, so the file either holds the old or the new content, never
+a truncated mix. The file keeps its permissions.
+
+DebouncedWriter takes values from the GUI thread and writes only the latest
+one, on a background thread, once no new value arrived for `delay` seconds.
+Pending values are flushed on close() and at interpreter exit.
+
+"""
+
+import atexit
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+DEFAULT_DELAY = 0.5
+
+_NOTHING = object()
+
+# Read once, setting the umask to read it is not thread-safe.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(filepath: str) -> int:
+    """Permissions of the file, or those open() would give a new one."""
+    try:
+        return stat.S_IMODE(os.stat(filepath).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write(filepath: str, text: Union[str, bytes]):
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_filepath = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(filepath)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb" if isinstance(text, bytes) else "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp() creates the file readable by its owner only.
+        os.chmod(temp_filepath, _file_mode(filepath))
+        os.replace(temp_filepath, filepath)
+    except BaseException:
+        os.remove(temp_filepath)
+        raise
+
+
+def atomic_write_json(filepath: str, value: Any):
+    atomic_write(filepath, json.dumps(value, indent=2))
+
+
+class DebouncedWriter:
+    def __init__(
+        self,
+        filepath: str,
+        delay: float = DEFAULT_DELAY,
+        write: Callable[[str, Any], None] = atomic_write_json,
+    ):
+        self.filepath = filepath
+        self.delay = delay
+        self._write = write
+        self.writes = 0
+
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending = _NOTHING
+        # Sequence numbers make sure an older value never overwrites a newer one.
+        self._submitted = 0
+        self._written = 0
+        self._deadline = 0.0
+        self._closed = False
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"DebouncedWriter({filepath})", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, value: Any):
+        """Schedule value to be written, replacing any not yet written value."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("DebouncedWriter is closed")
+            self._submitted += 1
+            self._pending = (self._submitted, value)
+            self._deadline = time.monotonic() + self.delay
+            self._condition.notify()
+
+    def _take_pending(self) -> Any:
+        pending, self._pending = self._pending, _NOTHING
+        return pending
+
+    def _write_pending(self, pending):
+        """Write a taken value, the caller holds _write_lock."""
+        sequence, value = pending
+        if sequence <= self._written:
+            return
+        try:
+            self._write(self.filepath, value)
+            self.writes += 1
+            self._written = sequence
+        except Exception as err:
+            print(f"Could not write {self.filepath}: {err}")
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is _NOTHING and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                # Wait until no new value arrived for `delay` seconds.
+                remaining = self._deadline - time.monotonic()
+                while remaining > 0 and not self._closed:
+                    self._condition.wait(remaining)
+                    remaining = self._deadline - time.monotonic()
+                if self._closed:
+                    return
+                pending = self._take_pending()
+                # Locked before the value is out of _pending, so flush()
+                # cannot miss this write.
+                self._write_lock.acquire()
+            try:
+                if pending is not _NOTHING:
+                    self._write_pending(pending)
+            finally:
+                self._write_lock.release()
+
+    def flush(self):
+        """Write a pending value right away, on the calling thread.
+
+        A write in progress on the background thread is waited for, so the
+        file is not written to anymore when this returns.
+
+        """
+        with self._condition:
+            pending = self._take_pending()
+        with self._write_lock:
+            if pending is not _NOTHING:
+                self._write_pending(pending)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        self.flush()
+        atexit.unregister(self.close)
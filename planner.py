@@ -0,0 +1,217 @@
+"""Turn a list of selected traits into an optimized equip action plan.
+
+Each trait is searched for by the shortest text that still finds only that
+trait (computed with a trie over all trait names), traits selected twice are
+skipped, and clears of the search input that would not change anything are
+dropped.
+
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from traits import TRAITS
+
+# Rough duration of each action kind in seconds, used for estimates only.
+# Most of it is pyautogui.PAUSE (0.1s) applied after every pyautogui call.
+ACTION_SECONDS = {
+    "move": 0.15,
+    "double_click": 0.1,
+    "clear": 0.2,
+    "type": 0.1,
+    "enter": 0.1,
+    "verify": 0.05,
+    "confirm": 0.05,
+}
+SECONDS_PER_KEYSTROKE = 0.01
+
+
+@dataclass
+class Action:
+    kind: str
+    target: Optional[str] = None
+    text: Optional[str] = None
+
+    def estimated_seconds(self) -> float:
+        seconds = ACTION_SECONDS[self.kind]
+        if self.text:
+            seconds += len(self.text) * SECONDS_PER_KEYSTROKE
+        return seconds
+
+
+@dataclass
+class TraitStep:
+    trait_name: str
+    search_text: str
+    actions: List[Action] = field(default_factory=list)
+
+    def estimated_seconds(self) -> float:
+        return sum(action.estimated_seconds() for action in self.actions)
+
+
+@dataclass
+class EquipPlan:
+    steps: List[TraitStep]
+    skipped: List[str]
+
+    @property
+    def actions(self) -> List[Action]:
+        return [action for step in self.steps for action in step.actions]
+
+    def action_count(self) -> int:
+        return len(self.actions)
+
+    def keystroke_count(self) -> int:
+        return sum(len(action.text or "") for action in self.actions)
+
+    def estimated_seconds(self) -> float:
+        return sum(action.estimated_seconds() for action in self.actions)
+
+    def describe(self) -> str:
+        searches = ", ".join(
+            f"{step.trait_name} ('{step.search_text}')" for step in self.steps
+        )
+        return (
+            f"Equip plan: {len(self.steps)} traits, {self.action_count()} actions, "
+            f"{self.keystroke_count()} keystrokes, "
+            f"~{self.estimated_seconds():.1f}s: {searches}"
+        )
+
+
+class _TrieNode:
+    __slots__ = ("children", "count")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.count = 0
+
+
+class PrefixTrie:
+    """Trie counting how many words pass through each prefix."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.root = _TrieNode()
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word: str):
+        node = self.root
+        for character in word:
+            node = node.children.setdefault(character, _TrieNode())
+            node.count += 1
+
+    def shortest_unique_prefix(self, word: str) -> str:
+        """Return the shortest prefix no other word shares, or the word itself."""
+        node = self.root
+        for i, character in enumerate(word):
+            node = node.children[character]
+            if node.count == 1:
+                return word[: i + 1]
+        return word
+
+
+def compute_search_texts(names: Iterable[str]) -> Dict[str, str]:
+    """Map each name to the shortest search text that only matches itself.
+
+    The game might match search texts anywhere in a name, not only at its
+    start, so unique prefixes are extended until no other name contains them.
+
+    """
+    names = list(names)
+    lowered = {name: name.lower() for name in names}
+    trie = PrefixTrie(lowered.values())
+
+    search_texts = {}
+    for name in names:
+        word = lowered[name]
+        others = [other for other in lowered.values() if other != word]
+        length = len(trie.shortest_unique_prefix(word))
+        while length < len(word) and any(word[:length] in o for o in others):
+            length += 1
+        search_texts[name] = word[:length]
+    return search_texts
+
+
+_search_texts: Optional[Dict[str, str]] = None
+
+
+def get_search_text(trait_name: str) -> str:
+    global _search_texts
+    if _search_texts is None:
+        _search_texts = compute_search_texts(trait["name"] for trait in TRAITS)
+    return _search_texts.get(trait_name, trait_name)
+
+
+class _ActionOptimizer:
+    """Drop clears of a search input whose text the double click selected.
+
+    Only done once calibration has confirmed that double clicking the search
+    input selects a single-word search text, see layout.Calibration. Typing
+    then replaces the previous search text without a clear if that was a
+    single word. What the input holds before the first search is unknown, so
+    that one is always cleared.
+
+    """
+
+    def __init__(self, double_click_selects_search_text: bool = False):
+        self.double_click_selects_search_text = double_click_selects_search_text
+        self.search_text: Optional[str] = None
+
+    def _text_is_selected(self) -> bool:
+        return (
+            self.double_click_selects_search_text
+            and self.search_text is not None
+            and " " not in self.search_text
+        )
+
+    def optimize(self, actions: Iterable[Action]) -> List[Action]:
+        optimized = []
+        for action in actions:
+            if action.kind == "clear":
+                if self._text_is_selected():
+                    continue
+            elif action.kind == "type":
+                self.search_text = action.text
+            optimized.append(action)
+        return optimized
+
+
+def _make_trait_actions(search_text: str) -> List[Action]:
+    return [
+        Action("move", target="search_input"),
+        Action("double_click"),
+        Action("clear"),
+        Action("type", text=search_text),
+        Action("enter"),
+        Action("verify"),
+        Action("move", target="first_match"),
+        Action("double_click", target="first_match"),
+        Action("confirm"),
+    ]
+
+
+def make_equip_plan(
+    trait_names: Iterable[str], double_click_selects_search_text: bool = False
+) -> EquipPlan:
+    """Plan the actions to equip the given traits in order.
+
+    The search input is cleared before every search unless
+    double_click_selects_search_text, as calibrated for the screen setup.
+
+    """
+    optimizer = _ActionOptimizer(double_click_selects_search_text)
+    seen = set()
+    steps = []
+    skipped = []
+
+    for name in trait_names:
+        if name in seen:
+            skipped.append(name)
+            continue
+        seen.add(name)
+
+        search_text = get_search_text(name)
+        actions = optimizer.optimize(_make_trait_actions(search_text))
+        steps.append(TraitStep(name, search_text, actions))
+
+    return EquipPlan(steps=steps, skipped=skipped)
@@ -0,0 +1,134 @@
+"""Named trait presets stored in a SQLite file.
+
+Each preset is one row, so listing presets only reads their names and
+loading one only parses that preset's trait list, no matter how many
+presets are stored. load_all() reads every preset with a single query.
+
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+PRESETS_DB = "hunt_showdown_trait_presets.sqlite3"
+DEFAULT_PRESET_NAME = "Default"
+# Single preset save file of older versions, imported into the preset store.
+LEGACY_SAVE_FILE = "hunt_showdown_trait_presets.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    name TEXT PRIMARY KEY,
+    trait_names TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class PresetStore:
+    """Thread-safe access to the presets file.
+
+    Saves happen on the persistence thread while the GUI thread reads, so a
+    single connection is shared behind a lock.
+
+    """
+
+    def __init__(self, filepath: str = PRESETS_DB):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filepath, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def list_names(self) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name FROM presets ORDER BY name COLLATE NOCASE"
+            ).fetchall()
+        return [name for (name,) in rows]
+
+    def load_all(self) -> List[Tuple[str, List[str]]]:
+        """Return the name and trait names of every preset, ordered by name."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name, trait_names FROM presets ORDER BY name COLLATE NOCASE"
+            ).fetchall()
+        return [(name, json.loads(trait_names)) for name, trait_names in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            row = self._connection.execute("SELECT COUNT(*) FROM presets").fetchone()
+        return row[0]
+
+    def load(self, name: str) -> Optional[List[str]]:
+        """Return the trait names of a preset, or None if it does not exist."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT trait_names FROM presets WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def save(self, name: str, trait_names: List[str]):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO presets (name, trait_names, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET "
+                "trait_names = excluded.trait_names, updated_at = excluded.updated_at",
+                (name, json.dumps(list(trait_names)), time.time()),
+            )
+
+    def delete(self, name: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM presets WHERE name = ?", (name,))
+
+    def get_setting(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM settings WHERE key = ?", (key,)
+            ).fetchone()
+        return default if row is None else row[0]
+
+    def set_setting(self, key: str, value: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    def get_active_name(self) -> str:
+        return self.get_setting("active_preset", DEFAULT_PRESET_NAME)
+
+    def set_active_name(self, name: str):
+        self.set_setting("active_preset", name)
+
+    def import_json_file(self, filepath: str, name: str = DEFAULT_PRESET_NAME) -> bool:
+        """Import a single-preset JSON file (the old save file format)."""
+        if not os.path.isfile(filepath):
+            return False
+        with open(filepath, "r") as f:
+            trait_names = json.loads(f.read())
+        self.save(name, trait_names)
+        return True
+
+
+def open_preset_store(filepath: str = PRESETS_DB) -> PresetStore:
+    """Open the presets file, importing the legacy save file into a new one."""
+    store = PresetStore(filepath)
+    if not store.count():
+        try:
+            store.import_json_file(LEGACY_SAVE_FILE)
+        except (OSError, ValueError) as err:
+            print(err)
+    return store
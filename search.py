@@ -0,0 +1,126 @@
+"""Search traits as you type.
+
+TraitSearchIndex maps every prefix of every word of the trait names and
+descriptions (their edge n-grams) to the traits containing it, so a query
+word is a single dict lookup, whether it is complete or still being typed.
+Matches of all query words are intersected and ranked with NumPy:
+
+- a name starting with the word ranks highest, then a later word of the
+  name, then a word of the description;
+- whole words rank above prefixes;
+- ties keep the catalog order.
+
+Besides words, a query may filter by rank and cost: "rank:10-40", "cost:2".
+
+"""
+
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+NAME_START_SCORE = 8
+NAME_WORD_SCORE = 4
+DESCRIPTION_SCORE = 1
+
+RANGE_FIELDS = ("rank", "cost")
+
+_WORD = re.compile(r"[a-z0-9]+")
+_RANGE = re.compile(r"^(rank|cost):(\d+)(?:-(\d+))?$")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _edge_ngrams(words: Sequence[str], first_score: int, score: int) -> dict:
+    """Return the best score of every prefix of the words."""
+    scores = {}
+    for position, word in enumerate(words):
+        word_score = first_score if position == 0 else score
+        for end in range(1, len(word) + 1):
+            prefix = word[:end]
+            prefix_score = word_score + (end == len(word))
+            if scores.get(prefix, 0) < prefix_score:
+                scores[prefix] = prefix_score
+    return scores
+
+
+def parse_query(query: str) -> Tuple[List[str], List[Tuple[str, int, int]]]:
+    """Split a query into words and (field, low, high) range filters."""
+    words = []
+    ranges = []
+    for term in query.lower().split():
+        match = _RANGE.match(term)
+        if match:
+            field, low, high = match.groups()
+            ranges.append((field, int(low), int(high or low)))
+        else:
+            words.extend(_words(term))
+    return words, ranges
+
+
+class TraitSearchIndex:
+    """Ranked search over a fixed list of traits, built once up front."""
+
+    def __init__(self, traits: Sequence):
+        self.traits = list(traits)
+        self.all_ids = np.arange(len(self.traits))
+        self.values = {
+            field: np.array([trait[field] for trait in self.traits], dtype=np.int64)
+            for field in RANGE_FIELDS
+        }
+
+        # Many traits may share a description, tokenize each text once.
+        description_ngrams: Dict[str, dict] = {}
+        postings: Dict[str, Tuple[list, list]] = {}
+        for trait_id, trait in enumerate(self.traits):
+            description = trait["description"]
+            if description not in description_ngrams:
+                description_ngrams[description] = _edge_ngrams(
+                    _words(description), DESCRIPTION_SCORE, DESCRIPTION_SCORE
+                )
+            scores = dict(description_ngrams[description])
+            name_ngrams = _edge_ngrams(
+                _words(trait["name"]), NAME_START_SCORE, NAME_WORD_SCORE
+            )
+            for prefix, score in name_ngrams.items():
+                if scores.get(prefix, 0) < score:
+                    scores[prefix] = score
+            for prefix, score in scores.items():
+                ids, prefix_scores = postings.setdefault(prefix, ([], []))
+                ids.append(trait_id)
+                prefix_scores.append(score)
+
+        self.postings = {
+            prefix: (np.array(ids, dtype=np.intp), np.array(scores, dtype=np.int32))
+            for prefix, (ids, scores) in postings.items()
+        }
+
+    def search_ids(self, query: str) -> np.ndarray:
+        """Return the positions of the matching traits, best match first."""
+        words, ranges = parse_query(query)
+        if not words and not ranges:
+            return self.all_ids
+
+        matched = np.ones(len(self.traits), dtype=bool)
+        for field, low, high in ranges:
+            values = self.values[field]
+            matched &= (values >= low) & (values <= high)
+
+        total = np.zeros(len(self.traits), dtype=np.int32)
+        for word in words:
+            posting = self.postings.get(word)
+            if posting is None:
+                return self.all_ids[:0]
+            ids, scores = posting
+            word_matched = np.zeros(len(self.traits), dtype=bool)
+            word_matched[ids] = True
+            matched &= word_matched
+            total[ids] += scores
+
+        ids = np.flatnonzero(matched)
+        return ids[np.argsort(-total[ids], kind="stable")]
+
+    def search(self, query: str) -> List:
+        return [self.traits[i] for i in self.search_ids(query)]
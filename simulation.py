@@ -0,0 +1,320 @@
+"""A simulated Hunt: Showdown trait selection screen.
+
+SimulatedHuntGame keeps the state of the trait screen (search text, equipped
+traits, upgrade points, failure dialog) and renders it into a fake screen.
+Its input_backend reacts to moves, clicks and typing at the layout positions
+for its screen size, its screen_backend serves the rendered pixels, so the
+real automation code runs against it unchanged:
+
+    game = SimulatedHuntGame(upgrade_points=20)
+    game.install()
+    equipping.equip_selected_traits([get_trait_by_name("Doctor")])
+
+The screen shows each change screen_delay real seconds after the input that
+caused it, like a game that needs a few frames to react, so waits that read
+the screen too early see the old state.
+
+Given reaction_seconds, the game ignores clicks and keys that arrive sooner
+after the previous input (on the virtual clock of the input backend) than
+that input needs, like a busy game drops inputs. This gives speed tuning
+(ui_automation.tune_speed_profile) something to find. Without
+hover_highlight the game does not highlight the elements under the pointer.
+
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+import backends
+import layout
+import ocr
+import vision
+from traits import TRAITS, get_trait_by_name
+
+COLOR_BACKGROUND = (24, 20, 18)
+COLOR_HOVER = (255, 255, 255)
+COLOR_DIALOG_BUTTON = (200, 40, 40)
+COLOR_TEXT = (230, 220, 200)
+
+# How far from an element's coordinate a click still hits it.
+HIT_RADIUS = 20
+
+# The search text starts this far left of the search input's coordinate, in
+# characters this wide. A double click selects the word under the pointer,
+# or nothing past the end of the text, so double clicking the coordinate only
+# selects search texts of more than 15 characters.
+SEARCH_TEXT_LEFT = 150
+SEARCH_CHAR_WIDTH = 10
+
+# Real seconds until the screen shows the reaction to an input.
+SIMULATED_SCREEN_DELAY = 0.05
+
+# Time the game needs after an input of each kind before it takes the next.
+SIMULATED_REACTION_SECONDS = {
+    "move_to": 0.02,
+    "click": 0.03,
+    "double_click": 0.03,
+    "hotkey": 0.02,
+    "press": 0.01,
+    "write": 0.05,
+}
+
+
+class SimulatedHuntGame:
+    def __init__(
+        self,
+        upgrade_points: int = 100,
+        screen_size: Tuple[int, int] = (2560, 1080),
+        equipped: Tuple[str, ...] = (),
+        reaction_seconds: Optional[Dict[str, float]] = None,
+        screen_delay: float = SIMULATED_SCREEN_DELAY,
+        hover_highlight: bool = True,
+    ):
+        self.upgrade_points = upgrade_points
+        self.reaction_seconds = reaction_seconds or {}
+        self.dropped_inputs = 0
+        self._busy_until = 0.0
+        self.screen_size = screen_size
+        self.layout = layout.get_layout(screen_size)
+        self.equipped: List[str] = list(equipped)
+        self.failed_attempts = 0
+
+        self.search_text = ""
+        self.search_input_focused = False
+        # (start, end) of the selected part of the search text.
+        self.search_selection: Optional[Tuple[int, int]] = None
+        self.results: List[str] = sorted(trait["name"] for trait in TRAITS)
+        self.dialog_open = False
+        self.pointer = (0, 0)
+
+        self.screen_delay = screen_delay
+        self.hover_highlight = hover_highlight
+        self._icons = {}
+        self._frame = self._render_state()
+        # (real time it is shown at, frame), in the order of the changes.
+        self._pending_frames: List[Tuple[float, Image.Image]] = []
+
+        self.input_backend = _SimulatedGameInputBackend(self, screen_size)
+        self.screen_backend = _SimulatedGameScreenBackend(self)
+
+    def install(self):
+        """Make ui_automation use this game's input and screen backends."""
+        backends.set_input_backend(self.input_backend)
+        backends.set_screen_backend(self.screen_backend)
+        ocr.set_backend(_SimulatedGameOcrBackend(self))
+
+    # Input handling
+
+    def block_inputs(self, action: str, at: float):
+        busy_until = at + self.reaction_seconds.get(action, 0.0)
+        self._busy_until = max(self._busy_until, busy_until)
+
+    def accepts_input(self, action: str, at: float) -> bool:
+        """Whether an input at virtual time at registers (or is dropped)."""
+        # Tolerate rounding errors of the virtual clock.
+        if at + 1e-9 < self._busy_until:
+            self.dropped_inputs += 1
+            return False
+        self.block_inputs(action, at)
+        return True
+
+    def _hits(self, element: layout.UIElement) -> bool:
+        x, y = self.pointer
+        return abs(x - element.x) <= HIT_RADIUS and abs(y - element.y) <= HIT_RADIUS
+
+    def _changed(self):
+        shown_at = time.perf_counter() + self.screen_delay
+        self._pending_frames.append((shown_at, self._render_state()))
+
+    def on_move(self, x: int, y: int):
+        self.pointer = (x, y)
+        self._changed()
+
+    def on_click(self, double: bool):
+        if self.dialog_open:
+            if self._hits(self.layout[layout.TRANSACTION_FAILED_DIALOG_OK_BTN]):
+                self.dialog_open = False
+                self._changed()
+            return
+
+        if self._hits(self.layout[layout.TRAITS_SEARCH_INPUT]):
+            self.search_input_focused = True
+            self.search_selection = self._word_at_pointer() if double else None
+        elif self._hits(self.layout[layout.TRAITS_FIRST_MATCH]):
+            self.search_input_focused = False
+            if double and self.results:
+                self._equip(self.results[0])
+        else:
+            self.search_input_focused = False
+        self._changed()
+
+    def _word_at_pointer(self) -> Optional[Tuple[int, int]]:
+        left = self.layout[layout.TRAITS_SEARCH_INPUT].x - SEARCH_TEXT_LEFT
+        index = (self.pointer[0] - left) // SEARCH_CHAR_WIDTH
+        text = self.search_text
+        if not 0 <= index < len(text) or text[index] == " ":
+            return None
+        start = text.rfind(" ", 0, index) + 1
+        end = text.find(" ", index)
+        return start, end if end != -1 else len(text)
+
+    def _replace_selection(self, text: str):
+        start, end = self.search_selection
+        self.search_text = self.search_text[:start] + text + self.search_text[end:]
+        self.search_selection = None
+
+    def _equip(self, name: str):
+        if name in self.equipped:
+            return
+        cost = get_trait_by_name(name)["cost"]
+        if cost > self.upgrade_points:
+            self.failed_attempts += 1
+            self.dialog_open = True
+            return
+        self.upgrade_points -= cost
+        self.equipped.append(name)
+        self._changed()
+
+    def on_keys(self, keys: Tuple[str, ...]):
+        if not self.search_input_focused or self.dialog_open:
+            return
+        if keys == ("ctrl", "a"):
+            self.search_selection = (0, len(self.search_text))
+        elif keys in (("delete",), ("backspace",)):
+            if self.search_selection:
+                self._replace_selection("")
+            else:
+                self.search_text = self.search_text[:-1]
+        elif keys == ("enter",):
+            needle = self.search_text.lower()
+            self.results = sorted(
+                trait["name"] for trait in TRAITS if needle in trait["name"].lower()
+            )
+            self._changed()
+
+    def on_write(self, text: str):
+        if not self.search_input_focused or self.dialog_open:
+            return
+        if self.search_selection:
+            self._replace_selection(text)
+        else:
+            self.search_text += text
+
+    # Rendering
+
+    def _icon(self, name: str, size: Tuple[int, int]) -> Image.Image:
+        if name not in self._icons:
+            filepath = os.path.join(vision.SMALL_ICONS_DIR, f"{name}.png")
+            icon = Image.open(filepath).convert("RGB").resize(size)
+            self._icons[name] = icon
+        return self._icons[name]
+
+    def render(self) -> Image.Image:
+        """Return the frame on screen now, which lags behind the state."""
+        now = time.perf_counter()
+        while self._pending_frames and self._pending_frames[0][0] <= now:
+            self._frame = self._pending_frames.pop(0)[1]
+        return self._frame
+
+    def _render_state(self) -> Image.Image:
+        frame = Image.new("RGB", self.screen_size, COLOR_BACKGROUND)
+        drawing = ImageDraw.Draw(frame)
+
+        points = self.layout[layout.UPGRADE_POINTS]
+        drawing.text(
+            (points.x + 4, points.y + 4), str(self.upgrade_points), fill=COLOR_TEXT
+        )
+
+        if self.results:
+            slot = self.layout[layout.TRAITS_FIRST_MATCH_ICON]
+            icon = self._icon(self.results[0], (slot.width, slot.height))
+            frame.paste(icon, (slot.x, slot.y))
+
+        for element in (
+            self.layout[layout.TRAITS_SEARCH_INPUT],
+            self.layout[layout.TRAITS_FIRST_MATCH],
+        ):
+            if self.hover_highlight and self._hits(element) and not self.dialog_open:
+                x, y, width, height = element.region()
+                drawing.rectangle(
+                    (x, y, x + width - 1, y + height - 1), outline=COLOR_HOVER
+                )
+
+        if self.dialog_open:
+            drawing.rectangle((0, 0, *self.screen_size), fill=(0, 0, 0))
+            button = self.layout[layout.TRANSACTION_FAILED_DIALOG_OK_BTN]
+            x, y, width, height = button.region(half_size=HIT_RADIUS)
+            drawing.rectangle((x, y, x + width, y + height), fill=COLOR_DIALOG_BUTTON)
+        return frame
+
+
+class _SimulatedGameInputBackend(backends.SimulatedInputBackend):
+    def __init__(self, game: SimulatedHuntGame, screen_size: Tuple[int, int]):
+        super().__init__(screen_size=screen_size)
+        self.game = game
+
+    def move_to(self, x: int, y: int, seconds: float = 0.0, tween: bool = False):
+        # The pointer always moves, but the game is busy noticing it.
+        moved_at = self.clock + backends.actual_move_seconds(seconds)
+        self.game.block_inputs("move_to", moved_at)
+        super().move_to(x, y, seconds, tween)
+        self.game.on_move(x, y)
+
+    def click(self):
+        accepted = self.game.accepts_input("click", self.clock)
+        super().click()
+        if accepted:
+            self.game.on_click(double=False)
+
+    def double_click(self):
+        accepted = self.game.accepts_input("double_click", self.clock)
+        super().double_click()
+        if accepted:
+            self.game.on_click(double=True)
+
+    def press(self, key: str):
+        accepted = self.game.accepts_input("press", self.clock)
+        super().press(key)
+        if accepted:
+            self.game.on_keys((key,))
+
+    def hotkey(self, *keys: str):
+        accepted = self.game.accepts_input("hotkey", self.clock)
+        super().hotkey(*keys)
+        if accepted:
+            self.game.on_keys(keys)
+
+    def write(self, text: str):
+        accepted = self.game.accepts_input("write", self.clock)
+        super().write(text)
+        if accepted:
+            self.game.on_write(text)
+
+
+class _SimulatedGameScreenBackend(backends.ScreenBackend):
+    def __init__(self, game: SimulatedHuntGame):
+        self.game = game
+        self.grabs = 0
+
+    def grab(self, x: int, y: int, width: int, height: int) -> Image.Image:
+        self.grabs += 1
+        return self.game.render().crop((x, y, x + width, y + height))
+
+    def screenshot(self) -> Image.Image:
+        self.grabs += 1
+        return self.game.render().copy()
+
+
+class _SimulatedGameOcrBackend(ocr.OcrBackend):
+    """Read the upgrade points straight from the game state."""
+
+    name = "simulated"
+
+    def __init__(self, game: SimulatedHuntGame):
+        self.game = game
+
+    def read_screen_rectangle(self, x: int, y: int, width: int, height: int) -> str:
+        return str(self.game.upgrade_points)
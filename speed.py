@@ -0,0 +1,90 @@
+"""Per-machine speed profiles: how long to pause after each input action.
+
+pyautogui pauses 0.1s after every call by default, which is safe but slow
+on most machines. ui_automation.tune_speed_profile() searches for the
+smallest pause per action kind (and the smallest mouse move duration) at
+which repeated search trials still all succeed, and saves the result for
+this machine in SPEED_PROFILES_FILE. ui_automation loads it when it starts
+equipping. Machines without a profile use the pyautogui defaults.
+
+"""
+
+import json
+import os
+import platform
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import persistence
+from backends import MINIMUM_MOVE_SECONDS
+
+SPEED_PROFILES_FILE = "hunt_showdown_trait_presets_speed.json"
+# Machine name under which profiles tuned against the simulation are saved.
+SIMULATED_MACHINE = "simulated"
+
+DEFAULT_ACTION_DELAY = 0.1
+# Action kinds whose pause is tuned. Single clicks only dismiss the failure
+# dialog, which cannot be triggered safely, so they keep the default pause.
+TUNED_ACTIONS = ("move_to", "double_click", "hotkey", "press", "write")
+# Candidate values, a profile only ever uses one of these.
+DELAY_CANDIDATES = (0.0, 0.01, 0.02, 0.03, 0.05, 0.07, 0.1)
+# Moves of up to MINIMUM_MOVE_SECONDS are instant, so slower ones start above.
+MOVE_SECONDS_CANDIDATES = (0.0, 0.15, 0.25, 0.4)
+
+
+@dataclass
+class SpeedProfile:
+    delays: Dict[str, float] = field(default_factory=dict)
+    move_seconds: float = 0.0
+    machine: str = ""
+
+    def delay(self, action: str) -> float:
+        return self.delays.get(action, DEFAULT_ACTION_DELAY)
+
+    def to_dict(self) -> dict:
+        return {"delays": self.delays, "move_seconds": self.move_seconds}
+
+    @classmethod
+    def from_dict(cls, value: dict, machine: str = "") -> "SpeedProfile":
+        return cls(dict(value["delays"]), value["move_seconds"], machine)
+
+
+def machine_name() -> str:
+    return platform.node() or "unknown"
+
+
+def _load_profiles() -> Dict[str, dict]:
+    if not os.path.isfile(SPEED_PROFILES_FILE):
+        return {}
+    try:
+        with open(SPEED_PROFILES_FILE, "r") as f:
+            return json.loads(f.read())
+    except ValueError as err:
+        print(f"Ignoring invalid {SPEED_PROFILES_FILE}: {err}")
+        return {}
+
+
+def load_profile(machine: Optional[str] = None) -> SpeedProfile:
+    """Return the saved profile of the machine, or the default one."""
+    machine = machine or machine_name()
+    value = _load_profiles().get(machine)
+    if value is None:
+        return SpeedProfile(machine=machine)
+    try:
+        return SpeedProfile.from_dict(value, machine)
+    except (KeyError, TypeError) as err:
+        print(f"Ignoring invalid speed profile for {machine}: {err}")
+        return SpeedProfile(machine=machine)
+
+
+def save_profile(profile: SpeedProfile):
+    profiles = _load_profiles()
+    profiles[profile.machine or machine_name()] = profile.to_dict()
+    persistence.atomic_write_json(SPEED_PROFILES_FILE, profiles)
+
+
+def describe(profile: SpeedProfile) -> str:
+    delays = ", ".join(
+        f"{action} {profile.delay(action) * 1000:.0f} ms" for action in TUNED_ACTIONS
+    )
+    return f"{delays}, moves {profile.move_seconds * 1000:.0f} ms"
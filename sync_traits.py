@@ -0,0 +1,326 @@
+"""Update traits.json and the icons in img/ from a saved wiki page.
+
+Save https://huntshowdown.fandom.com/wiki/Traits with the browser ("Web
+page, complete", so icons are saved next to it), then:
+
+    python sync_traits.py Traits.html [--dry-run] [--prune]
+
+Every table whose header names the name, cost and description columns is
+read (see COLUMNS), with the row's image as the trait icon. Records are
+diffed against traits.json by content hash, only added and changed ones are
+written. Icons are compared by a hash of their pixels in a process pool and
+only written when they differ, so build_assets.py then only rebuilds the
+atlas tiles of changed icons. Changed icons are staged first and only moved
+into img/ once the merged catalog has been validated. Traits missing from
+the page are kept unless --prune is given, since a page may be saved half
+loaded.
+
+No network access is needed: icons that are not in the saved page are
+reported and the trait keeps its current icon.
+
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from PIL import Image
+
+import persistence
+import traits
+
+ICON_SIZE = (476, 247)
+ICONS_DIR = os.path.join(traits.ROOT_DIR, traits.ICONS_DIR)
+
+# Header texts (lowercase) of the wiki tables, per trait field.
+COLUMNS = {
+    "name": ("name", "trait"),
+    "rank": ("rank", "unlock rank", "unlock"),
+    "cost": ("cost", "upgrade points", "points"),
+    "description": ("description", "effect"),
+}
+REQUIRED_COLUMNS = ("name", "cost", "description")
+# Traits unlocked from the start are listed without a rank.
+DEFAULT_RANK = 1
+
+_NUMBER = re.compile(r"\d+")
+
+
+@dataclass
+class _Cell:
+    text: List[str] = field(default_factory=list)
+    images: List[str] = field(default_factory=list)
+
+
+class _TableParser(HTMLParser):
+    """Collect every table as rows of cells with their text and images."""
+
+    def __init__(self):
+        super().__init__()
+        self.tables: List[List[List[_Cell]]] = []
+        self._open_tables: List[List[List[_Cell]]] = []
+        self._cell: Optional[_Cell] = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "table":
+            self._open_tables.append([])
+        elif not self._open_tables:
+            return
+        elif tag == "tr":
+            self._open_tables[-1].append([])
+        elif tag in ("td", "th") and self._open_tables[-1]:
+            self._cell = _Cell()
+            self._open_tables[-1][-1].append(self._cell)
+        elif tag == "img" and self._cell is not None:
+            # Lazy loaded images only have their real source in data-src.
+            source = attrs.get("data-src") or attrs.get("src")
+            if source and not source.startswith("data:"):
+                self._cell.images.append(source)
+        elif tag == "br" and self._cell is not None:
+            self._cell.text.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag == "table" and self._open_tables:
+            self.tables.append(self._open_tables.pop())
+            self._cell = None
+        elif tag in ("td", "th", "tr"):
+            self._cell = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.text.append(data)
+
+
+def _text(cell: _Cell) -> str:
+    return " ".join("".join(cell.text).split())
+
+
+def _column_indexes(header: List[_Cell]) -> Dict[str, int]:
+    indexes = {}
+    for i, cell in enumerate(header):
+        text = _text(cell).lower()
+        for name, aliases in COLUMNS.items():
+            if text in aliases and name not in indexes:
+                indexes[name] = i
+    return indexes
+
+
+def _number(text: str, default: Optional[int] = None) -> Optional[int]:
+    match = _NUMBER.search(text)
+    return int(match.group()) if match else default
+
+
+@dataclass
+class WikiTrait:
+    record: dict
+    icon_source: Optional[str]
+
+
+def parse_wiki_html(filepath: str) -> Tuple[List[WikiTrait], List[str]]:
+    """Return the traits of a saved wiki page and the problems found."""
+    parser = _TableParser()
+    with open(filepath, "r", encoding="utf-8") as f:
+        parser.feed(f.read())
+    page_dir = os.path.dirname(os.path.abspath(filepath))
+
+    wiki_traits = []
+    problems = []
+    for table in parser.tables:
+        if not table:
+            continue
+        indexes = _column_indexes(table[0])
+        if not all(column in indexes for column in REQUIRED_COLUMNS):
+            continue
+        for row in table[1:]:
+            if len(row) <= max(indexes.values()):
+                continue
+            name = _text(row[indexes["name"]])
+            cost = _number(_text(row[indexes["cost"]]))
+            if not name or cost is None:
+                problems.append(f"Skipping row without name or cost: {name!r}")
+                continue
+            rank = DEFAULT_RANK
+            if "rank" in indexes:
+                rank = _number(_text(row[indexes["rank"]]), DEFAULT_RANK)
+            record = {
+                "rank": rank,
+                "name": name,
+                "cost": cost,
+                "description": _text(row[indexes["description"]]),
+            }
+            images = [image for cell in row for image in cell.images]
+            icon_source = None
+            if not images:
+                problems.append(f"{name}: no icon on the page")
+            elif "://" in images[0]:
+                problems.append(f"{name}: icon {images[0]} was not saved with the page")
+            else:
+                path = unquote(images[0].split("?")[0])
+                icon_source = os.path.join(page_dir, path)
+            wiki_traits.append(WikiTrait(record, icon_source))
+    return wiki_traits, problems
+
+
+def record_hash(record: dict) -> str:
+    text = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CatalogDiff:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+
+def diff_records(current: List[dict], synced: List[dict]) -> CatalogDiff:
+    current_hashes = {record["name"]: record_hash(record) for record in current}
+    synced_names = set()
+    diff = CatalogDiff()
+    for record in synced:
+        name = record["name"]
+        synced_names.add(name)
+        if name not in current_hashes:
+            diff.added.append(name)
+        elif current_hashes[name] != record_hash(record):
+            diff.changed.append(name)
+        else:
+            diff.unchanged += 1
+    diff.removed = [name for name in current_hashes if name not in synced_names]
+    return diff
+
+
+def merge_records(
+    current: List[dict], synced: List[dict], prune: bool = False
+) -> List[dict]:
+    """Replace changed records in place, append new ones at the end."""
+    synced_by_name = {record["name"]: record for record in synced}
+    merged = []
+    for record in current:
+        if record["name"] in synced_by_name:
+            merged.append(synced_by_name.pop(record["name"]))
+        elif not prune:
+            merged.append(record)
+    merged.extend(synced_by_name.values())
+    return merged
+
+
+def _pixel_hash(image: Image.Image) -> str:
+    return hashlib.sha256(image.tobytes()).hexdigest()
+
+
+def sync_icon(job: Tuple[str, str, Optional[str]]) -> bool:
+    """Normalize the source icon and compare it with the current one.
+
+    If their pixels differ, the icon is written to the staged path (unless
+    that is None). Runs in a worker process, returns whether it changed.
+
+    """
+    source, current, staged = job
+    image = Image.open(source).convert("RGBA")
+    if image.size != ICON_SIZE:
+        image = image.resize(ICON_SIZE, Image.LANCZOS)
+    if os.path.isfile(current):
+        if _pixel_hash(Image.open(current).convert("RGBA")) == _pixel_hash(image):
+            return False
+    if staged is not None:
+        image.save(staged)
+    return True
+
+
+def sync_icons(
+    wiki_traits: List[WikiTrait], staging_dir: Optional[str] = None
+) -> Dict[str, Optional[str]]:
+    """Compare the icons in parallel, stage the changed ones in staging_dir.
+
+    Returns the staged path (None without staging_dir) per changed trait.
+
+    """
+    jobs = []
+    for wiki_trait in wiki_traits:
+        if not (wiki_trait.icon_source and os.path.isfile(wiki_trait.icon_source)):
+            continue
+        filename = f"{wiki_trait.record['name']}.png"
+        staged = os.path.join(staging_dir, filename) if staging_dir else None
+        jobs.append(
+            (wiki_trait.icon_source, os.path.join(ICONS_DIR, filename), staged)
+        )
+    with ProcessPoolExecutor() as executor:
+        changed = list(executor.map(sync_icon, jobs))
+    return {
+        os.path.splitext(os.path.basename(current))[0]: staged
+        for (_, current, staged), icon_changed in zip(jobs, changed)
+        if icon_changed
+    }
+
+
+def _print_names(label: str, names: List[str]):
+    if names:
+        print(f"{label} ({len(names)}): {', '.join(names)}")
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if len(args) != 1:
+        sys.exit(__doc__)
+    dry_run = "--dry-run" in sys.argv
+    prune = "--prune" in sys.argv
+
+    wiki_traits, problems = parse_wiki_html(args[0])
+    for problem in problems:
+        print(problem)
+    if not wiki_traits:
+        sys.exit(f"No trait tables found in {args[0]}")
+
+    with open(traits.TRAITS_SOURCE, "r", encoding="utf-8") as f:
+        current = json.loads(f.read())
+    synced = [wiki_trait.record for wiki_trait in wiki_traits]
+    diff = diff_records(current, synced)
+    print(f"{len(synced)} traits on the page, {diff.unchanged} unchanged")
+    _print_names("Added", diff.added)
+    _print_names("Changed", diff.changed)
+    missing_label = "Missing from the page" + (", removing" if prune else "")
+    _print_names(missing_label, diff.removed)
+
+    if dry_run:
+        _print_names("Icons changed", list(sync_icons(wiki_traits)))
+        return
+
+    # Next to img/, so staged icons are moved in by a rename.
+    with tempfile.TemporaryDirectory(dir=traits.ROOT_DIR, prefix=".icons.") as staging:
+        changed_icons = sync_icons(wiki_traits, staging)
+        _print_names("Icons changed", list(changed_icons))
+        records_changed = diff.added or diff.changed or (prune and diff.removed)
+        merged = merge_records(current, synced, prune) if records_changed else current
+        if records_changed or changed_icons:
+            try:
+                traits.validate_trait_dicts(merged, extra_icons=changed_icons)
+            except traits.CatalogError as err:
+                print(err)
+                sys.exit(1)
+        for name, staged in changed_icons.items():
+            os.replace(staged, os.path.join(ICONS_DIR, f"{name}.png"))
+
+    if records_changed:
+        text = json.dumps(merged, indent=4, ensure_ascii=False) + "\n"
+        persistence.atomic_write(traits.TRAITS_SOURCE, text)
+        catalog = traits.build_catalog()
+        print(f"Wrote {len(catalog)} traits to {traits.TRAITS_SOURCE}")
+    if changed_icons:
+        import build_assets
+
+        build_assets.build_atlas()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Nested timing spans of an automation run.
+
+Tracing is off by default, and a traced function then costs one extra
+function call and a global lookup. Between start() and stop(), every span
+is recorded with its thread, its duration and its self time (the duration
+minus that of its child spans):
+
+    tracing.start()
+    ...  # equip
+    tracer = tracing.stop()
+    tracer.write_chrome_trace("trace.json")  # open in chrome://tracing
+    tracer.print_summary()
+
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+_DISABLED = nullcontext()
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    start: float
+    duration: float
+    self_time: float
+    thread_id: int
+    args: dict = field(default_factory=dict)
+
+
+class Tracer:
+    def __init__(self):
+        self.records: List[SpanRecord] = []
+        self.start_time = time.perf_counter()
+        self.end_time: Optional[float] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        # Per thread stack of the child time of the open spans.
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            duration = time.perf_counter() - start
+            child_time = stack.pop()
+            if stack:
+                stack[-1] += duration
+            record = SpanRecord(
+                name,
+                start,
+                duration,
+                duration - child_time,
+                threading.get_ident(),
+                args,
+            )
+            with self._lock:
+                self.records.append(record)
+
+    def chrome_trace(self) -> dict:
+        """Return the spans as complete events of the Chrome trace format."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": record.name,
+                "ph": "X",
+                "ts": (record.start - self.start_time) * 1e6,
+                "dur": record.duration * 1e6,
+                "pid": pid,
+                "tid": record.thread_id,
+                "args": {key: str(value) for key, value in record.args.items()},
+            }
+            for record in self.records
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, filepath: str):
+        with open(filepath, "w") as f:
+            f.write(json.dumps(self.chrome_trace()))
+
+    def summarize(self) -> Dict[str, dict]:
+        """Aggregate spans per name: count, total, self and max time."""
+        summary = {}
+        for record in self.records:
+            entry = summary.setdefault(
+                record.name, {"count": 0, "total": 0.0, "self": 0.0, "max": 0.0}
+            )
+            entry["count"] += 1
+            entry["total"] += record.duration
+            entry["self"] += record.self_time
+            entry["max"] = max(entry["max"], record.duration)
+        return summary
+
+    def print_summary(self):
+        """Print spans by self time, the steps that dominate the run first."""
+        end_time = self.end_time or time.perf_counter()
+        run_seconds = end_time - self.start_time
+        print(f"Trace of {run_seconds:.2f}s, {len(self.records)} spans")
+        print(
+            f"{'span':>28}  {'count':>5}  {'total ms':>9}  {'self ms':>9}  "
+            f"{'max ms':>8}  {'self %':>6}"
+        )
+        for name, entry in sorted(
+            self.summarize().items(), key=lambda item: -item[1]["self"]
+        ):
+            share = entry["self"] / run_seconds * 100 if run_seconds else 0.0
+            print(
+                f"{name:>28}  {entry['count']:5d}  {entry['total'] * 1000:9.1f}  "
+                f"{entry['self'] * 1000:9.1f}  {entry['max'] * 1000:8.1f}  "
+                f"{share:6.1f}"
+            )
+
+
+_tracer: Optional[Tracer] = None
+
+
+def start() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop() -> Optional[Tracer]:
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.end_time = time.perf_counter()
+    return tracer
+
+
+def span(name: str, **args):
+    """Context manager timing a block, yields its args dict (or None)."""
+    if _tracer is None:
+        return _DISABLED
+    return _tracer.span(name, **args)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator wrapping every call of the function in a span."""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _tracer.span(span_name):
+                return func(*args, **kwargs)
+
+        return inner
+
+    return decorator
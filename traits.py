@@ -1,365 +1,350 @@
-TRAITS = [
-    {
-        "rank": 1,
-        "name": "Adrenaline",
-        "icon": "img/Adrenaline.png",
-        "cost": 1,
-        "description": "Instantly start regenerating Stamina while your Health is critically low.",
-    },
-    {
-        "rank": 1,
-        "name": "Bloodless",
-        "icon": "img/Bloodless.png",
-        "cost": 4,
-        "description": "Bleeding will not escalate from light to medium or intense bleeding. (i.e. any bleeding you incur will only ever be light bleeding).",
-    },
-    {
-        "rank": 1,
-        "name": "Conduit",
-        "icon": "img/Conduit.png",
-        "cost": 4,
-        "description": "Get a health and stamina boost when picking up a Clue, Rift, or Bounty token.",
-    },
-    {
-        "rank": 1,
-        "name": "Greyhound",
-        "icon": "img/Greyhound.png",
-        "cost": 4,
-        "description": "Sprint at full speed for a longer duration. (Roughly doubles the duration).",
-    },
-    {
-        "rank": 1,
-        "name": "Hornskin",
-        "icon": "img/Hornskin.png",
-        "cost": 3,
-        "description": "Reduce damage taken from blunt melee by 25%.",
-    },
-    {
-        "rank": 1,
-        "name": "Magpie",
-        "icon": "img/Magpie.png",
-        "cost": 1,
-        "description": "Receive a short effect similiar to that of either the Antidote Shot, Stamina Shot or Regeneration Shot, when picking up a Bounty Token.",
-    },
-    {
-        "rank": 1,
-        "name": "Packmule",
-        "icon": "img/Packmule.png",
-        "cost": 3,
-        "description": "Receive an additional tool or consumable when looting players or opening item boxes.",
-    },
-    {
-        "rank": 1,
-        "name": "Salveskin",
-        "icon": "img/Salveskin.png",
-        "cost": 5,
-        "description": "Reduces fire damage and burn speed by 25%, even when downed.",
-    },
-    {
-        "rank": 5,
-        "name": "Determination",
-        "icon": "img/Determination.png",
-        "cost": 3,
-        "description": "Stamina recovery starts sooner. (Applies to both melee and sprinting stamina).",
-    },
-    {
-        "rank": 7,
-        "name": "Iron Repeater",
-        "icon": "img/Iron_Repeater.png",
-        "cost": 2,
-        "description": "Remain in iron sights after firing a shot while using lever-action rifles. (Applies to all scope-less Winfield lever-action variants, including shotguns).",
-    },
-    {
-        "rank": 9,
-        "name": "Resilience",
-        "icon": "img/Resilience.png",
-        "cost": 2,
-        "description": "Get revived with up to 100 Health.",
-    },
-    {
-        "rank": 11,
-        "name": "Assailant",
-        "icon": "img/Assailant.png",
-        "cost": 2,
-        "description": "Increases melee damage of throwing knives and throwing axes.",
-    },
-    {
-        "rank": 13,
-        "name": "Bolt Thrower",
-        "icon": "img/Bolt_Thrower.png",
-        "cost": 3,
-        "description": "Reduced reload time for crossbows.",
-    },
-    {
-        "rank": 14,
-        "name": "Levering",
-        "icon": "img/Levering.png",
-        "cost": 3,
-        "description": "Faster rate of fire from the hip when using lever-action weapons. (Applies to all Winfield lever-action variants, including shotguns).",
-    },
-    {
-        "rank": 15,
-        "name": "Mithridatist",
-        "icon": "img/Mithridatist.png",
-        "cost": 3,
-        "description": "Drastically reduces the time needed to recover from poisoning.",
-    },
-    {
-        "rank": 16,
-        "name": "Bulwark",
-        "icon": "img/Bulwark.png",
-        "cost": 2,
-        "description": "Reduce the damage from explosions and Bomb Lance harpoon attacks by 50%.",
-    },
-    {
-        "rank": 17,
-        "name": "Fanning",
-        "icon": "img/Fanning.png",
-        "cost": 7,
-        "description": "Faster rate-of-fire when using 1-handed single-action pistols.",
-    },
-    {
-        "rank": 19,
-        "name": "Ghoul",
-        "icon": "img/Ghoul.png",
-        "cost": 4,
-        "description": "Killing Grunts at close-range restores a small amount of health. (25m range, restores 5 health).",
-    },
-    {
-        "rank": 21,
-        "name": "Gator Legs",
-        "icon": "img/Gator_Legs.png",
-        "cost": 2,
-        "description": "Walk and sprint faster in deep water. Also make less noise while crouched in water.",
-    },
-    {
-        "rank": 23,
-        "name": "Deadeye Scopesmith",
-        "icon": "img/Deadeye_Scopesmith.png",
-        "cost": 1,
-        "description": "Remain in scope view after firing a shot while using any weapon with a short scope (Deadeye variants).",
-    },
-    {
-        "rank": 25,
-        "name": "Silent Killer",
-        "icon": "img/Silent_Killer.png",
-        "cost": 5,
-        "description": "Reduces the sound you make when performing melee attacks.",
-    },
-    {
-        "rank": 27,
-        "name": "Lightfoot",
-        "icon": "img/Lightfoot.png",
-        "cost": 5,
-        "description": "Vault, jump, fall, and climb ladders silently.",
-    },
-    {
-        "rank": 28,
-        "name": "Serpent",
-        "icon": "img/Serpent.png",
-        "cost": 4,
-        "description": "Using Dark Sight, interact with nearby Clues, Rifts, Banishable Targets, and abandoned Bounty from a safe distance. (25m range).",
-    },
-    {
-        "rank": 29,
-        "name": "Physician",
-        "icon": "img/Physician.png",
-        "cost": 5,
-        "description": "Reduce the time needed to bandage. (With the First Aid Kit).",
-    },
-    {
-        "rank": 31,
-        "name": "Steady Aim",
-        "icon": "img/Steady_Aim.png",
-        "cost": 3,
-        "description": "Weapon sway gradually lessens when you're looking through the scope of a rifle. (Applies to any 3-slot rifle with a scope or aperture sight).",
-    },
-    {
-        "rank": 33,
-        "name": "Steady Hand",
-        "icon": "img/Steady_Hand.png",
-        "cost": 2,
-        "description": "Weapon sway gradually lessens when you're looking through the scope of a pistol or a stock-less weapon. (Applies to 2-slot weapons with a scope).",
-    },
-    {
-        "rank": 35,
-        "name": "Marksman Scopesmith",
-        "icon": "img/Marksman_Scopesmith.png",
-        "cost": 2,
-        "description": "Remain in scope view after firing a shot while using any weapon with a medium scope (Marksman variants).",
-    },
-    {
-        "rank": 38,
-        "name": "Vigor",
-        "icon": "img/Vigor.png",
-        "cost": 4,
-        "description": "While in Dark Sight, doubles the rate at which Health and Stamina regenerate.",
-    },
-    {
-        "rank": 38,
-        "name": "Whispersmith",
-        "icon": "img/Whispersmith.png",
-        "cost": 2,
-        "description": "Reduces noise when selecting equipment.",
-    },
-    {
-        "rank": 39,
-        "name": "Frontiersman",
-        "icon": "img/Frontiersman.png",
-        "cost": 8,
-        "description": "Carried tools can be used one extra time.",
-    },
-    {
-        "rank": 41,
-        "name": "Beastface",
-        "icon": "img/Beastface.png",
-        "cost": 3,
-        "description": "Reduced reaction range of animals (doesn't affect monsters like Hellhounds).",
-    },
-    {
-        "rank": 43,
-        "name": "Decoy Supply",
-        "icon": "img/Decoy_Supply.png",
-        "cost": 1,
-        "description": "Restock all types of decoys from ammo crates.",
-    },
-    {
-        "rank": 44,
-        "name": "Ambidextrous",
-        "icon": "img/Ambidextrous.png",
-        "cost": 3,
-        "description": "Quicker reloading of matched pairs, and custom clip reloads for semi-auto pistol sets.",
-    },
-    {
-        "rank": 45,
-        "name": "Tomahawk",
-        "icon": "img/Tomahawk.png",
-        "cost": 1,
-        "description": "Melee weapons found in the world can be thrown.",
-    },
-    {
-        "rank": 47,
-        "name": "Iron Sharpshooter",
-        "icon": "img/Iron_Sharpshooter.png",
-        "cost": 3,
-        "description": "Remain in iron sights after firing a shot while using bolt-action rifles. (Applies to all scope-less bolt-action rifles, including Vetterli, Berthier, Lebel, and Mosin variants, excluding the Mosin Avtomat).",
-    },
-    {
-        "rank": 49,
-        "name": "Blade Seer",
-        "icon": "img/Blade_Seer.png",
-        "cost": 2,
-        "description": "Bolts, arrows, throwing axes, and throwing knives are highlighted in Dark Sight for better visibility. (25m range, line of sight required).",
-    },
-    {
-        "rank": 51,
-        "name": "Quartermaster",
-        "icon": "img/Quartermaster.png",
-        "cost": 6,
-        "description": "Can equip a medium slot weapon in addition to a large slot weapon.",
-    },
-    {
-        "rank": 55,
-        "name": "Pitcher",
-        "icon": "img/Pitcher.png",
-        "cost": 6,
-        "description": "Increased throwing range for all items using the aim helper. (Roughly 50% increased range).",
-    },
-    {
-        "rank": 57,
-        "name": "Bulletgrubber",
-        "icon": "img/Bulletgrubber.png",
-        "cost": 6,
-        "description": "Recover the unfired round when performing partial reloads. (Applies to Bornheim, Dolch, Lebel, Mosin, Berthier, Specter, and Terminus variants).",
-    },
-    {
-        "rank": 59,
-        "name": "Poacher",
-        "icon": "img/Poacher.png",
-        "cost": 1,
-        "description": "Place and disarm traps quietly.",
-    },
-    {
-        "rank": 60,
-        "name": "Hundred Hands",
-        "icon": "img/Hundred_Hands.png",
-        "cost": 3,
-        "description": "Increases the damage of a Hunting Bow shot at full draw by 10%. Also reduces sway whilst at full draw.",
-    },
-    {
-        "rank": 61,
-        "name": "Dauntless",
-        "icon": "img/Dauntless.png",
-        "cost": 1,
-        "description": "Thrown explosives can be defused when interacting with them (3m interaction range).",
-    },
-    {
-        "rank": 63,
-        "name": "Kiteskin",
-        "icon": "img/Kiteskin.png",
-        "cost": 1,
-        "description": "Reduce damage from falling by 50%.",
-    },
-    {
-        "rank": 65,
-        "name": "Iron Devastator",
-        "icon": "img/Iron_Devastator.png",
-        "cost": 2,
-        "description": "Remain in iron sights between shots using pump-action shotguns. (Applies to Winfield Slate and Specter 1882 variants).",
-    },
-    {
-        "rank": 67,
-        "name": "Dewclaw",
-        "icon": "img/Dewclaw.png",
-        "cost": 2,
-        "description": "Enhances the melee attack of a bow and arrow.",
-    },
-    {
-        "rank": 69,
-        "name": "Necromancer",
-        "icon": "img/Necromancer.png",
-        "cost": 4,
-        "description": "Using Dark Sight, revive a downed partner from a distance, though at the cost of a small amount of health. (25m range, costs 25 Health).",
-    },
-    {
-        "rank": 71,
-        "name": "Vulture",
-        "icon": "img/Vulture.png",
-        "cost": 3,
-        "description": "Always be able to loot dead Hunters, even after they have been looted by other players.",
-    },
-    {
-        "rank": 73,
-        "name": "Doctor",
-        "icon": "img/Doctor.png",
-        "cost": 8,
-        "description": "Doubles the amount of Health restored by First Aid Kits.",
-    },
-    {
-        "rank": 77,
-        "name": "Sniper Scopesmith",
-        "icon": "img/Sniper_Scopesmith.png",
-        "cost": 3,
-        "description": "Remain in scope view after firing a shot while using any weapon with a long scope (Sniper variants).",
-    },
-    {
-        "rank": 84,
-        "name": "Poison Sense",
-        "icon": "img/Poison_Sense.png",
-        "cost": 1,
-        "description": "You can see nearby poisoned Hunters while in Dark Sight. (50m range).",
-    },
-    {
-        "rank": 87,
-        "name": "Vigilant",
-        "icon": "img/Vigilant.png",
-        "cost": 2,
-        "description": "Nearby traps are highlighted in Dark Sight. (25m range).",
-    },
-]
-
-_name_to_trait = {trait["name"]: trait for trait in TRAITS}
+"""The trait catalog and the selection of traits.
+
+Traits are defined in traits.json. Building the catalog validates every
+entry against TRAIT_SCHEMA and matches its icon in img/, failing with a
+CatalogError that lists all problems. The result is cached in traits.cache
+as plain tuples in marshal format, which loads in microseconds without
+further imports. The cache is used as long as traits.json is unchanged and
+rebuilt when the catalog is first used otherwise, or explicitly with:
+
+    python build_catalog.py
+
+"""
+
+import marshal
+import os
+from contextlib import contextmanager
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+TRAITS_SOURCE = os.path.join(ROOT_DIR, "traits.json")
+TRAITS_CACHE = os.path.join(ROOT_DIR, "traits.cache")
+ICONS_DIR = "img"
+CACHE_VERSION = 1
+
+# Field name to (type, required). An icon path is matched by name if missing.
+TRAIT_SCHEMA = {
+    "rank": (int, True),
+    "name": (str, True),
+    "icon": (str, False),
+    "cost": (int, True),
+    "description": (str, True),
+}
+
+
+class CatalogError(ValueError):
+    """traits.json has invalid entries, the message lists all of them."""
+
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__(
+            f"{len(problems)} problems in the trait catalog:\n"
+            + "\n".join(f"  {problem}" for problem in problems)
+        )
+
+
+class Trait:
+    """Immutable trait record.
+
+    Supports item access (trait["name"]) like the plain dicts in TRAITS.
+
+    """
+
+    __slots__ = ("rank", "name", "icon", "cost", "description")
+
+    def __init__(self, rank, name, icon, cost, description):
+        object.__setattr__(self, "rank", rank)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "icon", icon)
+        object.__setattr__(self, "cost", cost)
+        object.__setattr__(self, "description", description)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Trait is immutable")
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __eq__(self, other):
+        return isinstance(other, Trait) and other.name == self.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return f"Trait({self.name!r}, rank={self.rank}, cost={self.cost})"
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class TraitCatalog:
+    """All traits, indexed by name."""
+
+    def __init__(self, traits):
+        self.traits = tuple(traits)
+        self.by_name = {trait.name: trait for trait in self.traits}
+
+    def __iter__(self):
+        return iter(self.traits)
+
+    def __len__(self):
+        return len(self.traits)
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+
+class SelectionChange:
+    """A delta emitted by Selection, kind is either ADDED or REMOVED."""
+
+    ADDED = "added"
+    REMOVED = "removed"
+
+    __slots__ = ("kind", "trait")
+
+    def __init__(self, kind, trait):
+        self.kind = kind
+        self.trait = trait
+
+    def __repr__(self):
+        return f"SelectionChange({self.kind!r}, {self.trait.name!r})"
+
+
+class Selection:
+    """Ordered set of selected traits, keeping their overall cost up to date.
+
+    Every mutation notifies subscribers with a list of SelectionChange deltas.
+    Within a batch() the deltas are collected, merged and emitted once.
+
+    """
+
+    def __init__(self, traits=()):
+        # Dicts keep insertion order, so this doubles as an ordered set.
+        self._traits = {}
+        self.cost = 0
+        self._subscribers = []
+        self._batch_depth = 0
+        self._pending_changes = []
+        for trait in traits:
+            self.add(trait)
+
+    def __contains__(self, trait):
+        name = trait if isinstance(trait, str) else trait.name
+        return name in self._traits
+
+    def __iter__(self):
+        return iter(list(self._traits.values()))
+
+    def __len__(self):
+        return len(self._traits)
+
+    def __bool__(self):
+        return bool(self._traits)
+
+    def names(self):
+        return list(self._traits)
+
+    def subscribe(self, callback):
+        """Call callback(changes) after every (batch of) mutation(s)."""
+        self._subscribers.append(callback)
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._emit()
+
+    def _record(self, change):
+        self._pending_changes.append(change)
+        if self._batch_depth == 0:
+            self._emit()
+
+    def _emit(self):
+        changes = _merge_changes(self._pending_changes)
+        self._pending_changes = []
+        if not changes:
+            return
+        for callback in self._subscribers:
+            callback(changes)
+
+    def add(self, trait) -> bool:
+        """Append a trait, return False if it was selected already."""
+        if trait.name in self._traits:
+            return False
+        self._traits[trait.name] = trait
+        self.cost += trait.cost
+        self._record(SelectionChange(SelectionChange.ADDED, trait))
+        return True
+
+    def remove(self, name) -> bool:
+        """Remove a trait by name, return False if it was not selected."""
+        trait = self._traits.pop(name, None)
+        if trait is None:
+            return False
+        self.cost -= trait.cost
+        self._record(SelectionChange(SelectionChange.REMOVED, trait))
+        return True
+
+    def clear(self):
+        with self.batch():
+            for name in self.names():
+                self.remove(name)
+
+
+def _merge_changes(changes):
+    """Drop traits that were added and removed again within the changes."""
+    merged = []
+    added_at = {}
+    for change in changes:
+        name = change.trait.name
+        if change.kind == SelectionChange.REMOVED and name in added_at:
+            merged[added_at.pop(name)] = None
+            continue
+        if change.kind == SelectionChange.ADDED:
+            added_at[name] = len(merged)
+        merged.append(change)
+    return [change for change in merged if change is not None]
+
+
+def _icon_key(filename):
+    """Match icon file names regardless of case and space vs underscore."""
+    return os.path.splitext(filename)[0].replace("_", " ").lower()
+
+
+def validate_trait_dicts(dicts, icons_dir=ICONS_DIR, extra_icons=None):
+    """Return Traits for the raw dicts, raise CatalogError if any is invalid.
+
+    extra_icons maps trait names to icon files that are not in icons_dir
+    yet, e.g. icons staged by sync_traits.py.
+
+    """
+    icons = {
+        _icon_key(filename): f"{icons_dir}/{filename}"
+        for filename in os.listdir(os.path.join(ROOT_DIR, icons_dir))
+        if filename.endswith(".png")
+    }
+    for name, filepath in (extra_icons or {}).items():
+        icons[_icon_key(f"{name}.png")] = filepath
+    problems = []
+    traits = []
+    names = set()
+    for i, entry in enumerate(dicts):
+        if not isinstance(entry, dict):
+            problems.append(f"#{i}: expected an object")
+            continue
+        label = f"#{i} ({entry.get('name', '?')})"
+        entry_problems = []
+        for field in entry.keys() - TRAIT_SCHEMA.keys():
+            entry_problems.append(f"{label}: unknown field '{field}'")
+        for field, (field_type, required) in TRAIT_SCHEMA.items():
+            if field not in entry:
+                if required:
+                    entry_problems.append(f"{label}: missing '{field}'")
+            elif type(entry[field]) is not field_type:
+                entry_problems.append(
+                    f"{label}: '{field}' must be {field_type.__name__}, "
+                    f"got {entry[field]!r}"
+                )
+        if not entry_problems:
+            if entry["name"] in names:
+                entry_problems.append(f"{label}: duplicate name")
+            if entry["cost"] < 0 or entry["rank"] < 1:
+                entry_problems.append(f"{label}: cost and rank must be positive")
+            icon = entry.get("icon") or icons.get(_icon_key(entry["name"]))
+            if icon is None:
+                entry_problems.append(f"{label}: no icon in {icons_dir}/")
+            elif not os.path.isfile(os.path.join(ROOT_DIR, icon)):
+                entry_problems.append(f"{label}: icon {icon} does not exist")
+        if entry_problems:
+            problems.extend(entry_problems)
+            continue
+        names.add(entry["name"])
+        traits.append(
+            Trait(
+                entry["rank"], entry["name"], icon, entry["cost"], entry["description"]
+            )
+        )
+    if problems:
+        raise CatalogError(problems)
+    return traits
+
+
+def _source_stamp(source):
+    stat = os.stat(source)
+    return (CACHE_VERSION, marshal.version, stat.st_mtime_ns, stat.st_size)
+
+
+def build_catalog(source=TRAITS_SOURCE, cache=TRAITS_CACHE):
+    """Validate the source and write the cache, return the catalog."""
+    import json
+
+    stamp = _source_stamp(source)
+    with open(source, "r", encoding="utf-8") as f:
+        traits = validate_trait_dicts(json.loads(f.read()))
+    rows = tuple(
+        tuple(getattr(trait, key) for key in Trait.__slots__) for trait in traits
+    )
+    import persistence
+
+    try:
+        persistence.atomic_write(cache, marshal.dumps((stamp, rows)))
+    except OSError as err:
+        print(f"Could not write {cache}: {err}")
+    return TraitCatalog(traits)
+
+
+def load_catalog(source=TRAITS_SOURCE, cache=TRAITS_CACHE):
+    """Return the cached catalog, rebuilding it if the source changed."""
+    try:
+        with open(cache, "rb") as f:
+            stamp, rows = marshal.loads(f.read())
+        if stamp == _source_stamp(source):
+            return TraitCatalog(Trait(*row) for row in rows)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    return build_catalog(source, cache)
+
+
+_catalog = None
+_traits = None
+
+
+def get_catalog():
+    """Return the catalog, loading it on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
+
+
+def get_traits():
+    """Return the catalog as plain dicts, for code that needs no Trait records."""
+    global _traits
+    if _traits is None:
+        _traits = [trait.to_dict() for trait in get_catalog()]
+    return _traits
+
+
+def __getattr__(name):
+    # CATALOG and TRAITS are only loaded when first accessed, so importing
+    # this module (e.g. to rebuild or repair an invalid traits.json) never
+    # validates the catalog.
+    if name == "CATALOG":
+        return get_catalog()
+    if name == "TRAITS":
+        return get_traits()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_trait_by_name(name):
-    return _name_to_trait.get(name)
+    return get_catalog().get(name)
@@ -1,38 +1,87 @@
-import ctypes
 import os
 import random
 import subprocess
 import tempfile
+import threading
 import time
 import uuid
-from dataclasses import dataclass
-from typing import Tuple, Optional, Union
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Sequence, Tuple, Optional, Union
 
-import keyboard
-import pyautogui
-import pygetwindow
 from PIL import ImageDraw
 
-GAME_WINDOW_TITLE = "Hunt: Showdown"
+import backends
+import capture
+import layout
+import ocr
+import planner
+import speed
+import tracing
+import vision
+import waiting
+import window_manager
+from layout import UIElement
+
 COLOR_GREEN = (0, 255, 0)
-CAPTURE2TEXT_CLI_BINARY = "Capture2Text/Capture2Text_CLI.exe"
 
 
-@dataclass
-class UIElement:
-    """A coordinate or rectangle designating a specific Hunt UI element."""
+# Upper bound for the game to show a hover highlight after moving the mouse.
+HOVER_TIMEOUT = 0.25
+# Upper bound for the game to take the upgrade points or show the failure
+# dialog after double clicking a trait.
+EQUIP_REACTION_TIMEOUT = 1.0
+
+# Context shown around the upgrade points by the debug screenshot.
+DEBUG_SCREENSHOT_MARGIN = 200
+
+# Searched for and selected (but not equipped) by speed tuning trials, a
+# different first match each time.
+SPEED_TRIAL_TRAITS = ("Doctor", "Magpie", "Bulwark", "Conduit")
+
+# Searched for one after the other by calibrate_layout() without clearing the
+# search input in between. The first has the shortest search text, which the
+# double click is least likely to hit.
+SEARCH_SELECTION_TRIAL_TRAITS = ("Quartermaster", "Doctor")
+
+_layout: Optional[layout.Layout] = None
+_speed_profile: Optional[speed.SpeedProfile] = None
+
+
+def refresh_layout() -> layout.Layout:
+    """Look up the layout for the current screen size and game window."""
+    global _layout
+    _layout = layout.get_layout(
+        backends.get_input_backend().get_screen_size(),
+        window_manager.get_game_window().rect(),
+    )
+    return _layout
 
-    x: int
-    y: int
-    width: Optional[int] = None
-    height: Optional[int] = None
 
+def current_layout() -> layout.Layout:
+    return _layout or refresh_layout()
 
-# Measured for a screen of 2560x1080px
-UI_UPGRADE_POINTS = UIElement(x=422, y=898, width=60, height=50)
-UI_TRAITS_SEARCH_INPUT = UIElement(x=980, y=225)
-UI_TRAITS_FIRST_MATCH = UIElement(x=775, y=395)
-UI_TRANSACTION_FAILED_DIALOG_OK_BTN = UIElement(x=1235, y=735)
+
+def ui(name: str) -> UIElement:
+    return current_layout()[name]
+
+
+def get_speed_profile() -> speed.SpeedProfile:
+    """Return the speed profile in use, loading this machine's on first use."""
+    global _speed_profile
+    if _speed_profile is None:
+        _speed_profile = speed.load_profile()
+    return _speed_profile
+
+
+def set_speed_profile(profile: speed.SpeedProfile):
+    global _speed_profile
+    _speed_profile = profile
+    apply_speed_profile()
+
+
+def apply_speed_profile():
+    """Make the current input backend pause as the speed profile says."""
+    backends.get_input_backend().set_action_delays(get_speed_profile().delays)
 
 
 def debug_upgrade_points_rectangle_with_screenshot():
@@ -53,18 +102,24 @@ def debug_upgrade_points_rectangle_with_screenshot():
         f.write("")
     screenshot_filepath = os.path.abspath(screenshot_filepath)
 
-    image = pyautogui.screenshot()
+    points = ui(layout.UPGRADE_POINTS)
+    margin = DEBUG_SCREENSHOT_MARGIN
+    x = max(points.x - margin, 0)
+    y = max(points.y - margin, 0)
+    image = capture.grab(
+        x,
+        y,
+        points.x - x + points.width + margin,
+        points.y - y + points.height + margin,
+    )
     drawing = ImageDraw.Draw(image)
 
-    x = UI_UPGRADE_POINTS.x
-    y = UI_UPGRADE_POINTS.y
-    width = UI_UPGRADE_POINTS.width
-    height = UI_UPGRADE_POINTS.height
-
+    left = points.x - x
+    top = points.y - y
     drawing.rectangle(
         (
-            (x, y),
-            (x + width, y + height),
+            (left, top),
+            (left + points.width, top + points.height),
         ),
         outline=COLOR_GREEN,
     )
@@ -75,14 +130,9 @@ def debug_upgrade_points_rectangle_with_screenshot():
 
 
 def get_ocr_text_from_screen_rectangle(x: int, y: int, width: int, height: int) -> str:
-    args = [
-        CAPTURE2TEXT_CLI_BINARY,
-        "-l",
-        "English",
-        "--screen-rect",
-        f"{x} {y} {x + width} {y + height}",
-    ]
-    return subprocess.check_output(args)
+    backend = ocr.get_backend()
+    with tracing.span("ocr", backend=backend.name):
+        return backend.read_screen_rectangle(x, y, width, height)
 
 
 def get_upgrade_points_from_screenshot() -> Optional[int]:
@@ -90,20 +140,18 @@ def get_upgrade_points_from_screenshot() -> Optional[int]:
 
     def _handle_common_mistakes(text):
         return (
-            text.decode("utf-8")
-            .replace(r"\r\n", "")
+            text.replace("\r\n", "")
             .replace(")", "")
             .replace("(", "")
             .replace(".", "")
             .replace("'", "")
         )
 
-    text = get_ocr_text_from_screen_rectangle(
-        UI_UPGRADE_POINTS.x,
-        UI_UPGRADE_POINTS.y,
-        UI_UPGRADE_POINTS.width,
-        UI_UPGRADE_POINTS.height,
-    )
+    try:
+        text = get_ocr_text_from_screen_rectangle(*ui(layout.UPGRADE_POINTS).region())
+    except (OSError, subprocess.CalledProcessError) as err:
+        print(f"Could not read upgrade points: {err}")
+        return None
     text = _handle_common_mistakes(text)
     try:
         return int(text)
@@ -113,15 +161,11 @@ def get_upgrade_points_from_screenshot() -> Optional[int]:
 
 
 def is_capslock_active() -> bool:
-    # https://stackoverflow.com/a/21160382
-    VK_CAPITAL = 0x14
-    user32 = ctypes.windll.user32
-    return user32.GetKeyState(VK_CAPITAL) > 0
+    return backends.get_input_backend().is_capslock_active()
 
 
 def get_screen_size() -> Tuple[int, int]:
-    user32 = ctypes.windll.user32
-    return user32.GetSystemMetrics(0), user32.GetSystemMetrics(1)
+    return backends.get_input_backend().get_screen_size()
 
 
 def skipped_by_escape_key(func):
@@ -132,7 +176,7 @@ def skipped_by_escape_key(func):
     """
 
     def inner(*args, **kwargs):
-        if keyboard.is_pressed("esc"):
+        if backends.get_input_backend().is_key_pressed("esc"):
             print("skipped by esc")
             return
         return func(*args, **kwargs)
@@ -142,40 +186,20 @@ def skipped_by_escape_key(func):
 
 @skipped_by_escape_key
 def set_hunt_showdown_as_foreground_window() -> bool:
-    game_window = None
-    for window in pygetwindow.getWindowsWithTitle(GAME_WINDOW_TITLE):
-        if window.title == GAME_WINDOW_TITLE:
-            game_window = window
-            break
-    if not game_window:
-        message = f"Window titled '{GAME_WINDOW_TITLE}' could not be found"
-        print(message)
+    if not window_manager.get_game_window().focus():
         return False
 
-    game_window.minimize()
-    game_window.restore()
-
+    refresh_layout()
     return True
 
 
 @skipped_by_escape_key
 def put_hunt_showdown_window_to_background() -> bool:
-    game_window = None
-    for window in pygetwindow.getWindowsWithTitle(GAME_WINDOW_TITLE):
-        if window.title == GAME_WINDOW_TITLE:
-            game_window = window
-            break
-    if not game_window:
-        message = f"Window titled '{GAME_WINDOW_TITLE}' could not be found"
-        print(message)
-        return False
-
-    game_window.minimize()
-
-    return True
+    return window_manager.get_game_window().to_background()
 
 
 @skipped_by_escape_key
+@tracing.traced()
 def smooth_move(
     x: Union[str, int],
     y: Union[str, int],
@@ -191,51 +215,459 @@ def smooth_move(
         offset_x = random.randint(-random_offset_up_to, random_offset_up_to)
         offset_y = random.randint(-random_offset_up_to, random_offset_up_to)
 
-    extra = []
-    if tween:
-        extra = [pyautogui.easeOutQuad]
-
-    pyautogui.moveTo(
+    backends.get_input_backend().move_to(
         x + offset_x,
         y + offset_y,
         seconds,
-        *extra,
+        tween,
+    )
+
+
+def _move_and_wait_for_hover(element: UIElement, label: str) -> bool:
+    """Move onto an element and wait until the game has highlighted it.
+
+    Only moves where calibration found no hover highlight. Returns whether
+    the element was highlighted.
+
+    """
+    move_seconds = get_speed_profile().move_seconds
+    if not current_layout().calibration.hover_highlight:
+        smooth_move(element.x, element.y, seconds=move_seconds)
+        return False
+    region = element.region()
+    checksum_before = waiting.region_checksum(region)
+    smooth_move(element.x, element.y, seconds=move_seconds)
+    return waiting.wait_for_region_change(
+        region, checksum_before, timeout=HOVER_TIMEOUT, label=label
+    )
+
+
+def _submit_search(trait_name: str):
+    """Press enter and wait until the search results have been updated.
+
+    The results have been updated once the first match differs from before
+    pressing enter, or once it is the trait (it might have been already).
+
+    """
+    checksums_before = waiting.region_checksums(
+        [ui(layout.TRAITS_FIRST_MATCH_ICON).region()]
+    )
+    backends.get_input_backend().press("enter")
+    waiting.wait_for_reaction(
+        checksums_before,
+        expected=lambda: _get_first_matching_trait_name() == trait_name,
+        label="search results",
+    )
+
+
+@tracing.traced()
+def _dismiss_failure_dialog():
+    button = ui(layout.TRANSACTION_FAILED_DIALOG_OK_BTN)
+    region = button.region()
+    checksum_before = waiting.region_checksum(region)
+    smooth_move(button.x, button.y)
+    backends.get_input_backend().click()
+    waiting.wait_for_region_change(
+        region, checksum_before, label="failure dialog dismissed"
+    )
+
+
+def _equip_reaction_regions() -> List[backends.Rectangle]:
+    """Regions of which one changes when the game handles an equip.
+
+    The upgrade points change when the trait was equipped, the failure
+    dialog shows up when it could not be.
+
+    """
+    return [
+        ui(layout.UPGRADE_POINTS).region(),
+        ui(layout.TRANSACTION_FAILED_DIALOG_OK_BTN).region(),
+    ]
+
+
+def _confirm_equipped(
+    trait_name: str, checksums_before: Dict[backends.Rectangle, int]
+) -> bool:
+    """Wait for the reaction to the double click, return whether it equipped.
+
+    A failure dialog is dismissed, it would block the next trait.
+
+    """
+    points_region, dialog_region = _equip_reaction_regions()
+    reacted = waiting.wait_for_reaction(
+        checksums_before, timeout=EQUIP_REACTION_TIMEOUT, label="equip reaction"
+    )
+    dialog_changed = (
+        waiting.region_checksum(dialog_region) != checksums_before[dialog_region]
+    )
+    if dialog_changed and _get_first_matching_trait_name() != trait_name:
+        _dismiss_failure_dialog()
+        return False
+    if not reacted:
+        print(f"No reaction from the game to equipping '{trait_name}'")
+        return False
+    return waiting.region_checksum(points_region) != checksums_before[points_region]
+
+
+def _get_first_matching_trait_name() -> Optional[str]:
+    with tracing.span("identify first match"):
+        name, _ = vision.identify_trait_at(
+            *ui(layout.TRAITS_FIRST_MATCH_ICON).region()
+        )
+    return name
+
+
+def _first_match_is_other_trait(trait_name: str) -> bool:
+    """Whether the first match is recognized as a different trait.
+
+    An unrecognized first match does not rule the trait out, the game's
+    reaction to the double click decides then, see _confirm_equipped().
+
+    """
+    first_match = _get_first_matching_trait_name()
+    if first_match is None:
+        print(f"Could not recognize the first match, equipping '{trait_name}'")
+        return False
+    if first_match != trait_name:
+        print(f"Expected '{trait_name}' as first match, got: {first_match}")
+        return True
+    return False
+
+
+_PLAN_TARGETS = {
+    "search_input": (layout.TRAITS_SEARCH_INPUT, "hover search input"),
+    "first_match": (layout.TRAITS_FIRST_MATCH, "hover first match"),
+}
+
+
+class EquipCancelled(Exception):
+    """Raised between two actions once an equip run has been cancelled."""
+
+
+def _check_cancelled(cancel_event: Optional[threading.Event]):
+    if cancel_event is not None and cancel_event.is_set():
+        raise EquipCancelled("cancelled")
+    if backends.get_input_backend().is_key_pressed("esc"):
+        raise EquipCancelled("skipped by esc")
+
+
+@dataclass
+class EquipProgress:
+    """State of a running equip plan, reported after every trait."""
+
+    done: int
+    total: int
+    trait_name: Optional[str]
+    succeeded: bool
+    elapsed: float
+    eta: float
+
+
+def _run_trait_step(
+    step: planner.TraitStep, cancel_event: Optional[threading.Event] = None
+) -> bool:
+    checksums_before = {}
+    for action in step.actions:
+        _check_cancelled(cancel_event)
+        with tracing.span(action.kind):
+            if not _run_action(step, action, checksums_before):
+                return False
+    return True
+
+
+def _run_action(
+    step: planner.TraitStep,
+    action: planner.Action,
+    checksums_before: Dict[backends.Rectangle, int],
+) -> bool:
+    """Run one action, return False once the trait cannot be equipped.
+
+    checksums_before is shared by the actions of a step, the double click
+    on the first match fills it in for the confirm action.
+
+    """
+    input_backend = backends.get_input_backend()
+    if action.kind == "move":
+        name, label = _PLAN_TARGETS[action.target]
+        _move_and_wait_for_hover(ui(name), label)
+    elif action.kind == "double_click":
+        if action.target == "first_match":
+            checksums_before.update(
+                waiting.region_checksums(_equip_reaction_regions())
+            )
+        input_backend.double_click()
+    elif action.kind == "clear":
+        input_backend.hotkey("ctrl", "a")
+        input_backend.press("delete")
+    elif action.kind == "type":
+        input_backend.write(action.text)
+    elif action.kind == "enter":
+        _submit_search(step.trait_name)
+    elif action.kind == "verify":
+        if _first_match_is_other_trait(step.trait_name):
+            return False
+    elif action.kind == "confirm":
+        return _confirm_equipped(step.trait_name, checksums_before)
+    return True
+
+
+def _release_capslock():
+    input_backend = backends.get_input_backend()
+    if input_backend.is_capslock_active():
+        input_backend.press("capslock")
+
+
+@skipped_by_escape_key
+def execute_equip_plan(
+    plan: planner.EquipPlan,
+    step_callback: Optional[Callable[[planner.TraitStep, bool, float], None]] = None,
+    progress_callback: Optional[Callable[[EquipProgress], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> List[str]:
+    """Run the actions of an equip plan, return the names of equipped traits.
+
+    step_callback is called after each trait with the step, whether it was
+    equipped and how many seconds it took. progress_callback gets an
+    EquipProgress before the first and after each trait, with an ETA from
+    the plan's estimates scaled by how fast the run has been so far.
+
+    The run stops before the next action once cancel_event is set or esc
+    is pressed.
+
+    """
+    apply_speed_profile()
+    _release_capslock()
+
+    estimated_total = plan.estimated_seconds()
+    estimated_done = 0.0
+    run_start = time.perf_counter()
+    if progress_callback:
+        progress_callback(
+            EquipProgress(0, len(plan.steps), None, False, 0.0, estimated_total)
+        )
+
+    equipped = []
+    for i, step in enumerate(plan.steps):
+        start = time.perf_counter()
+        try:
+            with tracing.span("trait", trait=step.trait_name):
+                succeeded = _run_trait_step(step, cancel_event)
+        except EquipCancelled as err:
+            print(err)
+            break
+        if succeeded:
+            equipped.append(step.trait_name)
+        if step_callback:
+            step_callback(step, succeeded, time.perf_counter() - start)
+        if progress_callback:
+            elapsed = time.perf_counter() - run_start
+            estimated_done += step.estimated_seconds()
+            pace = elapsed / estimated_done if estimated_done else 1.0
+            progress_callback(
+                EquipProgress(
+                    i + 1,
+                    len(plan.steps),
+                    step.trait_name,
+                    succeeded,
+                    elapsed,
+                    (estimated_total - estimated_done) * pace,
+                )
+            )
+    return equipped
+
+
+@skipped_by_escape_key
+def calibrate_layout(trait_name: str = "Doctor") -> bool:
+    """Find where the game shows its UI and save that for this screen setup.
+
+    Searches for trait_name on the open trait screen, then locates its icon
+    in a screenshot of the game window. With that layout it checks whether
+    the game highlights the first match under the pointer and whether the
+    double click selects the search text, see layout.Calibration.
+
+    """
+    if not set_hunt_showdown_as_foreground_window():
+        return False
+    apply_speed_profile()
+    _release_capslock()
+    # Verifying the first match needs the layout that is being calibrated.
+    step = planner.make_equip_plan([trait_name]).steps[0]
+    for action in step.actions:
+        if action.kind == "verify":
+            break
+        _run_action(step, action, {})
+
+    input_backend = backends.get_input_backend()
+    screen_size = input_backend.get_screen_size()
+    window = current_layout().window
+    icon = layout.find_first_match_icon(capture.grab(*window), window, trait_name)
+    if icon is None:
+        return False
+    viewport = layout.viewport_from_icon(icon)
+    calibration = layout.Calibration(viewport=viewport, first_match_icon=icon)
+    layout.save_calibration(screen_size, window, calibration)
+    print(f"Saved calibrated viewport {viewport} and icon {icon} for window {window}")
+    refresh_layout()
+
+    # The pointer is still on the search input.
+    hover_highlight = _move_and_wait_for_hover(
+        ui(layout.TRAITS_FIRST_MATCH), "hover highlight"
     )
+    calibration = replace(calibration, hover_highlight=hover_highlight)
+    layout.save_calibration(screen_size, window, calibration)
+    if not hover_highlight:
+        print("The game does not highlight under the pointer, moves will not wait")
+    refresh_layout()
+
+    selects = _double_click_selects_search_text()
+    layout.save_calibration(
+        screen_size,
+        window,
+        replace(calibration, double_click_selects_search_text=selects),
+    )
+    if selects:
+        print("The double click selects the search text, skipping clears")
+    else:
+        print("The double click does not select the search text, clearing it")
+    refresh_layout()
+    return True
+
+
+def _speed_trial(trait_names: Sequence[str] = SPEED_TRIAL_TRAITS) -> bool:
+    """Run the equip plan of the traits, but only select each first match.
 
+    The double click that would equip the first match is replaced by a
+    single click, which selects it and takes the focus from the search
+    input. That click pauses as long as the double click it stands in for.
+    Returns whether every trait was found as first match.
+
+    """
+    input_backend = backends.get_input_backend()
+    profile = get_speed_profile()
+    input_backend.set_action_delays(
+        {**profile.delays, "click": profile.delay("double_click")}
+    )
+    try:
+        for step in make_equip_plan(trait_names).steps:
+            for action in step.actions:
+                if action.kind == "double_click" and action.target == "first_match":
+                    input_backend.click()
+                elif action.kind != "confirm" and not _run_trial_action(step, action):
+                    return False
+        return True
+    finally:
+        apply_speed_profile()
 
-def _search_for(text: str, clear_first: bool = True):
-    if is_capslock_active():
-        pyautogui.press("capslock")
 
-    if clear_first:
-        pyautogui.hotkey("ctrl", "a")
-        pyautogui.press("delete")
+def _run_trial_action(step: planner.TraitStep, action: planner.Action) -> bool:
+    """Run an action of a trial, which only passes a recognized first match."""
+    if action.kind == "verify":
+        return _get_first_matching_trait_name() == step.trait_name
+    return _run_action(step, action, {})
 
-    pyautogui.write(text)
-    pyautogui.press("enter")
 
+def _run_search(step: planner.TraitStep) -> bool:
+    """Run the actions of a plan step up to verifying its first match."""
+    for action in step.actions:
+        if not _run_trial_action(step, action):
+            return False
+        if action.kind == "verify":
+            return True
+    return False
 
-def _search_for_trait(trait_name: str):
-    smooth_move(UI_TRAITS_SEARCH_INPUT.x, UI_TRAITS_SEARCH_INPUT.y)
-    pyautogui.doubleClick()
-    _search_for(trait_name)
 
+def _double_click_selects_search_text() -> bool:
+    """Check whether typing after the double click replaces the search text.
 
-def _maybe_get_rid_of_failure_dialog():
-    smooth_move(
-        UI_TRANSACTION_FAILED_DIALOG_OK_BTN.x, UI_TRANSACTION_FAILED_DIALOG_OK_BTN.y
+    Searches for SEARCH_SELECTION_TRIAL_TRAITS with a plan that only clears
+    the search input before the first search.
+
+    """
+    plan = planner.make_equip_plan(
+        SEARCH_SELECTION_TRIAL_TRAITS, double_click_selects_search_text=True
+    )
+    for step in plan.steps:
+        if not _run_search(step):
+            return False
+        # Off the search input, as an equip leaves the pointer, so the next
+        # move onto it gets highlighted.
+        _move_and_wait_for_hover(ui(layout.TRAITS_FIRST_MATCH), "hover first match")
+    return True
+
+
+def make_equip_plan(trait_names: Sequence[str]) -> planner.EquipPlan:
+    """Plan equipping the traits as calibrated for the current screen setup."""
+    return planner.make_equip_plan(
+        trait_names,
+        current_layout().calibration.double_click_selects_search_text,
     )
-    time.sleep(0.5)
-    pyautogui.click()
 
 
-def _add_first_matching_trait():
-    smooth_move(UI_TRAITS_FIRST_MATCH.x, UI_TRAITS_FIRST_MATCH.y)
-    pyautogui.doubleClick()
+def _smallest_passing(candidates: Sequence[float], passes: Callable) -> float:
+    """Binary search, assuming the last candidate passes and larger is safer."""
+    low, high = 0, len(candidates) - 1
+    while low < high:
+        middle = (low + high) // 2
+        if passes(candidates[middle]):
+            high = middle
+        else:
+            low = middle + 1
+    return candidates[high]
 
 
 @skipped_by_escape_key
-def add_trait(trait_name: str):
-    _search_for_trait(trait_name)
-    _add_first_matching_trait()
-    _maybe_get_rid_of_failure_dialog()
+def tune_speed_profile(
+    trials: int = 3, machine: Optional[str] = None, save: bool = True
+) -> Optional[speed.SpeedProfile]:
+    """Find the smallest pauses at which search trials still all succeed.
+
+    A profile passes when searching for and verifying SPEED_TRIAL_TRAITS
+    succeeds trials times in a row, which never equips anything. Moves are
+    slowed down only if the default profile fails. Then the pause of each
+    action kind is lowered on its own by binary search over the candidates,
+    and the result is checked again as a whole before it is saved.
+
+    """
+    if not set_hunt_showdown_as_foreground_window():
+        return None
+
+    def _passes(profile: speed.SpeedProfile, rounds: int = trials) -> bool:
+        set_speed_profile(profile)
+        return all(_speed_trial() for _ in range(rounds))
+
+    default = speed.SpeedProfile(machine=machine or speed.machine_name())
+    profile = None
+    for seconds in speed.MOVE_SECONDS_CANDIDATES:
+        if _passes(replace(default, move_seconds=seconds)):
+            profile = replace(default, move_seconds=seconds)
+            break
+    if profile is None:
+        print("Search trials fail even at default speed, is the trait screen open?")
+        set_speed_profile(default)
+        return None
+
+    for action in speed.TUNED_ACTIONS:
+        current = profile
+
+        def _with_delay(delay: float) -> speed.SpeedProfile:
+            return replace(current, delays={**current.delays, action: delay})
+
+        candidates = [
+            delay
+            for delay in speed.DELAY_CANDIDATES
+            if delay <= current.delay(action)
+        ]
+        delay = _smallest_passing(candidates, lambda delay: _passes(_with_delay(delay)))
+        profile = _with_delay(delay)
+        print(f"{action}: {delay * 1000:.0f} ms")
+
+    # Lowering each pause on its own does not prove they work together.
+    if not _passes(profile, 2 * trials):
+        print("Tuned profile failed when checked as a whole, keeping defaults")
+        set_speed_profile(default)
+        return None
+    set_speed_profile(profile)
+    if save:
+        speed.save_profile(profile)
+    print(f"Speed profile for {profile.machine}: {speed.describe(profile)}")
+    return profile
@@ -0,0 +1,151 @@
+"""Recognize which trait is shown on screen by matching against the img/ icons.
+
+The icons are loaded once into a template bank: a matrix holding one
+normalized grayscale template per row. Identifying a screen crop is a single
+matrix-vector product (normalized cross-correlation with every template).
+
+"""
+
+import os
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+import capture
+from traits import TRAITS
+
+SMALL_ICONS_DIR = "img/small"
+
+# Crops are resampled to this size (width, height) before matching, which
+# keeps the bank small and makes matching tolerant to slight scaling.
+SMALL_TEMPLATE_SIZE = (49, 47)
+
+# Best correlations below this are treated as "no trait recognized".
+MIN_MATCH_SCORE = 0.8
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = matrix - matrix.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+def _image_to_vector(image: Image.Image, size: Tuple[int, int]) -> np.ndarray:
+    gray = image.convert("L").resize(size, Image.BILINEAR)
+    return np.asarray(gray, dtype=np.float32).ravel()
+
+
+class TemplateBank:
+    """Normalized templates of all trait icons."""
+
+    def __init__(self, names: List[str], images: List[Image.Image], size):
+        self.names = names
+        self.size = size
+        self.matrix = _normalize_rows(
+            np.stack([_image_to_vector(image, size) for image in images])
+        )
+
+    @classmethod
+    def from_directory(
+        cls, directory: str, size: Tuple[int, int], names: Iterable[str]
+    ) -> "TemplateBank":
+        names = sorted(names)
+        images = [Image.open(os.path.join(directory, f"{name}.png")) for name in names]
+        return cls(names, images, size)
+
+    def scores(self, image: Image.Image) -> np.ndarray:
+        """Correlation of the image with every template, in [-1, 1]."""
+        vector = _normalize_rows(_image_to_vector(image, self.size)[np.newaxis])
+        return self.matrix @ vector[0]
+
+    def identify(self, image: Image.Image) -> Tuple[Optional[str], float]:
+        """Return the best matching trait name (or None) and its score."""
+        scores = self.scores(image)
+        index = int(scores.argmax())
+        score = float(scores[index])
+        if score < MIN_MATCH_SCORE:
+            return None, score
+        return self.names[index], score
+
+
+def _window_sums(array: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Sum of every height x width window, via an integral image."""
+    integral = np.pad(array.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    return (
+        integral[height:, width:]
+        - integral[:-height, width:]
+        - integral[height:, :-width]
+        + integral[:-height, :-width]
+    )
+
+
+def _fast_fft_length(length: int) -> int:
+    """Smallest length >= the given one without prime factors above 5."""
+    while True:
+        remainder = length
+        for factor in (2, 3, 5):
+            while remainder % factor == 0:
+                remainder //= factor
+        if remainder == 1:
+            return length
+        length += 1
+
+
+def match_template(image: np.ndarray, template: np.ndarray) -> Tuple[float, int, int]:
+    """Find a grayscale template in a grayscale image.
+
+    Returns the best normalized cross-correlation and the (x, y) of the
+    template's top left corner there. Correlations are computed for all
+    positions at once with FFTs, window statistics with integral images.
+
+    """
+    height, width = template.shape
+    template = template - template.mean()
+    template_norm = np.sqrt((template**2).sum())
+    if template_norm == 0:
+        return 0.0, 0, 0
+
+    shape = tuple(_fast_fft_length(length) for length in image.shape)
+    spectrum = np.fft.rfft2(image, shape) * np.conj(np.fft.rfft2(template, shape))
+    correlation = np.fft.irfft2(spectrum, shape)
+    rows, columns = image.shape[0] - height + 1, image.shape[1] - width + 1
+    correlation = correlation[:rows, :columns]
+
+    count = height * width
+    sums = _window_sums(image, height, width)
+    variances = _window_sums(image**2, height, width) - sums**2 / count
+    denominators = template_norm * np.sqrt(np.maximum(variances, 0))
+    scores = np.divide(
+        correlation,
+        denominators,
+        out=np.zeros_like(correlation),
+        where=denominators > 1e-6 * count,
+    )
+    y, x = np.unravel_index(scores.argmax(), scores.shape)
+    return float(scores[y, x]), int(x), int(y)
+
+
+_bank: Optional[TemplateBank] = None
+
+
+def get_template_bank() -> TemplateBank:
+    """Return the bank of the small icons, loaded on first use."""
+    global _bank
+    if _bank is None:
+        names = [trait["name"] for trait in TRAITS]
+        _bank = TemplateBank.from_directory(SMALL_ICONS_DIR, SMALL_TEMPLATE_SIZE, names)
+    return _bank
+
+
+def grab_screen_rectangle(x: int, y: int, width: int, height: int) -> Image.Image:
+    return capture.grab(x, y, width, height)
+
+
+def identify_trait_at(
+    x: int, y: int, width: int, height: int
+) -> Tuple[Optional[str], float]:
+    """Return the trait whose small icon is shown in the given rectangle."""
+    image = grab_screen_rectangle(x, y, width, height)
+    return get_template_bank().identify(image)
@@ -0,0 +1,177 @@
+"""Wait for the game UI to reach an expected state instead of sleeping.
+
+Screen state is observed through cheap checksums of small screen regions.
+Where the pixels come from is up to the active screen backend, so waits can
+be driven by a backends.SimulatedScreenBackend without a display (e.g. on
+Linux CI). Every poll starts a new capture frame, checks right after a wait
+reuse the pixels of its last poll.
+
+The game reacts to an input a few frames later, so a region that looks the
+same right after an input proves nothing. Waits after an input therefore
+compare against checksums taken before it (wait_for_region_change(),
+wait_for_reaction()) and only then wait for the region to settle.
+
+The latest waits are recorded in WAIT_LOG with their latency, see
+summarize_waits().
+
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import capture
+import tracing
+from backends import Rectangle
+
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_POLL_INTERVAL = 0.02
+# Bounds WAIT_LOG in long-running processes like the daemon.
+WAIT_LOG_SIZE = 10000
+
+
+@dataclass
+class WaitRecord:
+    label: str
+    latency: float
+    polls: int
+    succeeded: bool
+
+
+WAIT_LOG: Deque[WaitRecord] = deque(maxlen=WAIT_LOG_SIZE)
+
+
+def wait_until(
+    predicate: Callable[[], bool],
+    timeout: float = DEFAULT_TIMEOUT,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    label: str = "wait",
+) -> bool:
+    """Poll predicate until it returns True or timeout seconds have passed.
+
+    Returns whether the predicate became True.
+
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    polls = 0
+    with tracing.span(f"wait: {label}"):
+        while True:
+            polls += 1
+            capture.next_frame()
+            if predicate():
+                succeeded = True
+                break
+            if time.perf_counter() >= deadline:
+                succeeded = False
+                break
+            time.sleep(poll_interval)
+
+    latency = time.perf_counter() - start
+    WAIT_LOG.append(WaitRecord(label, latency, polls, succeeded))
+    if not succeeded:
+        print(f"Timed out after {latency:.2f}s waiting for: {label}")
+    return succeeded
+
+
+def region_checksum(rectangle: Rectangle) -> int:
+    return capture.checksum(*rectangle)
+
+
+def region_checksums(rectangles: Sequence[Rectangle]) -> Dict[Rectangle, int]:
+    """Checksums to take right before an input, see wait_for_reaction()."""
+    return {tuple(rectangle): region_checksum(rectangle) for rectangle in rectangles}
+
+
+def wait_for_region_change(
+    rectangle: Rectangle,
+    checksum_before: int,
+    timeout: float = DEFAULT_TIMEOUT,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    label: str = "region change",
+) -> bool:
+    return wait_until(
+        lambda: region_checksum(rectangle) != checksum_before,
+        timeout=timeout,
+        poll_interval=poll_interval,
+        label=label,
+    )
+
+
+def wait_for_regions_stable(
+    rectangles: Sequence[Rectangle],
+    timeout: float = DEFAULT_TIMEOUT,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    label: str = "region stable",
+) -> bool:
+    """Wait until the regions stay unchanged for one poll interval.
+
+    Unchanged pixels only mean the UI has settled once it has started to
+    react, so this belongs after wait_for_reaction(), never right after an
+    input.
+
+    """
+    previous: List[Optional[Tuple[int, ...]]] = [None]
+
+    def _is_stable():
+        checksums = tuple(region_checksum(rectangle) for rectangle in rectangles)
+        stable = checksums == previous[0]
+        previous[0] = checksums
+        return stable
+
+    return wait_until(
+        _is_stable, timeout=timeout, poll_interval=poll_interval, label=label
+    )
+
+
+def wait_for_reaction(
+    checksums_before: Dict[Rectangle, int],
+    expected: Optional[Callable[[], bool]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    label: str = "reaction",
+) -> bool:
+    """Wait for the game to react to an input, then for it to settle.
+
+    checksums_before maps regions to their checksums taken before the
+    input. The game has reacted once any of them differs, or once expected()
+    returns True (e.g. the searched trait was already the first match, so
+    nothing changes). Returns whether it reacted before the timeout.
+
+    """
+
+    def _reacted():
+        return any(
+            region_checksum(rectangle) != checksum
+            for rectangle, checksum in checksums_before.items()
+        ) or (expected is not None and expected())
+
+    reacted = wait_until(
+        _reacted, timeout=timeout, poll_interval=poll_interval, label=label
+    )
+    if reacted:
+        wait_for_regions_stable(
+            list(checksums_before),
+            timeout=timeout,
+            poll_interval=poll_interval,
+            label=f"{label} settled",
+        )
+    return reacted
+
+
+def summarize_waits(
+    records: Optional[Iterable[WaitRecord]] = None
+) -> Dict[str, dict]:
+    """Aggregate wait records per label: count, total/max latency, timeouts."""
+    summary = {}
+    for record in WAIT_LOG if records is None else records:
+        entry = summary.setdefault(
+            record.label, {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0}
+        )
+        entry["count"] += 1
+        entry["total"] += record.latency
+        entry["max"] = max(entry["max"], record.latency)
+        entry["timeouts"] += not record.succeeded
+    return summary
+
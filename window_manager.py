@@ -0,0 +1,105 @@
+"""Find the game window once and bring it to the front only when needed.
+
+Looking a window up by title enumerates all windows, so the handle is cached
+and only re-validated (a cheap IsWindow check) on later calls. Focusing does
+nothing if the game already is the foreground window, which avoids the
+minimize/restore flicker on every equip run and OCR read.
+
+Time spent on focusing is collected in WindowManager.stats.
+
+"""
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import backends
+import tracing
+from backends import Rectangle
+
+GAME_WINDOW_TITLE = "Hunt: Showdown"
+
+
+@dataclass
+class FocusStats:
+    lookups: int = 0
+    focus_requests: int = 0
+    focus_changes: int = 0
+    seconds: float = 0.0
+
+
+class WindowManager:
+    def __init__(self, title: str = GAME_WINDOW_TITLE):
+        self.title = title
+        self.stats = FocusStats()
+        self._handle: Optional[int] = None
+        self._backend: Optional[backends.InputBackend] = None
+
+    def reset_stats(self):
+        self.stats = FocusStats()
+
+    def find(self) -> Optional[int]:
+        """Return the cached window handle, looking it up if it went stale."""
+        backend = backends.get_input_backend()
+        if backend is not self._backend:
+            self._backend = backend
+            self._handle = None
+        if self._handle is not None and backend.is_window(self._handle):
+            return self._handle
+        self.stats.lookups += 1
+        self._handle = backend.find_window(self.title)
+        return self._handle
+
+    @tracing.traced("focus window")
+    def focus(self) -> bool:
+        """Make sure the window is in front, return whether it exists."""
+        start = time.perf_counter()
+        self.stats.focus_requests += 1
+        try:
+            handle = self.find()
+            if handle is None:
+                print(f"Window titled '{self.title}' could not be found")
+                return False
+            if self._backend.get_foreground_window() == handle:
+                return True
+            self.stats.focus_changes += 1
+            with tracing.span("activate window"):
+                return self._backend.activate_window(handle)
+        finally:
+            self.stats.seconds += time.perf_counter() - start
+
+    def to_background(self) -> bool:
+        handle = self.find()
+        if handle is None:
+            print(f"Window titled '{self.title}' could not be found")
+            return False
+        return self._backend.minimize_window(handle)
+
+    def rect(self) -> Optional[Rectangle]:
+        handle = self.find()
+        if handle is None:
+            return None
+        return self._backend.get_window_rect(handle)
+
+
+_game_window: Optional[WindowManager] = None
+
+
+def get_game_window() -> WindowManager:
+    global _game_window
+    if _game_window is None:
+        _game_window = WindowManager()
+    return _game_window
+
+
+def get_stats() -> dict:
+    return asdict(get_game_window().stats)
+
+
+def print_stats():
+    stats = get_game_window().stats
+    print(
+        f"Game window: {stats.focus_changes} of {stats.focus_requests} focus "
+        f"requests changed focus, {stats.lookups} lookups, "
+        f"{stats.seconds * 1000:.1f} ms spent focusing"
+    )